@@ -126,6 +126,20 @@ DATABASES = {
 
 
 
+# Cache
+# Catalog responses are keyed on a version counter stored here, so every
+# worker must share one cache in production (Redis/Memcached).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bigbasket',
+    }
+}
+
+CATALOG_CACHE_TIMEOUT = 60 * 5   # seconds
+
+
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=1),   # tokens valid for 1 hour
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),   # refresh token valid for 1 day
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from core.models import Product, Category, Vendor, CartOrder,CartOrderItems, ProductImages, ProductReview, WishList, Address,Tags,Cart, CartItem
+from core.models import Product, Category, Vendor, CartOrder,CartOrderItems, ProductImages, ProductReview, WishList, Address,Tags,Cart, CartItem, StockReservation
 
 
 class ProductImagesAdmin(admin.TabularInline):
@@ -7,7 +7,7 @@ class ProductImagesAdmin(admin.TabularInline):
 
 class ProductAdmin(admin.ModelAdmin):
     inlines = [ProductImagesAdmin]
-    list_display = ['user','title', 'product_image','price','product_status','category']
+    list_display = ['user','title', 'product_image','price','stock','product_status','category']
     search_fields = ['title']
     
 class CategoryAdmin(admin.ModelAdmin):
@@ -48,6 +48,10 @@ class CartAdmin(admin.ModelAdmin):
     list_display = ['id', 'user', 'session_id', 'created_at']
     inlines = [CartItemInline]
 
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ['order', 'product', 'quantity', 'status', 'expires_at']
+    list_filter = ['status']
+
 class CartItemAdmin(admin.ModelAdmin):
     list_display = ['id', 'cart', 'product', 'quantity', 'price_snapshot']
     search_fields = ['product__title']
@@ -66,4 +70,5 @@ admin.site.register(WishList, WishListAdmin)
 admin.site.register(Address, AddressAdmin)
 admin.site.register(Tags, TagsAdmin)
 admin.site.register(Cart, CartAdmin)
-admin.site.register(CartItem, CartItemAdmin)
\ No newline at end of file
+admin.site.register(CartItem, CartItemAdmin)
+admin.site.register(StockReservation, StockReservationAdmin)
\ No newline at end of file
@@ -4,15 +4,28 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from decimal import Decimal
 import uuid
 import traceback
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 
 from .models import Product, Category, Cart, CartItem, CartOrder, CartOrderItems, Vendor, Address, Payment
+from .pagination import ProductCursorPagination
+from . import search, suggest
+from .importers import FORMATS, ProductImporter, detect_format
+from .bulk_updates import BULK_UPDATE_LIMIT, apply_product_updates
+from .stock import OutOfStock, release_order, reserve_stock, settle_order
+from .filters import filter_products, facet_counts, sort_ordering
+from .catalog import CatalogCacheMixin, catalog_version, catalog_last_modified, get_category_tree, get_catalog_bootstrap
+from .cart import CART_BATCH_LIMIT, cart_summary, cached_summary, get_or_create_cart
+from .cart_store import attach_lines, get_cart_store
+from .conditional import make_etag, not_modified_response, set_validators
+from .idempotency import IdempotencyMixin
 from .serializers import (
-    ProductSerializer, CategorySerializer,
-    CartSerializer, CartItemSerializer, CartOrderSerializer, VendorSerializer, CartOrderItemUpdateSerializer, AddressSerializer, PaymentSerializer
+    ProductSerializer, ProductCardSerializer, CARD_DEFERRED_FIELDS, CategorySerializer,
+    CartSerializer, CartItemSerializer, CartTotalsSerializer, CartBatchOperationSerializer, CartOrderSerializer, VendorSerializer, CartOrderItemUpdateSerializer, AddressSerializer, PaymentSerializer
 
 )
 from users.serializers import UserSerializer
@@ -25,6 +38,7 @@ from core.permissions import (
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework import status
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.authentication import SessionAuthentication
 
 
 import razorpay
@@ -41,30 +55,117 @@ import logging
 # Product ViewSet
 # -------------------------------
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
     authentication_classes = [JWTAuthentication]
     serializer_class = ProductSerializer
+    pagination_class = ProductCursorPagination
+
+    def _wants_card(self):
+        # listings get the slim card projection unless ?view=full is asked for
+        return self.action == "list" and self.request.query_params.get("view") != "full"
+
+    def get_serializer_class(self):
+        if self._wants_card():
+            return ProductCardSerializer
+        return ProductSerializer
 
     def get_queryset(self):
-        qs = Product.objects.all().order_by('-date').prefetch_related('productimages_set')
+        qs = Product.objects.all().order_by('-date', '-id')
+        if self._wants_card():
+            qs = qs.defer(*CARD_DEFERRED_FIELDS)
+        else:
+            qs = qs.prefetch_related('productimages_set', 'tags')
 
-        # filter by category id or cid
+        # filter by category id or cid, including every subcategory (path range)
         cat = self.request.query_params.get('category')
         if cat:
-            if cat.isdigit():
-                qs = qs.filter(category_id=int(cat))
-            else:
-                qs = qs.filter(category__cid=cat)
+            lookup = {'pk': int(cat)} if cat.isdigit() else {'cid': cat}
+            category = Category.objects.filter(**lookup).only('path').first()
+            if category is None:
+                return qs.none()
+            qs = qs.filter(category.subtree_q(prefix='category__'))
 
-        # filter by search term
+        # full-text search, best match first
         q = self.request.query_params.get('q')
         if q:
-            qs = qs.filter(title__icontains=q)
+            qs = search.search_products(qs, q)
+            if search.fts_enabled():
+                self.cursor_ordering = ('search_rank', 'id')
+                qs = qs.order_by(*self.cursor_ordering)
+
+        # brand / price / tags / status / featured / discount
+        qs = filter_products(qs, self.request.query_params)
+
+        # explicit ?sort= wins over search relevance
+        ordering = sort_ordering(self.request.query_params)
+        if ordering:
+            self.cursor_ordering = ordering
+            qs = qs.order_by(*ordering)
 
         return qs
 
+    # 🔹 Facet counts for the current filters (sidebar checkboxes)
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        return self.catalog_cached(request, self._facets_response)
+
+    def _facets_response(self, request):
+        return Response(facet_counts(self.get_queryset()))
+
+    # 🔹 Typeahead: products, brands and categories starting with ?q= (in-memory index)
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        q = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', suggest.SUGGEST_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+        limit = max(1, min(limit, suggest.SUGGEST_MAX_LIMIT))
+        return Response({'q': q, 'results': suggest.suggest(q, limit)})
+
+    # 🔹 Bulk import from a CSV / JSONL upload (multipart field "file")
+    @action(
+        detail=False, methods=['post'], url_path='import',
+        authentication_classes=[JWTAuthentication, SessionAuthentication],
+    )
+    def import_products(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'Upload a CSV or JSONL file.'})
+        fmt = request.data.get('format') or detect_format(upload.name)
+        if fmt not in FORMATS:
+            raise ValidationError({'format': f"Must be one of: {', '.join(FORMATS)}."})
+
+        vendor = Vendor.objects.filter(user=request.user).first()
+        if request.user.is_staff and request.data.get('vendor'):
+            vendor = get_object_or_404(Vendor, pk=request.data['vendor'])
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+
+        result = ProductImporter(user=request.user, vendor=vendor, dry_run=dry_run).run(upload, fmt)
+        data = result.as_dict()
+        data['dry_run'] = dry_run
+        return Response(data, status=status.HTTP_201_CREATED if result.created and not dry_run else status.HTTP_200_OK)
+
+    # 🔹 Bulk price / status changes: {"updates": [{pid|sku, price, old_price, product_status}, ...]}
+    @action(
+        detail=False, methods=['post'], url_path='bulk-update',
+        authentication_classes=[JWTAuthentication, SessionAuthentication],
+    )
+    def bulk_update(self, request):
+        rows = request.data.get('updates') if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list) or not rows:
+            raise ValidationError({'updates': 'Send a non-empty list of updates.'})
+        if len(rows) > BULK_UPDATE_LIMIT:
+            raise ValidationError({'updates': f'At most {BULK_UPDATE_LIMIT} updates per request.'})
+
+        results = apply_product_updates(rows, request.user)
+        counts = {state: 0 for state in ('updated', 'unchanged', 'error')}
+        for result in results:
+            counts[result['status']] += 1
+        return Response({**counts, 'results': results})
+
     def get_permissions(self):
-        if self.action == "create":
+        if self.action in ("create", "import_products", "bulk_update"):
             return [IsVendorOrAdmin()]             # ✅ vendor or admin can create
         if self.action in ["update", "partial_update", "destroy"]:
             return [IsProductOwnerOrAdmin()]       # ✅ only owner vendor or admin
@@ -74,104 +175,192 @@ class ProductViewSet(viewsets.ModelViewSet):
 # -------------------------------
 # Category ViewSet
 # -------------------------------
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.all().order_by('title')
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]  # ✅ categories visible to all
 
+    # 🔹 Full tree in one (cached) response
+    @action(detail=False, methods=['get'])
+    def tree(self, request):
+        return Response(get_category_tree())
+
 
 # -------------------------------
 # Cart ViewSet
 # -------------------------------
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.authentication import SessionAuthentication
-
 class CartViewSet(viewsets.ViewSet):
     authentication_classes = [JWTAuthentication, SessionAuthentication]
     permission_classes = [AllowAny]
 
     def _get_cart(self, request):
-        if request.user.is_authenticated:
-            cart, _ = Cart.objects.get_or_create(user=request.user)
-        else:
-            sid = request.session.session_key or request.session.create() or request.session.session_key
-            cart, _ = Cart.objects.get_or_create(session_id=sid)
-        return cart
+        return get_or_create_cart(request)
+
+    def _cart_data(self, cart, request):
+        # lines and totals are built from the same lines, read once from the cart store
+        attach_lines(cart, get_cart_store().lines(cart))
+        return CartSerializer(cart, context={'request': request}).data
 
     def list(self, request):
         cart = self._get_cart(request)
-        serializer = CartSerializer(cart, context={'request': request})
-        return Response(serializer.data)
+
+        # the cart changes with its items (store modification time) and with product data (catalog version)
+        modified = get_cart_store().modified(cart)
+        etag = make_etag(cart.pk, modified.isoformat(), catalog_version(), request.accepted_renderer.format)
+        last_modified = max(int(modified.timestamp()), catalog_last_modified())
+        not_modified = not_modified_response(request, etag, last_modified, public=False)
+        if not_modified is not None:
+            return not_modified
+
+        return set_validators(Response(self._cart_data(cart, request)), etag, last_modified, public=False)
+
+    def _mutation_response(self, request, cart, item, item_id):
+        """
+        The whole cart, or with ?response=delta only the changed line
+        (null once removed) and the new totals.
+        """
+        if request.query_params.get('response') != 'delta':
+            return Response(self._cart_data(cart, request))
+        context = {'request': request}
+        return Response({
+            'id': item_id,
+            'item': CartItemSerializer(item, context=context).data if item is not None else None,
+            **CartTotalsSerializer(cart_summary(cart)).data,
+        })
+
+    @staticmethod
+    def _int_field(data, name, default, minimum=None):
+        try:
+            value = int(data.get(name, default))
+        except (TypeError, ValueError):
+            raise ValidationError({name: 'Must be an integer.'})
+        if minimum is not None and value < minimum:
+            raise ValidationError({name: f'Must be at least {minimum}.'})
+        return value
 
     def create(self, request):
         cart = self._get_cart(request)
         product_id = request.data.get('product')
-        qty = int(request.data.get('quantity', 1))
+        qty = self._int_field(request.data, 'quantity', 1, minimum=1)
 
         product = get_object_or_404(Product, pk=product_id)
-        item, created = CartItem.objects.get_or_create(cart=cart, product=product)
-        if not created:
-            item.quantity += qty
-        else:
-            item.price_snapshot = product.price
-            item.quantity = qty
-        item.save()
+        item = get_cart_store().add(cart, product, qty)
 
-        return Response(CartSerializer(cart, context={'request': request}).data)
+        return self._mutation_response(request, cart, item, item.pk)
 
     # 🔹 Update item quantity
     def partial_update(self, request, pk=None):
         cart = self._get_cart(request)
+        delta = self._int_field(request.data, 'delta', 0)
         try:
-            item = cart.items.get(pk=pk)
-        except CartItem.DoesNotExist:
+            item = get_cart_store().change(cart, pk, delta)
+        except (CartItem.DoesNotExist, ValueError):
             return Response({"detail": "Item not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        delta = int(request.data.get("delta", 0))
-        item.quantity += delta
-        if item.quantity <= 0:
-            item.delete()
-        else:
-            item.save()
-
-        return Response(CartSerializer(cart, context={'request': request}).data)
+        return self._mutation_response(request, cart, item, int(pk))
 
     # 🔹 Remove item
     def destroy(self, request, pk=None):
         cart = self._get_cart(request)
         try:
-            item = cart.items.get(pk=pk)
-            item.delete()
-        except CartItem.DoesNotExist:
+            get_cart_store().remove(cart, pk)
+        except (CartItem.DoesNotExist, ValueError):
             return Response({"detail": "Item not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        return Response(CartSerializer(cart, context={'request': request}).data)
+        return self._mutation_response(request, cart, None, int(pk))
+
+    # 🔹 Many add/set/remove operations at once, all or nothing
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        rows = request.data.get('operations') if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list) or not rows:
+            raise ValidationError({'operations': 'Send a non-empty list of operations.'})
+        if len(rows) > CART_BATCH_LIMIT:
+            raise ValidationError({'operations': f'At most {CART_BATCH_LIMIT} operations per request.'})
+
+        serializer = CartBatchOperationSerializer(data=rows, many=True)
+        if not serializer.is_valid():
+            raise ValidationError({'operations': serializer.errors})
+        operations = serializer.validated_data
+
+        prices = dict(
+            Product.objects.filter(pk__in={o['product'] for o in operations}).values_list('id', 'price')
+        )
+        errors = [
+            {'product': [f"No product {o['product']}."]} if o['product'] not in prices else {}
+            for o in operations
+        ]
+        if any(errors):
+            raise ValidationError({'operations': errors})
+
+        cart = self._get_cart(request)
+        get_cart_store().apply(cart, operations, prices)
+        return Response(self._cart_data(cart, request))
+
+# -------------------------------
+# Bootstrap View (home page data in one request)
+# -------------------------------
+class BootstrapView(APIView):
+    authentication_classes = [JWTAuthentication, SessionAuthentication]
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return Response(build_bootstrap(request))
+
+
+def build_bootstrap(request):
+    """
+    Cached catalog blob + the per-visitor cart summary (cached too, see core/cart.py).
+    Accepts a DRF Request or, from template views, a plain HttpRequest.
+    """
+    data = dict(get_catalog_bootstrap())
+    data["cart"] = cached_summary(request)
+    return data
 
 # -------------------------------
 # Checkout View
 # -------------------------------
-class CheckoutView(APIView):
+class CheckoutView(IdempotencyMixin, APIView):
     permission_classes = [IsCustomer]
 
     def post(self, request):
+        # 🔹 a retried checkout with the same Idempotency-Key gets the first order back
+        return self.idempotent(request, self.checkout)
+
+    def checkout(self, request):
         try:
-            cart = self._get_cart_for_request(request)
+            cart = get_or_create_cart(request)
+            # the order is built from CartItem rows: write back whatever the store still holds
+            get_cart_store().flush(cart)
             items = list(cart.items.select_related('product').all())
 
             if not items:
                 return Response({"detail": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST)
 
-            with transaction.atomic():
-                total_amount = Decimal("0.00")
-
-                # calculate total
-                for ci in items:
-                    if not getattr(ci, "product", None):
-                        return Response({"detail": f"CartItem {ci.id} missing product"}, status=status.HTTP_400_BAD_REQUEST)
-                    product_price = Decimal(ci.product.price or ci.price_snapshot or 0)
-                    qty = Decimal(ci.quantity or 0)
-                    total_amount += product_price * qty
+            missing = next((ci for ci in items if ci.product is None), None)
+            if missing is not None:
+                return Response({"detail": f"CartItem {missing.id} missing product"}, status=status.HTTP_400_BAD_REQUEST)
+
+            # build the order lines in memory, pricing every line once
+            lines = []
+            total_amount = Decimal("0.00")
+            for ci in items:
+                product = ci.product
+                price = Decimal(product.price or ci.price_snapshot or 0)
+                line_total = price * ci.quantity
+                total_amount += line_total
+                lines.append(CartOrderItems(
+                    product=product,
+                    item_status='pending',
+                    item=product.title,
+                    image=product.image or None,
+                    qty=ci.quantity,
+                    price=price,
+                    total=line_total,    # bulk_create skips CartOrderItems.save(), which would compute it
+                ))
 
+            with transaction.atomic():
                 # create order (not paid yet)
                 invoice = uuid.uuid4().hex[:12].upper()
                 order = CartOrder.objects.create(
@@ -182,37 +371,33 @@ class CheckoutView(APIView):
                     order_status='processing'
                 )
 
-                # create order items
-                for ci in items:
-                    product = ci.product
-                    CartOrderItems.objects.create(
-                        order=order,
-                        product=product,
-                        item_status='pending',
-                        item=product.title if product else str(ci),
-                        image=(product.image if getattr(product, 'image', None) else None),
-                        qty=ci.quantity,
-                        price=product.price if product else (ci.price_snapshot or 0),
-                        total=Decimal(ci.quantity) * Decimal(product.price if product else (ci.price_snapshot or 0))
-                    )
+                # take the units off stock now; one short line rolls the whole order back
+                reserve_stock(order, [(ci.product_id, ci.quantity) for ci in items])
+
+                for line in lines:
+                    line.order = order
+                CartOrderItems.objects.bulk_create(lines)
 
                 # ❌ DO NOT clear the cart here
 
-                serializer = CartOrderSerializer(order, context={'request': request})
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            # respond from the lines just written instead of reading them back;
+            # the nested products' images and tags are fetched in two queries
+            prefetch_related_objects([line.product for line in lines], 'productimages_set', 'tags')
+            order._prefetched_objects_cache = {'cartorderitems_set': lines}
+            serializer = CartOrderSerializer(order, context={'request': request})
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+        except OutOfStock as e:
+            return Response({
+                "detail": "Not enough stock",
+                "product": e.product_id,
+                "requested": e.requested,
+                "available": e.available,
+            }, status=status.HTTP_409_CONFLICT)
         except Exception as e:
             traceback.print_exc()
             return Response({"detail": "Internal server error", "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _get_cart_for_request(self, request):
-        if request.user.is_authenticated:
-            cart, _ = Cart.objects.get_or_create(user=request.user)
-        else:
-            sid = request.session.session_key or request.session.create() or request.session.session_key
-            cart, _ = Cart.objects.get_or_create(session_id=sid)
-        return cart
-
 # -------------------------------
 # Order ViewSet
 # -------------------------------
@@ -222,6 +407,14 @@ class OrderViewSet(viewsets.ModelViewSet):
     serializer_class = CartOrderSerializer
     queryset = CartOrder.objects.all().order_by('-order_date')
 
+    def get_queryset(self):
+        # 🔹 every order embeds its lines and their products: fetch them per page, not per row
+        return super().get_queryset().prefetch_related(
+            Prefetch('cartorderitems_set', queryset=CartOrderItems.objects.select_related('product').order_by('pk')),
+            'cartorderitems_set__product__productimages_set',
+            'cartorderitems_set__product__tags',
+        )
+
     def get_permissions(self):
         if self.action in ['update', 'partial_update', 'destroy']:
             return [permissions.IsAuthenticated(), IsOrderOwnerOrAdmin()]
@@ -237,20 +430,20 @@ class OrderViewSet(viewsets.ModelViewSet):
             return Response({"detail": "item_id and item_status required"}, status=400)
 
         try:
-            item = order.items.get(id=item_id)
-        except CartOrderItems.DoesNotExist:
+            item = order.cartorderitems_set.select_related('product__vendor').get(id=item_id)
+        except (CartOrderItems.DoesNotExist, ValueError):
             return Response({"detail": "Item not found in this order"}, status=404)
 
         # ✅ Admin can update any item
         if request.user.is_staff or request.user.is_superuser:
             item.item_status = new_status
-            item.save()
+            item.save(update_fields=["item_status"])
             return Response({"detail": f"Admin updated item {item.id} to {new_status}"})
 
         # ✅ Vendor can only update their own items
         if item.product.vendor and item.product.vendor.user == request.user:
             item.item_status = new_status
-            item.save()
+            item.save(update_fields=["item_status"])
             return Response({"detail": f"Vendor updated item {item.id} to {new_status}"})
 
         return Response({"detail": "Permission denied"}, status=403)
@@ -318,16 +511,37 @@ class AddressViewSet(viewsets.ModelViewSet):
 logger = logging.getLogger(__name__)   
     
 
-class CreateRazorpayOrderView(APIView):
+class CreateRazorpayOrderView(IdempotencyMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
+        return self.idempotent(request, self.create_order)
+
+    def create_order(self, request):
         try:
             order_id = request.data.get("order_id")
-            order = CartOrder.objects.get(id=order_id, user=request.user)
+            order = CartOrder.objects.select_related("payment").get(id=order_id, user=request.user)
+            payment = getattr(order, "payment", None)
+
+            if payment is not None and payment.status == "success":
+                return Response({"detail": "Order is already paid"}, status=status.HTTP_400_BAD_REQUEST)
+            if order.order_status == "cancelled":
+                return Response({"detail": "Order was cancelled"}, status=status.HTTP_400_BAD_REQUEST)
 
             amount_in_paise = int(order.price * 100)
 
+            # 🔹 a pending Razorpay order for the same amount is handed out again
+            # instead of opening a second one at the gateway
+            if (payment is not None and payment.status == "pending" and payment.razorpay_order_id
+                    and payment.amount == order.price):
+                return Response({
+                    "razorpay_key_id": settings.RAZORPAY_KEY_ID,
+                    "razorpay_order_id": payment.razorpay_order_id,
+                    "razorpay_amount": amount_in_paise,
+                    "razorpay_currency": "INR",
+                    "payment_id": payment.id
+                }, status=status.HTTP_200_OK)
+
             # ✅ Always create fresh client
             client = razorpay.Client(
                 auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
@@ -335,19 +549,23 @@ class CreateRazorpayOrderView(APIView):
 
             # ✅ Create Razorpay order
             razorpay_order = client.order.create({
-                "amount": 5000,
+                "amount": amount_in_paise,
                 "currency": "INR",
                 "payment_capture": "1"
             })
 
-            # ✅ Save Payment record
-            payment = Payment.objects.create(
+            # ✅ Save Payment record (an order has one Payment: a failed one is reused)
+            payment, _ = Payment.objects.update_or_create(
                 order=order,
-                user=request.user,
-                method="razorpay",
-                amount=order.price,
-                status="pending",
-                razorpay_order_id=razorpay_order["id"]
+                defaults={
+                    "user": request.user,
+                    "method": "razorpay",
+                    "amount": order.price,
+                    "status": "pending",
+                    "razorpay_order_id": razorpay_order["id"],
+                    "razorpay_payment_id": None,
+                    "razorpay_signature": None,
+                },
             )
 
             return Response({
@@ -392,14 +610,32 @@ class VerifyRazorpayPaymentView(APIView):
             
             client.utility.verify_payment_signature(params_dict)
 
-            # Update payment and order status
-            payment.status = "success"
+            order = payment.order
             payment.razorpay_payment_id = razorpay_payment_id
             payment.razorpay_signature = razorpay_signature
-            payment.save()
-
-            payment.order.paid_status = True
-            payment.order.save()
+            try:
+                with transaction.atomic():
+                    # 🔹 holds released while the customer was paying are taken again, or the payment is refused
+                    settle_order(order)
+
+                    # Update payment and order status
+                    payment.status = "success"
+                    payment.save()
+
+                    order.paid_status = True
+                    if order.order_status == "cancelled":     # cancelled by the reservation sweep
+                        order.order_status = "processing"
+                    order.save(update_fields=["paid_status", "order_status"])
+            except OutOfStock as e:
+                client.payment.refund(razorpay_payment_id, {"amount": int(payment.amount * 100)})
+                payment.status = "failed"
+                payment.save()
+                return Response({
+                    "detail": "The order expired and its items sold out; the payment has been refunded",
+                    "product": e.product_id,
+                    "requested": e.requested,
+                    "available": e.available,
+                }, status=status.HTTP_409_CONFLICT)
 
             # ✅ clear cart logic here
             Cart.objects.filter(user=request.user).delete()
@@ -411,6 +647,7 @@ class VerifyRazorpayPaymentView(APIView):
         except razorpay.errors.SignatureVerificationError:
             payment.status = "failed"
             payment.save()
+            release_order(payment.order)     # reserved units go back on sale
 
             # Serialize the failed payment object
             serializer = PaymentSerializer(payment)
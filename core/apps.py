@@ -5,6 +5,9 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
 
+    def ready(self):
+        import core.signals  # <-- keeps the search index in sync
 
 
-    
\ No newline at end of file
+
+    
@@ -0,0 +1,88 @@
+# core/bulk_updates.py
+"""
+Bulk repricing / status changes for vendors.
+
+All rows are validated first, the products they name are loaded with one
+query, and every real change is written with one bulk_update inside one
+transaction. Model signals do not fire for bulk_update, so the catalog
+version is bumped once here (price and status are not part of the search
+index, so nothing else needs refreshing).
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import catalog
+from .models import Product
+from .serializers import ProductBulkUpdateItemSerializer
+
+BULK_UPDATE_LIMIT = 5000
+BULK_UPDATE_BATCH_SIZE = 500
+
+UPDATABLE_FIELDS = ("price", "old_price", "product_status")
+
+
+def products_for(user):
+    """Products `user` may change: everything for staff, otherwise their vendor's."""
+    qs = Product.objects.all()
+    if not (user.is_staff or user.is_superuser):
+        qs = qs.filter(vendor__user=user)
+    return qs
+
+
+def apply_product_updates(rows, user):
+    """
+    Apply [{pid|sku, price?, old_price?, product_status?}, ...].
+    Returns one result per row, in order:
+        {"index": i, "status": "updated" | "unchanged" | "error", ...}
+    """
+    results = [None] * len(rows)
+    valid = []
+    for index, row in enumerate(rows):
+        serializer = ProductBulkUpdateItemSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = {"index": index, "status": "error", "errors": serializer.errors}
+
+    pids = {data["pid"] for _, data in valid if data.get("pid")}
+    skus = {data["sku"] for _, data in valid if data.get("sku") and not data.get("pid")}
+    products = products_for(user).filter(Q(pid__in=pids) | Q(sku__in=skus)).only(
+        "id", "pid", "sku", "updated_at", *UPDATABLE_FIELDS
+    )
+    by_pid, by_sku = {}, {}
+    for product in products:
+        by_pid[product.pid] = product
+        by_sku[product.sku] = product
+
+    now = timezone.now()
+    changed = {}
+    for index, data in valid:
+        key = data.get("pid") or data.get("sku")
+        product = by_pid.get(data["pid"]) if data.get("pid") else by_sku.get(data["sku"])
+        if product is None:
+            results[index] = {"index": index, "status": "error", "errors": {"product": [f"No product {key!r}."]}}
+            continue
+
+        changes = {
+            field: data[field]
+            for field in UPDATABLE_FIELDS
+            if field in data and getattr(product, field) != data[field]
+        }
+        result = {"index": index, "id": product.pk, "pid": product.pid, "sku": product.sku}
+        if not changes:
+            results[index] = {**result, "status": "unchanged"}
+            continue
+        for field, value in changes.items():
+            setattr(product, field, value)
+        product.updated_at = now
+        changed[product.pk] = product       # a product listed twice: the last row wins
+        results[index] = {**result, "status": "updated", "changes": changes}
+
+    if changed:
+        with transaction.atomic():
+            Product.objects.bulk_update(
+                changed.values(), [*UPDATABLE_FIELDS, "updated_at"], batch_size=BULK_UPDATE_BATCH_SIZE
+            )
+            catalog.bump_catalog_version()
+    return results
@@ -0,0 +1,281 @@
+# core/cart.py
+"""
+Cart helpers shared by the cart API, the checkout and the templates.
+
+Anonymous carts are keyed by session. The session key changes on login, so
+the key the cart was created under is also kept in the session data
+(SESSION_CART_KEY); the user_logged_in hook uses it to merge that cart into the
+user's cart.
+
+The header summary (lines, quantity, total, savings) is cached per user or
+session. Cart mutations drop the entry (see core/signals.py); savings depend on
+product prices, so the key also carries the catalog version.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Cart, CartItem
+
+ZERO = Decimal("0.00")
+
+SESSION_CART_KEY = "cart_sid"
+
+CART_SUMMARY_TIMEOUT = getattr(settings, "CART_SUMMARY_TIMEOUT", 60 * 60)
+
+
+def find_cart(request):
+    """
+    The cart of the current user or session, or None.
+    Unlike CartViewSet._get_cart this never creates a cart or a session.
+    """
+    if request.user.is_authenticated:
+        return Cart.objects.filter(user=request.user).first()
+    session_key = request.session.session_key
+    if not session_key:
+        return None
+    return Cart.objects.filter(session_id=session_key).first()
+
+
+def get_or_create_cart(request):
+    """The cart of the current user or session, created (with a session) if needed."""
+    if request.user.is_authenticated:
+        cart, _ = Cart.objects.get_or_create(user=request.user)
+        return cart
+    sid = request.session.session_key or request.session.create() or request.session.session_key
+    cart, created = Cart.objects.get_or_create(session_id=sid)
+    if created or request.session.get(SESSION_CART_KEY) != sid:
+        request.session[SESSION_CART_KEY] = sid
+    return cart
+
+
+def summarize_items(items):
+    """
+    Lines, quantity, total and savings of cart items in a single pass.
+    `items` should come with their product loaded (select/prefetch_related).
+    """
+    lines = 0
+    quantity = 0
+    total = ZERO
+    savings = ZERO
+    for item in items:
+        lines += 1
+        quantity += item.quantity
+        total += item.line_total
+        product = item.product
+        if product and product.old_price and item.price_snapshot:
+            savings += (product.old_price - item.price_snapshot) * item.quantity
+    return {
+        "lines": lines,
+        "quantity": quantity,
+        "total": total,
+        "savings": savings,
+    }
+
+
+def cart_summary(cart):
+    from .cart_store import get_cart_store     # cart_store builds on this module
+
+    if cart is None:
+        return summarize_items([])
+    return summarize_items(get_cart_store().lines(cart))
+
+
+# -------------------------------
+# Mutations
+# -------------------------------
+# "add" is one statement whether or not the cart already holds the product, so
+# concurrent adds neither lose units nor collide on unique_together(cart, product)
+ADD_SQL = """
+    INSERT INTO core_cartitem (cart_id, product_id, quantity, price_snapshot)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (cart_id, product_id) DO UPDATE SET quantity = core_cartitem.quantity + excluded.quantity
+"""
+
+# "set" writes an absolute quantity, creating the line if needed
+SET_SQL = """
+    INSERT INTO core_cartitem (cart_id, product_id, quantity, price_snapshot)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (cart_id, product_id) DO UPDATE SET quantity = excluded.quantity
+"""
+
+CART_BATCH_LIMIT = 500
+
+
+def _cart_changed(cart):
+    # what the CartItem signals do for model saves, which these statements bypass
+    Cart.objects.filter(pk=cart.pk).update(updated_at=timezone.now())
+    user_id, session_id = cart.user_id, cart.session_id
+    transaction.on_commit(lambda: forget_summary(user_id, session_id))
+
+
+def add_item(cart, product, quantity=1):
+    """Add `quantity` units of `product`; a new line takes the current price as its snapshot."""
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(ADD_SQL, [cart.pk, product.pk, quantity, product.price])
+        _cart_changed(cart)
+    return CartItem.objects.select_related("product").get(cart=cart, product=product)
+
+
+def change_quantity(cart, item_id, delta):
+    """
+    Add `delta` (may be negative) to a line with one conditional UPDATE. A line
+    that would drop to zero is deleted instead and None is returned.
+    Raises CartItem.DoesNotExist when the cart has no such line.
+    """
+    lines = CartItem.objects.filter(pk=item_id, cart=cart)
+    with transaction.atomic():
+        if lines.filter(quantity__gt=-delta).update(quantity=F("quantity") + delta):
+            _cart_changed(cart)
+            return lines.select_related("product").get()
+        # model delete: the CartItem signals touch the cart and drop the summary
+        deleted, _ = lines.filter(quantity__lte=-delta).delete()
+        if not deleted:
+            raise CartItem.DoesNotExist
+    return None
+
+
+def apply_operations(cart, operations, prices):
+    """
+    Apply validated [{"op": "add" | "set" | "remove", "product": id, "quantity": n}, ...]
+    in order, in one transaction. `prices` maps every product id to its price
+    (the snapshot of lines that get created).
+
+    The operations are folded per product first: a run of adds stays relative
+    (summed onto whatever the line holds at write time), anything after a set
+    or remove is absolute. That leaves at most three statements: the adds, the
+    sets and one DELETE.
+    """
+    final = {}      # product id → ("add", units) or ("set", quantity)
+    for operation in operations:
+        product_id = operation["product"]
+        if operation["op"] == "add":
+            kind, units = final.get(product_id, ("add", 0))
+            final[product_id] = (kind, units + operation["quantity"])
+        elif operation["op"] == "set":
+            final[product_id] = ("set", operation["quantity"])
+        else:
+            final[product_id] = ("set", 0)
+
+    adds = [(cart.pk, pk, units, prices[pk]) for pk, (kind, units) in final.items() if kind == "add"]
+    sets = [(cart.pk, pk, units, prices[pk]) for pk, (kind, units) in final.items() if kind == "set" and units]
+    removed = [pk for pk, (kind, units) in final.items() if kind == "set" and not units]
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            if adds:
+                cursor.executemany(ADD_SQL, adds)
+            if sets:
+                cursor.executemany(SET_SQL, sets)
+            if removed:
+                placeholders = ", ".join(["%s"] * len(removed))
+                cursor.execute(
+                    f"DELETE FROM {CartItem._meta.db_table} WHERE cart_id = %s AND product_id IN ({placeholders})",
+                    [cart.pk, *removed],
+                )
+        if final:
+            _cart_changed(cart)
+
+
+# -------------------------------
+# Cached summary for templates
+# -------------------------------
+def _owner_keys(user_id=None, session_id=None):
+    keys = []
+    if user_id:
+        keys.append(f"u{user_id}")
+    if session_id:
+        keys.append(f"s{session_id}")
+    return keys
+
+
+def _summary_key(owner):
+    from .catalog import catalog_version     # catalog → serializers → cart
+
+    return f"cart-summary:{catalog_version()}:{owner}"
+
+
+def cached_summary(request):
+    """
+    Summary of the current cart, from the cache when possible.
+    Never creates a cart or a session: visitors without one get an empty summary.
+    """
+    if request.user.is_authenticated:
+        owners = _owner_keys(user_id=request.user.pk)
+    else:
+        owners = _owner_keys(session_id=request.session.session_key)
+    if not owners:
+        return summarize_items([])
+
+    key = _summary_key(owners[0])
+    summary = cache.get(key)
+    if summary is None:
+        summary = cart_summary(find_cart(request))
+        cache.set(key, summary, CART_SUMMARY_TIMEOUT)
+    return summary
+
+
+def forget_summary(user_id=None, session_id=None):
+    owners = _owner_keys(user_id, session_id)
+    if owners:
+        cache.delete_many([_summary_key(owner) for owner in owners])
+
+
+# -------------------------------
+# Login merge
+# -------------------------------
+# one statement: every line of the session cart is added to the user's cart,
+# quantities summed where both hold the product (unique_together cart/product)
+MERGE_SQL = """
+    INSERT INTO core_cartitem (cart_id, product_id, quantity, price_snapshot)
+    SELECT %s, product_id, quantity, price_snapshot FROM core_cartitem WHERE cart_id = %s
+    ON CONFLICT (cart_id, product_id) DO UPDATE SET quantity = core_cartitem.quantity + excluded.quantity
+"""
+
+
+def merge_session_cart(session_id, user):
+    """
+    Move the anonymous cart of `session_id` into `user`'s cart, in a fixed
+    number of queries whatever the cart size. Returns the user's cart, or None
+    when there was nothing to merge.
+    """
+    from .cart_store import get_cart_store
+
+    if not session_id:
+        return None
+    store = get_cart_store()
+    with transaction.atomic():
+        session_cart = (
+            Cart.objects.select_for_update()
+            .filter(session_id=session_id, user__isnull=True)
+            .first()
+        )
+        if session_cart is None:
+            return None
+
+        user_cart = Cart.objects.select_for_update().filter(user=user).first()
+        # merge what the store holds, then let it reload the merged rows
+        for held in (session_cart, user_cart):
+            if held is not None:
+                store.flush(held)
+                transaction.on_commit(lambda held=held: store.forget(held))
+
+        if user_cart is None:
+            # nothing to merge with: the session cart becomes the user's cart
+            Cart.objects.filter(pk=session_cart.pk).update(user=user, session_id=None, updated_at=timezone.now())
+            user_cart = session_cart
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(MERGE_SQL, [user_cart.pk, session_cart.pk])
+                # raw delete: the lines now live in the user cart, no per-item signals needed
+                cursor.execute(f"DELETE FROM {CartItem._meta.db_table} WHERE cart_id = %s", [session_cart.pk])
+            Cart.objects.filter(pk=session_cart.pk).delete()
+            Cart.objects.filter(pk=user_cart.pk).update(updated_at=timezone.now())
+
+        transaction.on_commit(lambda: forget_summary(user.pk, session_id))
+    return user_cart
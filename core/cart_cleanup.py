@@ -0,0 +1,116 @@
+# core/cart_cleanup.py
+"""
+Garbage collection of carts nobody is coming back to.
+
+A cart is stale when
+    - it is anonymous and its session has expired or no longer exists
+      (database-backed sessions only; other engines rely on the idle rule),
+    - it is anonymous and has not changed for CART_IDLE_TTL, or
+    - it belongs to a user, is empty and has not changed for CART_IDLE_TTL.
+User carts that still hold items are never deleted, and neither is a cart
+whose lines the cart store holds but has not written back yet (its rows and
+updated_at say nothing about it).
+
+Stale carts are walked in primary-key order, CART_CLEANUP_BATCH_SIZE at a time.
+Each batch is one short transaction (raw DELETEs of the items, then the carts,
+so no per-row signals), which keeps SQLite's write lock brief and lets
+requests run between batches. An interrupted run loses at most the batch in
+flight: running it again simply carries on with what is left.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .cart_store import get_cart_store
+from .models import Cart, CartItem
+
+CART_IDLE_TTL = getattr(settings, "CART_IDLE_TTL", 60 * 60 * 24 * 30)
+CART_CLEANUP_BATCH_SIZE = 500
+
+DB_SESSION_ENGINES = (
+    "django.contrib.sessions.backends.db",
+    "django.contrib.sessions.backends.cached_db",
+)
+
+
+class CleanupResult:
+    def __init__(self):
+        self.anonymous_carts = 0
+        self.user_carts = 0
+        self.items = 0
+        self.batches = 0
+
+    @property
+    def carts(self):
+        return self.anonymous_carts + self.user_carts
+
+    def as_dict(self):
+        return {
+            "carts": self.carts,
+            "anonymous_carts": self.anonymous_carts,
+            "user_carts": self.user_carts,
+            "items": self.items,
+            "batches": self.batches,
+        }
+
+
+def stale_carts(now=None, idle_ttl=CART_IDLE_TTL):
+    now = now or timezone.now()
+    idle = Q(updated_at__lt=now - timedelta(seconds=idle_ttl))
+    anonymous = Q(user__isnull=True)
+    has_items = Exists(CartItem.objects.filter(cart=OuterRef("pk")))
+
+    rules = (anonymous & idle) | (~anonymous & idle & ~has_items)
+    if settings.SESSION_ENGINE in DB_SESSION_ENGINES:
+        live_session = Exists(Session.objects.filter(session_key=OuterRef("session_id"), expire_date__gt=now))
+        rules |= anonymous & ~live_session
+    return Cart.objects.filter(rules)
+
+
+def _delete(table, column, ids):
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", ids)
+        return cursor.rowcount
+
+
+def cleanup_carts(now=None, idle_ttl=CART_IDLE_TTL, batch_size=CART_CLEANUP_BATCH_SIZE,
+                  pause=0, max_batches=None, progress=None):
+    """
+    Delete stale carts and their items batch by batch. `pause` seconds are
+    slept between batches; `progress(result)` is called after each one.
+    """
+    store = get_cart_store()
+    now = now or timezone.now()       # one cutoff for the whole run
+    candidates = stale_carts(now, idle_ttl).order_by("pk")
+    result = CleanupResult()
+    last_pk = 0
+    while max_batches is None or result.batches < max_batches:
+        with transaction.atomic():
+            batch = list(candidates.filter(pk__gt=last_pk).values_list("pk", "user_id")[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            live = store.unflushed([pk for pk, _ in batch])
+            batch = [(pk, user_id) for pk, user_id in batch if pk not in live]
+            ids = [pk for pk, _ in batch]
+            if ids:
+                result.items += _delete(CartItem._meta.db_table, "cart_id", ids)
+                _delete(Cart._meta.db_table, "id", ids)
+        # raw DELETEs send no signals: drop what the store still keeps for these carts
+        store.forget_many(ids)
+
+        users = sum(1 for _, user_id in batch if user_id)
+        result.user_carts += users
+        result.anonymous_carts += len(batch) - users
+        result.batches += 1
+        if progress:
+            progress(result)
+        if pause:
+            time.sleep(pause)
+    return result
@@ -0,0 +1,243 @@
+# core/cart_store.py
+"""
+Where cart lines live.
+
+Every cart keeps its Cart row (id, owner, session); the store decides where
+its lines are read from and written to. settings.CART_STORE names the class:
+
+    core.cart_store.DatabaseCartStore   CartItem rows, every change written at
+                                        once (the default)
+    core.cart_store.CacheCartStore      lines kept in the Django cache and
+                                        written back to CartItem rows at
+                                        checkout, at login and at most every
+                                        CART_STORE_WRITE_BEHIND seconds
+
+Both hand out CartItem instances with their product loaded. attach_lines()
+makes them what cart.items.all() returns, so CartSerializer and the templates
+do not care which store is in use.
+
+In CacheCartStore a line's id is its product id: lines that were never
+written have no CartItem row, so no row id.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from . import cart as carts
+from .models import Cart, CartItem, Product
+
+CART_STORE = getattr(settings, "CART_STORE", "core.cart_store.DatabaseCartStore")
+CART_STORE_TIMEOUT = getattr(settings, "CART_STORE_TIMEOUT", 60 * 60 * 24 * 7)
+CART_STORE_WRITE_BEHIND = getattr(settings, "CART_STORE_WRITE_BEHIND", 60)
+
+# a lock nobody releases (crashed worker) expires after this many seconds
+CART_LOCK_TIMEOUT = 5
+
+
+def attach_lines(cart, lines):
+    """Make `lines` what cart.items.all() returns (Django's prefetch cache)."""
+    cart._prefetched_objects_cache = {**getattr(cart, "_prefetched_objects_cache", {}), "items": lines}
+    return cart
+
+
+class DatabaseCartStore:
+    """Lines are CartItem rows, changed with the single statements in core.cart."""
+
+    def lines(self, cart):
+        return list(cart.items.select_related("product").order_by("pk"))
+
+    def add(self, cart, product, quantity):
+        return carts.add_item(cart, product, quantity)
+
+    def change(self, cart, item_id, delta):
+        return carts.change_quantity(cart, item_id, delta)
+
+    def remove(self, cart, item_id):
+        # model delete: the CartItem signals touch the cart and drop the summary
+        cart.items.get(pk=item_id).delete()
+
+    def apply(self, cart, operations, prices):
+        carts.apply_operations(cart, operations, prices)
+
+    def modified(self, cart):
+        return cart.updated_at
+
+    def flush(self, cart):
+        """Rows are always current."""
+
+    def forget(self, cart):
+        """Nothing is held outside the database."""
+
+    def unflushed(self, cart_ids):
+        return set()
+
+    def forget_many(self, cart_ids):
+        """Nothing is held outside the database."""
+
+
+class CacheCartStore:
+    """
+    One cache entry per cart:
+        {"lines": {product id: [quantity, price_snapshot]}, "modified": ts, "flushed": ts}
+    loaded from the CartItem rows on a miss. Changes take a short cache lock
+    (cache.add) so concurrent requests for one cart do not lose updates.
+    """
+
+    def lines(self, cart):
+        state = self._load(cart)
+        products = Product.objects.in_bulk(list(state["lines"]))
+        return [
+            self._item(cart, products.get(product_id), product_id, quantity, price)
+            for product_id, (quantity, price) in state["lines"].items()
+            if product_id in products
+        ]
+
+    def add(self, cart, product, quantity):
+        with self._changing(cart) as state:
+            line = state["lines"].setdefault(product.pk, [0, product.price])
+            line[0] += quantity
+        return self._item(cart, product, product.pk, *line)
+
+    def change(self, cart, item_id, delta):
+        with self._changing(cart) as state:
+            line = state["lines"].get(self._product_id(item_id))
+            if line is None:
+                raise CartItem.DoesNotExist
+            line[0] += delta
+            if line[0] <= 0:
+                del state["lines"][self._product_id(item_id)]
+                return None
+        product = Product.objects.get(pk=self._product_id(item_id))
+        return self._item(cart, product, product.pk, *line)
+
+    def remove(self, cart, item_id):
+        with self._changing(cart) as state:
+            if state["lines"].pop(self._product_id(item_id), None) is None:
+                raise CartItem.DoesNotExist
+
+    def apply(self, cart, operations, prices):
+        with self._changing(cart) as state:
+            lines = state["lines"]
+            for operation in operations:
+                product_id, quantity = operation["product"], operation.get("quantity", 0)
+                if operation["op"] == "add":
+                    lines.setdefault(product_id, [0, prices[product_id]])[0] += quantity
+                elif operation["op"] == "set" and quantity:
+                    lines.setdefault(product_id, [0, prices[product_id]])[0] = quantity
+                else:
+                    lines.pop(product_id, None)
+
+    def modified(self, cart):
+        return datetime.fromtimestamp(self._load(cart)["modified"], tz=dt_timezone.utc)
+
+    def flush(self, cart):
+        with self._locked(cart):
+            state = cache.get(self._key(cart))
+            if state is not None:
+                self._write(cart, state)
+                cache.set(self._key(cart), state, CART_STORE_TIMEOUT)
+
+    def forget(self, cart):
+        cache.delete(self._key(cart))
+
+    def unflushed(self, cart_ids):
+        """The carts among `cart_ids` whose CartItem rows lag behind their cached lines."""
+        keys = {self._key(Cart(pk=pk)): pk for pk in cart_ids}
+        return {keys[key] for key, state in cache.get_many(keys).items() if state["modified"] > state["flushed"]}
+
+    def forget_many(self, cart_ids):
+        cache.delete_many([self._key(Cart(pk=pk)) for pk in cart_ids])
+
+    # -------------------------------
+    # Internals
+    # -------------------------------
+    @staticmethod
+    def _key(cart):
+        return f"cart-store:{cart.pk}"
+
+    @staticmethod
+    def _product_id(item_id):
+        try:
+            return int(item_id)
+        except (TypeError, ValueError):
+            raise CartItem.DoesNotExist
+
+    @staticmethod
+    def _item(cart, product, product_id, quantity, price):
+        return CartItem(pk=product_id, cart=cart, product=product, quantity=quantity, price_snapshot=price)
+
+    def _load(self, cart):
+        state = cache.get(self._key(cart))
+        if state is None:
+            rows = cart.items.order_by("pk").values_list("product_id", "quantity", "price_snapshot")
+            now = time.time()
+            state = {
+                "lines": {product_id: [quantity, price] for product_id, quantity, price in rows if product_id},
+                "modified": cart.updated_at.timestamp() if cart.updated_at else now,
+                "flushed": now,
+            }
+            cache.add(self._key(cart), state, CART_STORE_TIMEOUT)
+        return state
+
+    @contextmanager
+    def _locked(self, cart):
+        lock = f"{self._key(cart)}:lock"
+        token = f"{threading.get_ident()}:{time.monotonic()}"
+        while not cache.add(lock, token, CART_LOCK_TIMEOUT):
+            time.sleep(0.005)
+        try:
+            yield
+        finally:
+            if cache.get(lock) == token:
+                cache.delete(lock)
+
+    @contextmanager
+    def _changing(self, cart):
+        with self._locked(cart):
+            state = self._load(cart)
+            yield state
+            state["modified"] = time.time()
+            if state["modified"] - state["flushed"] >= CART_STORE_WRITE_BEHIND:
+                self._write(cart, state)
+            cache.set(self._key(cart), state, CART_STORE_TIMEOUT)
+        carts.forget_summary(cart.user_id, cart.session_id)
+
+    def _write(self, cart, state):
+        """Make the CartItem rows match `state`: one upsert for every line, one DELETE for the rest."""
+        lines = state["lines"]
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                if lines:
+                    cursor.executemany(
+                        carts.SET_SQL,
+                        [(cart.pk, product_id, quantity, price) for product_id, (quantity, price) in lines.items()],
+                    )
+                    placeholders = ", ".join(["%s"] * len(lines))
+                    cursor.execute(
+                        f"DELETE FROM {CartItem._meta.db_table} WHERE cart_id = %s AND product_id NOT IN ({placeholders})",
+                        [cart.pk, *lines],
+                    )
+                else:
+                    cursor.execute(f"DELETE FROM {CartItem._meta.db_table} WHERE cart_id = %s", [cart.pk])
+            modified = datetime.fromtimestamp(state["modified"], tz=dt_timezone.utc)
+            Cart.objects.filter(pk=cart.pk).update(updated_at=modified)
+        state["flushed"] = time.time()
+
+
+# -------------------------------
+# The configured store
+# -------------------------------
+_stores = {}
+
+
+def get_cart_store(path=None):
+    path = path or getattr(settings, "CART_STORE", CART_STORE)
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
@@ -0,0 +1,276 @@
+# core/catalog.py
+"""
+Read-side helpers for catalog data that is expensive to build and rarely changes.
+
+Everything cached here is keyed on the catalog version, a counter in the cache
+that core/signals.py bumps whenever a Product, ProductImages, Category, Tags or
+Vendor row changes. Bumping the version orphans every old entry at once, so
+nothing has to be deleted key by key; stale entries simply expire.
+"""
+import hashlib
+import time
+from decimal import Decimal, ROUND_HALF_UP
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.urls import reverse
+from rest_framework.response import Response
+
+from .conditional import make_etag, not_modified_response, set_validators
+from .models import Category, Product
+from .pagination import ProductCursorPagination
+from .serializers import CategorySerializer, ProductCardSerializer, CARD_DEFERRED_FIELDS
+
+CATALOG_VERSION_KEY = "catalog:version"
+CATALOG_MODIFIED_KEY = "catalog:modified"
+CATEGORY_TREE_CACHE_KEY = "catalog:category_tree"
+
+# pack sizes offered per category; the first key found in the lower-cased
+# category title wins, anything else is sold per piece
+CATEGORY_UNITS = (
+    ("vegetables", ("250 g", "500 g", "1 kg")),
+    ("fruits", ("250 g", "500 g", "1 kg")),
+    ("cereals", ("500 g", "1 kg", "5 kg")),
+    ("bakery", ("1 packet",)),
+    ("dairy", ("1 packet",)),
+    ("snacks", ("1 packet",)),
+)
+DEFAULT_UNITS = ("1 pc",)
+
+HOME_RAIL_COUNT = 6
+HOME_RAIL_SIZE = 12
+SIMILAR_PRODUCTS_SIZE = 12
+
+BOOTSTRAP_CACHE_KEY = "catalog:bootstrap"
+BOOTSTRAP_PAGE_SIZE = 24
+BOOTSTRAP_FEATURED_SIZE = 12
+
+CATALOG_CACHE_TIMEOUT = getattr(settings, "CATALOG_CACHE_TIMEOUT", 60 * 5)
+
+
+def catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def catalog_last_modified():
+    """Unix timestamp of the last catalog change (or of the first read after a cache flush)."""
+    modified = cache.get(CATALOG_MODIFIED_KEY)
+    if modified is None:
+        cache.add(CATALOG_MODIFIED_KEY, int(time.time()), None)
+        modified = cache.get(CATALOG_MODIFIED_KEY, int(time.time()))
+    return modified
+
+
+def _incr_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        # key evicted or never set: any value different from what readers saw will do
+        cache.add(CATALOG_VERSION_KEY, 1, None)
+        cache.incr(CATALOG_VERSION_KEY)
+    cache.set(CATALOG_MODIFIED_KEY, int(time.time()), None)
+
+
+def bump_catalog_version():
+    """
+    Invalidate every catalog cache entry.
+    Inside a transaction the bump waits for the commit, otherwise a reader could
+    cache the old rows under the new version.
+    """
+    if connection.in_atomic_block:
+        transaction.on_commit(_incr_catalog_version)
+    else:
+        _incr_catalog_version()
+
+
+def catalog_cache_key(request, prefix="catalog:response"):
+    """Cache key for a GET request: version + host + path + sorted query params."""
+    params = urlencode(sorted(
+        (key, value) for key, values in request.query_params.lists() for value in values
+    ))
+    raw = f"{request.get_host()}{request.path}?{params}"
+    digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+    return f"{prefix}:v{catalog_version()}:{digest}"
+
+
+class CatalogCacheMixin:
+    """
+    Serve list/retrieve of a public, user-independent viewset from the cache.
+    Extra actions can opt in with `return self.catalog_cached(request, handler)`.
+    Only successful responses are stored.
+
+    Responses carry an ETag (cache key + renderer) and Last-Modified (last catalog
+    change); a matching If-None-Match / If-Modified-Since gets a bare 304.
+    """
+
+    def catalog_cached(self, request, handler, *args, **kwargs):
+        key = catalog_cache_key(request)
+        etag = make_etag(key, request.accepted_renderer.format)
+        last_modified = catalog_last_modified()
+
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        data = cache.get(key)
+        if data is not None:
+            return set_validators(Response(data), etag, last_modified)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, CATALOG_CACHE_TIMEOUT)
+            set_validators(response, etag, last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.catalog_cached(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.catalog_cached(request, super().retrieve, *args, **kwargs)
+
+
+def get_category_tree():
+    """
+    Whole category tree as nested dicts, built from one query ordered by path
+    (a parent always sorts before its children). Cached per catalog version.
+    """
+    key = f"{CATEGORY_TREE_CACHE_KEY}:v{catalog_version()}"
+    tree = cache.get(key)
+    if tree is not None:
+        return tree
+
+    nodes = {}
+    tree = []
+    for category in Category.objects.order_by('path'):
+        node = dict(CategorySerializer(category).data, depth=category.depth, children=[])
+        nodes[category.pk] = node
+        parent = nodes.get(category.parent_id)
+        (parent['children'] if parent else tree).append(node)
+
+    cache.set(key, tree, CATALOG_CACHE_TIMEOUT)
+    return tree
+
+
+def get_catalog_bootstrap():
+    """
+    Everything the home page needs from the catalog in one cached blob:
+    the category tree, featured products and the first page of new products
+    (with the cursor URL of the next page). URLs are relative so the blob can
+    be shared between hosts and embedded in templates.
+    Nothing comes from the request: the blob is shared by every visitor.
+    """
+    key = f"{BOOTSTRAP_CACHE_KEY}:v{catalog_version()}"
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    products = Product.objects.defer(*CARD_DEFERRED_FIELDS)
+    featured = products.filter(featured=True).order_by("-date", "-id")[:BOOTSTRAP_FEATURED_SIZE]
+
+    # first page of the regular product list, fixed size and never from a ?cursor=;
+    # the next link is encoded the way the product list pages
+    paginator = ProductCursorPagination()
+    paginator.base_url = reverse("product-list")
+    rows = list(products.order_by(*paginator.ordering)[:BOOTSTRAP_PAGE_SIZE + 1])
+    page = rows[:BOOTSTRAP_PAGE_SIZE]
+    next_link = paginator.link_after(page[-1]) if len(rows) > len(page) else None
+
+    data = {
+        "categories": get_category_tree(),
+        "featured": ProductCardSerializer(featured, many=True).data,
+        "products": {
+            "results": ProductCardSerializer(page, many=True).data,
+            "next": next_link,
+        },
+    }
+    cache.set(key, data, CATALOG_CACHE_TIMEOUT)
+    return data
+
+
+# -------------------------------
+# Server-rendered grid
+# -------------------------------
+def units_for_category(category_title):
+    title = (category_title or "").lower()
+    for key, units in CATEGORY_UNITS:
+        if key in title:
+            return units
+    return DEFAULT_UNITS
+
+
+def unit_multiplier(label):
+    """ "500 g" → 0.5, "5 kg" → 5, packets and pieces → 1 """
+    label = (label or "").lower()
+    amount = label.split(" ")[0]
+    try:
+        amount = Decimal(amount)
+    except ArithmeticError:
+        return Decimal(1)
+    if "kg" in label:
+        return amount
+    if label.endswith(" g"):
+        return amount / 1000
+    return Decimal(1)
+
+
+def unit_options(price, old_price, category_title):
+    """Pack sizes for a product card with scaled prices and the discount of each."""
+    cents = Decimal("0.01")
+    price = Decimal(str(price))
+    old_price = Decimal(str(old_price)) if old_price else None
+    options = []
+    for label in units_for_category(category_title):
+        mult = unit_multiplier(label)
+        unit_price = (price * mult).quantize(cents, ROUND_HALF_UP)
+        unit_old = (old_price * mult).quantize(cents, ROUND_HALF_UP) if old_price else None
+        discount = 0
+        if unit_old and unit_old > unit_price:
+            discount = int(((unit_old - unit_price) / unit_old * 100).quantize(Decimal(1), ROUND_HALF_UP))
+        options.append({"label": label, "price": unit_price, "old_price": unit_old, "discount": discount})
+    return options
+
+
+def category_titles():
+    """{category id: title} from the cached tree."""
+    titles = {}
+    stack = list(get_category_tree())
+    while stack:
+        node = stack.pop()
+        titles[node["id"]] = node["title"]
+        stack += node["children"]
+    return titles
+
+
+def get_home_rails():
+    """One rail of newest products per top-level category (whole subtree)."""
+    rails = []
+    roots = Category.objects.filter(parent__isnull=True).order_by("title")[:HOME_RAIL_COUNT]
+    for category in roots:
+        products = (
+            Product.objects.filter(category.subtree_q(prefix="category__"))
+            .defer(*CARD_DEFERRED_FIELDS)
+            .order_by("-date", "-id")[:HOME_RAIL_SIZE]
+        )
+        cards = ProductCardSerializer(products, many=True).data
+        if cards:
+            rails.append({"category": CategorySerializer(category).data, "products": cards})
+    return rails
+
+
+def get_similar_products(product):
+    """Newest products from the same category, the product itself excluded."""
+    if not product.category_id:
+        return []
+    products = (
+        Product.objects.filter(category_id=product.category_id)
+        .exclude(pk=product.pk)
+        .defer(*CARD_DEFERRED_FIELDS)
+        .order_by("-date", "-id")[:SIMILAR_PRODUCTS_SIZE]
+    )
+    return ProductCardSerializer(products, many=True).data
@@ -0,0 +1,35 @@
+# core/conditional.py
+"""
+ETag / Last-Modified helpers for conditional GETs.
+
+Validators are derived from version counters and timestamps that are cheap to
+read (the catalog version, Cart.updated_at), so a matching If-None-Match can be
+answered with 304 before any queryset is evaluated or serialized.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Strong ETag from the given parts (versions, ids, renderer format...)."""
+    raw = "|".join(str(part) for part in parts)
+    return '"%s"' % hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def set_validators(response, etag, last_modified, public=True):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    # clients may keep the body but must revalidate before reusing it
+    patch_cache_control(response, no_cache=True, **({"public": True} if public else {"private": True}))
+    return response
+
+
+def not_modified_response(request, etag, last_modified, public=True):
+    """304 response when the client's copy is current, otherwise None."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified, public=public)
+    return response
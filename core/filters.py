@@ -0,0 +1,150 @@
+# core/filters.py
+"""
+Product list filters and facet counts used by ProductViewSet.
+
+Query params (all optional, lists accept repeats or commas):
+    brand=fresho!,Amul      tags=3,organic      product_status=active
+    min_price=10            max_price=250       featured=true
+    min_discount=20         (percent off old_price)
+
+Sorting: sort=newest (default) or sort=rating, see PRODUCT_SORTS.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Q
+from rest_framework.exceptions import ValidationError
+
+from .models import Product
+
+# upper bounds are exclusive, None = open ended
+PRICE_BUCKETS = (
+    (0, 50),
+    (50, 100),
+    (100, 200),
+    (200, 500),
+    (500, None),
+)
+
+# ?sort= → ordering; every ordering ends in a unique field, and ProductCursorPagination
+# keys its cursor on the whole tuple, so ties (every unrated product) never page by OFFSET
+PRODUCT_SORTS = {
+    "newest": ("-date", "-id"),
+    "rating": ("-rating_avg", "-rating_count", "-id"),   # stored aggregates, see core/ratings.py
+}
+
+TRUE_VALUES = ("1", "true", "True", "yes")
+FALSE_VALUES = ("0", "false", "False", "no")
+
+
+def _param_list(params, name):
+    values = []
+    for raw in params.getlist(name):
+        values += [v.strip() for v in raw.split(",") if v.strip()]
+    return values
+
+
+def _decimal_param(params, name):
+    raw = params.get(name)
+    if raw in (None, ""):
+        return None
+    try:
+        return Decimal(raw)
+    except InvalidOperation:
+        raise ValidationError({name: "Must be a number."})
+
+
+def sort_ordering(params):
+    """Ordering for ?sort=, or None when the caller's default applies."""
+    sort = params.get("sort")
+    if not sort:
+        return None
+    if sort not in PRODUCT_SORTS:
+        raise ValidationError({"sort": f"Must be one of: {', '.join(PRODUCT_SORTS)}."})
+    return PRODUCT_SORTS[sort]
+
+
+def discount_expression():
+    """Percentage off old_price, only meaningful where old_price > price."""
+    return ExpressionWrapper(
+        (F("old_price") - F("price")) * 100.0 / F("old_price"),
+        output_field=FloatField(),
+    )
+
+
+def filter_products(qs, params):
+    brands = _param_list(params, "brand")
+    if brands:
+        qs = qs.filter(brand__in=brands)
+
+    min_price = _decimal_param(params, "min_price")
+    if min_price is not None:
+        qs = qs.filter(price__gte=min_price)
+    max_price = _decimal_param(params, "max_price")
+    if max_price is not None:
+        qs = qs.filter(price__lte=max_price)
+
+    tags = _param_list(params, "tags")
+    if tags:
+        ids = [t for t in tags if t.isdigit()]
+        names = [t for t in tags if not t.isdigit()]
+        # subquery on the through table → no duplicate rows, no DISTINCT needed
+        links = Product.tags.through.objects.filter(Q(tags_id__in=ids) | Q(tags__name__in=names))
+        qs = qs.filter(pk__in=links.values("product_id"))
+
+    statuses = _param_list(params, "product_status")
+    if statuses:
+        qs = qs.filter(product_status__in=statuses)
+
+    featured = params.get("featured")
+    if featured in TRUE_VALUES:
+        qs = qs.filter(featured=True)
+    elif featured in FALSE_VALUES:
+        qs = qs.filter(featured=False)
+
+    min_discount = _decimal_param(params, "min_discount")
+    if min_discount is not None:
+        qs = qs.filter(old_price__gt=F("price")).alias(discount=discount_expression())
+        qs = qs.filter(discount__gte=float(min_discount))
+
+    return qs
+
+
+def facet_counts(qs):
+    """
+    Counts per brand, per tag and per price bucket for the products in `qs`.
+    One aggregated query per facet, however many values each facet has.
+    """
+    matching = Product.objects.filter(pk__in=qs.order_by().values("pk"))
+
+    brands = (
+        matching.order_by()
+        .values("brand")
+        .annotate(count=Count("id"))
+        .order_by("-count", "brand")
+    )
+
+    tags = (
+        Product.tags.through.objects.filter(product_id__in=matching.values("pk"))
+        .values("tags_id", "tags__name")
+        .annotate(count=Count("product_id"))
+        .order_by("-count", "tags__name")
+    )
+
+    bucket_aggregates = {}
+    for i, (low, high) in enumerate(PRICE_BUCKETS):
+        condition = Q(price__gte=low)
+        if high is not None:
+            condition &= Q(price__lt=high)
+        bucket_aggregates[f"bucket_{i}"] = Count("id", filter=condition)
+    bucket_aggregates["total"] = Count("id")
+    price_counts = matching.aggregate(**bucket_aggregates)
+
+    return {
+        "total": price_counts["total"],
+        "brands": [{"brand": b["brand"], "count": b["count"]} for b in brands],
+        "tags": [{"id": t["tags_id"], "name": t["tags__name"], "count": t["count"]} for t in tags],
+        "price": [
+            {"min": low, "max": high, "count": price_counts[f"bucket_{i}"]}
+            for i, (low, high) in enumerate(PRICE_BUCKETS)
+        ],
+    }
@@ -0,0 +1,128 @@
+# core/idempotency.py
+"""
+Idempotency-Key support for endpoints that must not run twice.
+
+A client that may retry (timeouts on mobile networks) sends a unique
+`Idempotency-Key` header. The first request with a key runs normally and its
+response is stored in IdempotencyKey; a retry with the same key gets that
+response back (with `Idempotent-Replayed: true`) after a single indexed
+lookup, without running the view again.
+
+    - same key while the first request is still running   → 409
+    - same key with a different request body               → 422
+    - first request failed with a 5xx or raised            → key is freed, a retry runs again
+    - first request never finished (worker killed)         → after IDEMPOTENCY_LEASE a retry takes the key over
+
+Keys are per user and per view, and expire after IDEMPOTENCY_KEY_TTL.
+Requests without the header, or from anonymous users, are not tracked.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_TTL = getattr(settings, "IDEMPOTENCY_KEY_TTL", 60 * 60 * 24)
+# a request still "running" after this many seconds is taken to be dead
+IDEMPOTENCY_LEASE = getattr(settings, "IDEMPOTENCY_LEASE", 60)
+IDEMPOTENCY_KEY_MAX_LENGTH = IdempotencyKey._meta.get_field("key").max_length
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder, default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()
+
+
+def purge_expired(now=None):
+    cutoff = (now or timezone.now()) - timedelta(seconds=IDEMPOTENCY_KEY_TTL)
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+class IdempotencyMixin:
+    """
+    Opt a handler in with `return self.idempotent(request, handler)`:
+
+        def post(self, request):
+            return self.idempotent(request, self.create_order)
+    """
+
+    def idempotency_scope(self):
+        return type(self).__name__
+
+    def idempotent(self, request, handler, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or not request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return Response(
+                {"detail": f"{IDEMPOTENCY_HEADER} is at most {IDEMPOTENCY_KEY_MAX_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        lookup = {"user": request.user, "scope": self.idempotency_scope(), "key": key}
+        fingerprint = request_fingerprint(request)
+
+        record = IdempotencyKey.objects.filter(**lookup).first()
+        if record is not None and record.created_at < timezone.now() - timedelta(seconds=IDEMPOTENCY_KEY_TTL):
+            record.delete()
+            record = None
+        if record is not None:
+            if record.request_hash != fingerprint or record.status_code is not None:
+                return self._replay(record, fingerprint)
+            if not self._take_over(record):
+                return self._in_progress()
+        else:
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(request_hash=fingerprint, **lookup)
+            except IntegrityError:
+                # a concurrent request with the same key got there first
+                return self._in_progress()
+
+        try:
+            response = handler(request, *args, **kwargs)
+        except BaseException:
+            record.delete()
+            raise
+        if response.status_code >= 500:
+            record.delete()
+            return response
+
+        record.status_code = response.status_code
+        record.response = response.data
+        record.save(update_fields=["status_code", "response"])
+        return response
+
+    def _replay(self, record, fingerprint):
+        if record.request_hash != fingerprint:
+            return Response(
+                {"detail": f"This {IDEMPOTENCY_HEADER} was already used for a different request."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return Response(record.response, status=record.status_code, headers={"Idempotent-Replayed": "true"})
+
+    def _take_over(self, record):
+        """Claim a record whose request outlived its lease; only one retry can win it."""
+        now = timezone.now()
+        if record.created_at > now - timedelta(seconds=IDEMPOTENCY_LEASE):
+            return False
+        claimed = IdempotencyKey.objects.filter(
+            pk=record.pk, status_code__isnull=True, created_at=record.created_at
+        ).update(created_at=now)
+        record.created_at = now
+        return bool(claimed)
+
+    def _in_progress(self):
+        return Response(
+            {"detail": f"A request with this {IDEMPOTENCY_HEADER} is still being processed."},
+            status=status.HTTP_409_CONFLICT,
+        )
@@ -0,0 +1,136 @@
+# core/images.py
+"""
+Resized variants of catalog images.
+
+Every product, product gallery, category and vendor image gets a WebP and a
+JPEG copy at each width in IMAGE_VARIANT_WIDTHS, stored next to the original:
+
+    user_directory_path/apple.png  →  user_directory_path/apple_320w.webp
+                                      user_directory_path/apple_320w.jpg  ...
+
+Names are derived from the original, so URLs and srcset strings are built
+from the name; the only storage call is one exists() check per image, so a
+srcset is never handed out for variants that were not written (rows from
+before the backfill, failed generations). Variants are written after an
+upload is committed (see core/signals.py) or an import batch is committed
+(see core/importers.py) and can be backfilled with
+`python manage.py generate_image_variants`.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+IMAGE_VARIANT_WIDTHS = tuple(sorted(getattr(settings, "IMAGE_VARIANT_WIDTHS", (160, 320, 640))))
+
+# extension → Pillow format and save options
+VARIANT_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+# model label → image field that gets variants
+IMAGE_FIELDS = {
+    "core.Product": "image",
+    "core.ProductImages": "images",
+    "core.Category": "image",
+    "core.Vendor": "image",
+}
+
+
+def variant_name(name, width, ext):
+    root, _ = os.path.splitext(name)
+    return f"{root}_{width}w.{ext}"
+
+
+def _absolute(url, request):
+    return request.build_absolute_uri(url) if request else url
+
+
+def image_srcsets(fieldfile, request=None):
+    """
+    {"webp": "<url> 160w, <url> 320w, ...", "jpg": "..."} for a <picture>,
+    or None when there is no image or its variants have not been generated.
+    """
+    if not fieldfile or not fieldfile.name or not has_variants(fieldfile):
+        return None
+    storage = fieldfile.storage
+    return {
+        ext: ", ".join(
+            f"{_absolute(storage.url(variant_name(fieldfile.name, width, ext)), request)} {width}w"
+            for width in IMAGE_VARIANT_WIDTHS
+        )
+        for ext in VARIANT_FORMATS
+    }
+
+
+def thumbnail_url(fieldfile):
+    """Smallest JPEG variant if it has been generated, otherwise the original."""
+    if not fieldfile or not fieldfile.name:
+        return ""
+    name = variant_name(fieldfile.name, IMAGE_VARIANT_WIDTHS[0], "jpg")
+    if fieldfile.storage.exists(name):
+        return fieldfile.storage.url(name)
+    return fieldfile.url
+
+
+def has_variants(fieldfile):
+    # the largest JPEG is written last, so it only exists once the set is complete
+    name = variant_name(fieldfile.name, IMAGE_VARIANT_WIDTHS[-1], "jpg")
+    return fieldfile.storage.exists(name)
+
+
+def generate_variants(fieldfile, force=False):
+    """
+    Write every missing variant of `fieldfile` (all of them with force=True).
+    Images are never upscaled: a width above the original just keeps the original size.
+    Returns the number of files written.
+    """
+    if not fieldfile or not fieldfile.name:
+        return 0
+    storage = fieldfile.storage
+
+    with storage.open(fieldfile.name, "rb") as fh:
+        original = Image.open(fh)
+        original = ImageOps.exif_transpose(original)
+        original.load()
+
+    written = 0
+    for width in IMAGE_VARIANT_WIDTHS:
+        if original.width > width:
+            height = max(1, round(original.height * width / original.width))
+            resized = original.resize((width, height), Image.LANCZOS)
+        else:
+            resized = original
+        for ext, (fmt, options) in VARIANT_FORMATS.items():
+            name = variant_name(fieldfile.name, width, ext)
+            if storage.exists(name):
+                if not force:
+                    continue
+                storage.delete(name)
+            image = resized
+            if fmt == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            elif image.mode not in ("RGB", "RGBA", "L", "LA"):
+                image = image.convert("RGBA")
+            buffer = BytesIO()
+            image.save(buffer, fmt, **options)
+            storage.save(name, ContentFile(buffer.getvalue()))
+            written += 1
+    return written
+
+
+def ensure_variants(fieldfile):
+    """Generate missing variants, logging (not raising) on unreadable or missing files."""
+    if not fieldfile or not fieldfile.name or has_variants(fieldfile):
+        return 0
+    try:
+        return generate_variants(fieldfile)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning("Could not generate variants for %s: %s", fieldfile.name, exc)
+        return 0
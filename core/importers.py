@@ -0,0 +1,315 @@
+# core/importers.py
+"""
+Streaming bulk import of products from CSV or JSON Lines.
+
+Rows are read one at a time (the file is never loaded whole), validated,
+and written in batches: one bulk_create for the products and one for their
+tag links per batch, each batch in its own transaction. Categories and tags
+are resolved from in-memory lookups built once per import.
+
+bulk_create skips model signals, so the importer does their work itself:
+search-index rows and image variants per batch, one catalog version bump and
+one suggest-index reset at the end.
+
+Columns (CSV header or JSON keys); only title and price are required:
+    title, price, old_price, brand, description, specifications,
+    product_status, featured, highlights, category, tags, image, sku
+    category    id, cid or title of an existing category
+    tags        names separated by "|" or "," (JSON: a list); new names are created
+    highlights  JSON list, or items separated by "|"
+"""
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from . import catalog, images, search, suggest
+from .models import Category, Product, Tags
+
+IMPORT_BATCH_SIZE = 1000
+
+# errors returned to API callers; the command can write all of them
+ERROR_REPORT_LIMIT = 100
+
+FORMATS = ("csv", "jsonl")
+
+TRUE_VALUES = ("1", "true", "yes", "y")
+
+FIELD_LIMITS = {
+    "title": Product._meta.get_field("title").max_length,
+    "brand": Product._meta.get_field("brand").max_length,
+    "sku": Product._meta.get_field("sku").max_length,
+}
+STATUS_CHOICES = {value for value, _ in Product._meta.get_field("product_status").choices}
+DEFAULT_STATUS = Product._meta.get_field("product_status").default
+DEFAULT_IMAGE = Product._meta.get_field("image").default
+
+
+class RowError(Exception):
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def detect_format(filename, default="csv"):
+    name = (filename or "").lower()
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".csv"):
+        return "csv"
+    return default
+
+
+def iter_rows(lines, fmt):
+    """
+    (line number, dict or None, parse error or None) for every record.
+    `lines` is any iterable of bytes or str lines: an open file or an UploadedFile.
+    """
+    text = (line.decode("utf-8-sig") if isinstance(line, bytes) else line for line in lines)
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_no, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Each line must be a JSON object."
+            continue
+        yield line_no, row, None
+
+
+def _text(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def _split(value):
+    if isinstance(value, (list, tuple)):
+        return [_text(v) for v in value if _text(v)]
+    text = _text(value).replace("|", ",")
+    return [part.strip() for part in text.split(",") if part.strip()]
+
+
+def _decimal(value, name, errors, required=False):
+    text = _text(value)
+    if not text:
+        if required:
+            errors[name] = "This field is required."
+        return None
+    try:
+        number = Decimal(text)
+    except InvalidOperation:
+        errors[name] = "Must be a number."
+        return None
+    if not number.is_finite() or number < 0 or number >= Decimal("1e8"):
+        errors[name] = "Must be between 0 and 99999999.99."
+        return None
+    return number.quantize(Decimal("0.01"))
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []        # [{"line": n, "errors": {field: message}}]
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        self.errors.append({"line": line, "errors": errors})
+
+    def as_dict(self, error_limit=ERROR_REPORT_LIMIT):
+        return {
+            "created": self.created,
+            "failed": self.failed,
+            "errors": self.errors[:error_limit],
+            "errors_truncated": len(self.errors) > error_limit,
+        }
+
+
+class ProductImporter:
+    """
+    importer = ProductImporter(user=request.user, vendor=vendor)
+    result = importer.run(uploaded_file, "csv")
+    """
+
+    def __init__(self, user=None, vendor=None, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+        self.user = user
+        self.vendor = vendor
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+
+        # lookups built once per import
+        self.categories = {}
+        for pk, cid, title in Category.objects.values_list("id", "cid", "title"):
+            self.categories[str(pk)] = pk
+            if cid:
+                self.categories[cid] = pk
+            self.categories.setdefault(title.lower(), pk)
+        self.tags = {name.lower(): pk for pk, name in Tags.objects.values_list("id", "name")}
+        self.skus = set(Product.objects.values_list("sku", flat=True))
+        self._sku_field = Product._meta.get_field("sku")
+
+    # -------------------------------
+    # Entry point
+    # -------------------------------
+    def run(self, lines, fmt="csv"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}, expected one of {FORMATS}")
+        result = ImportResult()
+        batch = []
+        for line_no, row, parse_error in iter_rows(lines, fmt):
+            if parse_error:
+                result.add_error(line_no, {"row": parse_error})
+                continue
+            try:
+                batch.append(self.clean_row(row))
+            except RowError as exc:
+                result.add_error(line_no, exc.errors)
+                continue
+            if len(batch) >= self.batch_size:
+                result.created += self.write_batch(batch)
+                batch = []
+        if batch:
+            result.created += self.write_batch(batch)
+
+        if result.created and not self.dry_run:
+            catalog.bump_catalog_version()
+            suggest.reset()
+        return result
+
+    # -------------------------------
+    # Validation
+    # -------------------------------
+    def clean_row(self, row):
+        """(unsaved Product, [tag names]) or RowError with {field: message}."""
+        errors = {}
+
+        title = _text(row.get("title"))
+        if not title:
+            errors["title"] = "This field is required."
+        elif len(title) > FIELD_LIMITS["title"]:
+            errors["title"] = f"At most {FIELD_LIMITS['title']} characters."
+
+        brand = _text(row.get("brand")) or None
+        if brand and len(brand) > FIELD_LIMITS["brand"]:
+            errors["brand"] = f"At most {FIELD_LIMITS['brand']} characters."
+
+        price = _decimal(row.get("price"), "price", errors, required=True)
+        old_price = _decimal(row.get("old_price"), "old_price", errors)
+
+        # the model default ("in_review") is not one of the choices, so only check given values
+        status = _text(row.get("product_status")) or DEFAULT_STATUS
+        if status != DEFAULT_STATUS and status not in STATUS_CHOICES:
+            errors["product_status"] = f"Must be one of: {', '.join(sorted(STATUS_CHOICES))}."
+
+        category_id = None
+        category = _text(row.get("category"))
+        if category:
+            category_id = self.categories.get(category) or self.categories.get(category.lower())
+            if category_id is None:
+                errors["category"] = f"Unknown category {category!r}."
+
+        highlights = row.get("highlights") or []
+        if isinstance(highlights, str):
+            text = highlights.strip()
+            if text.startswith("["):
+                try:
+                    highlights = json.loads(text)
+                except ValueError:
+                    errors["highlights"] = "Invalid JSON list."
+            else:
+                highlights = [part.strip() for part in text.split("|") if part.strip()]
+        if not isinstance(highlights, list):
+            errors["highlights"] = "Must be a list."
+
+        tag_names = _split(row.get("tags"))
+        if any(len(name) > Tags._meta.get_field("name").max_length for name in tag_names):
+            errors["tags"] = "Tag names are at most 50 characters."
+
+        sku = _text(row.get("sku"))
+        if sku:
+            if len(sku) > FIELD_LIMITS["sku"]:
+                errors["sku"] = f"At most {FIELD_LIMITS['sku']} characters."
+            elif sku in self.skus:
+                errors["sku"] = f"SKU {sku!r} already exists."
+
+        if errors:
+            raise RowError(errors)
+
+        sku = sku or self._new_sku()
+        self.skus.add(sku)
+        product = Product(
+            user=self.user,
+            vendor=self.vendor,
+            category_id=category_id,
+            title=title,
+            brand=brand if brand is not None else Product._meta.get_field("brand").default,
+            description=_text(row.get("description")) or None,
+            specifications=_text(row.get("specifications")) or None,
+            price=price,
+            old_price=old_price,
+            product_status=status,
+            featured=_text(row.get("featured")).lower() in TRUE_VALUES,
+            highlights=highlights,
+            image=_text(row.get("image")) or DEFAULT_IMAGE,
+            sku=sku,
+        )
+        return product, tag_names
+
+    def _new_sku(self):
+        # random like the model default, but never one that is taken or already in this import
+        while True:
+            sku = self._sku_field._generate_uuid()
+            if sku not in self.skus:
+                return sku
+
+    # -------------------------------
+    # Writing
+    # -------------------------------
+    def write_batch(self, batch):
+        if self.dry_run:
+            return len(batch)
+        with transaction.atomic():
+            self._create_missing_tags({name for _, names in batch for name in names})
+            products = Product.objects.bulk_create([product for product, _ in batch])
+
+            Through = Product.tags.through
+            links = {
+                (product.pk, self.tags[name.lower()])
+                for product, names in batch
+                for name in names
+            }
+            Through.objects.bulk_create(
+                [Through(product_id=product_id, tags_id=tag_id) for product_id, tag_id in links],
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+            search.index_products([product.pk for product in products])
+            # one resize per distinct image once the batch is committed, as the post_save signal would
+            fieldfiles = {product.image.name: product.image for product in products if product.image}
+            transaction.on_commit(lambda: [images.ensure_variants(f) for f in fieldfiles.values()])
+        return len(products)
+
+    def _create_missing_tags(self, names):
+        missing = {}
+        for name in names:
+            missing.setdefault(name.lower(), name)
+        for key in list(missing):
+            if key in self.tags:
+                del missing[key]
+        if not missing:
+            return
+        Tags.objects.bulk_create([Tags(name=name) for name in missing.values()], ignore_conflicts=True)
+        # ignore_conflicts leaves pks unset: read them back
+        for pk, name in Tags.objects.filter(name__in=missing.values()).values_list("id", "name"):
+            self.tags[name.lower()] = pk
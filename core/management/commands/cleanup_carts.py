@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cart_cleanup import CART_CLEANUP_BATCH_SIZE, CART_IDLE_TTL, cleanup_carts, stale_carts
+from core.models import CartItem
+
+
+class Command(BaseCommand):
+    help = "Delete anonymous carts whose session is gone or that sat idle, and old empty user carts, in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--idle-days", type=float, default=CART_IDLE_TTL / 86400,
+                            help="Carts unchanged for longer than this are stale")
+        parser.add_argument("--batch-size", type=int, default=CART_CLEANUP_BATCH_SIZE)
+        parser.add_argument("--pause", type=float, default=0.05,
+                            help="Seconds to sleep between batches so other writers get the database")
+        parser.add_argument("--max-batches", type=int, help="Stop after this many batches")
+        parser.add_argument("--loop", type=int, metavar="SECONDS",
+                            help="Keep running, starting a new pass every SECONDS")
+        parser.add_argument("--dry-run", action="store_true", help="Count stale carts, delete nothing")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        idle_ttl = int(options["idle_days"] * 86400)
+
+        if options["dry_run"]:
+            carts = stale_carts(idle_ttl=idle_ttl)
+            items = CartItem.objects.filter(cart__in=carts).count()
+            self.stdout.write(f"{carts.count()} stale carts holding {items} items")
+            return
+
+        while True:
+            self.run_pass(idle_ttl, options)
+            if not options["loop"]:
+                return
+            time.sleep(options["loop"])
+
+    def run_pass(self, idle_ttl, options):
+        done = {}
+
+        def progress(result):
+            done["result"] = result
+            if options["verbosity"] > 1:
+                self.stdout.write(f"batch {result.batches}: {result.carts} carts, {result.items} items so far")
+
+        started = time.monotonic()
+        try:
+            result = cleanup_carts(
+                idle_ttl=idle_ttl,
+                batch_size=options["batch_size"],
+                pause=options["pause"],
+                max_batches=options["max_batches"],
+                progress=progress,
+            )
+        except KeyboardInterrupt:
+            # finished batches are committed; the next run carries on from there
+            if "result" in done:
+                self.report(done["result"], started, self.style.WARNING)
+            raise CommandError("Interrupted")
+        self.report(result, started, self.style.SUCCESS)
+
+    def report(self, result, started, style):
+        elapsed = time.monotonic() - started
+        self.stdout.write(style(
+            f"Deleted {result.carts} carts ({result.anonymous_carts} anonymous, {result.user_carts} empty user carts) "
+            f"and {result.items} items in {result.batches} batches, {elapsed:.1f}s"
+        ))
@@ -0,0 +1,33 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from core import images
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG variants for every catalog image (products, gallery, categories, vendors)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Regenerate variants that already exist")
+
+    def handle(self, *args, **options):
+        force = options["force"]
+        done = set()
+        written = failed = 0
+        for label, field in images.IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            # many rows share the same file (e.g. default.jpg): resize each file once
+            names = model.objects.exclude(**{field: ""}).values_list(field, flat=True).distinct()
+            for name in names.iterator():
+                if name in done:
+                    continue
+                done.add(name)
+                image_field = model._meta.get_field(field)
+                fieldfile = image_field.attr_class(None, image_field, name)
+                try:
+                    written += images.generate_variants(fieldfile, force=force)
+                except (OSError, ValueError, Image.DecompressionBombError) as exc:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f"Skipped {name}: {exc}"))
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} variants for {len(done)} images ({failed} skipped)"))
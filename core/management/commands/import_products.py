@@ -0,0 +1,56 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importers import FORMATS, IMPORT_BATCH_SIZE, ProductImporter, detect_format
+from core.models import Vendor
+
+
+class Command(BaseCommand):
+    help = "Import products from a CSV or JSONL file, streamed and written in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension")
+        parser.add_argument("--vendor", help="Vendor id or vid the products belong to")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Validate only, write nothing")
+        parser.add_argument("--report", help="Write every rejected row to this JSONL file")
+
+    def handle(self, *args, **options):
+        vendor = None
+        if options["vendor"]:
+            value = options["vendor"]
+            lookup = {"pk": int(value)} if value.isdigit() else {"vid": value}
+            vendor = Vendor.objects.filter(**lookup).first()
+            if vendor is None:
+                raise CommandError(f"Vendor {value!r} not found")
+
+        fmt = options["format"] or detect_format(options["path"])
+        importer = ProductImporter(
+            user=vendor.user if vendor else None,
+            vendor=vendor,
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+        )
+
+        started = time.monotonic()
+        try:
+            with open(options["path"], "rb") as fh:
+                result = importer.run(fh, fmt)
+        except OSError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.monotonic() - started
+
+        if options["report"] and result.errors:
+            with open(options["report"], "w") as out:
+                for error in result.errors:
+                    out.write(json.dumps(error) + "\n")
+
+        for error in result.errors[:20]:
+            self.stdout.write(self.style.WARNING(f"line {error['line']}: {error['errors']}"))
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result.created} products in {elapsed:.1f}s, {result.failed} rows rejected"
+        ))
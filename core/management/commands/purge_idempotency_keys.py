@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core import idempotency
+
+
+class Command(BaseCommand):
+    help = "Delete Idempotency-Key records older than IDEMPOTENCY_KEY_TTL"
+
+    def handle(self, *args, **options):
+        count = idempotency.purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} expired idempotency keys"))
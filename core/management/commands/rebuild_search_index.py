@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core import catalog, search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text product search index from scratch"
+
+    def handle(self, *args, **options):
+        if not search.fts_enabled():
+            self.stdout.write(self.style.WARNING("Full-text index is only used on SQLite, nothing to do"))
+            return
+        count = search.rebuild_index()
+        catalog.bump_catalog_version()   # cached search results are stale now
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} products"))
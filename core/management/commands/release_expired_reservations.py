@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core import stock
+
+
+class Command(BaseCommand):
+    help = "Return stock held by unpaid orders past STOCK_RESERVATION_TTL and cancel those orders"
+
+    def handle(self, *args, **options):
+        count = stock.release_expired_reservations()
+        self.stdout.write(self.style.SUCCESS(f"Released {count} expired reservations"))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_payment'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-date', '-id'], name='product_date_id_idx'),
+        ),
+    ]
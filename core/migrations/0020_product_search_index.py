@@ -0,0 +1,46 @@
+from django.db import migrations
+
+from core import search
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(search.create_index_sql())
+
+    Product = apps.get_model("core", "Product")
+    columns = ", ".join(search.FTS_COLUMNS)
+    placeholders = ", ".join(["%s"] * (len(search.FTS_COLUMNS) + 1))
+    products = Product.objects.select_related("category").prefetch_related("tags")
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {search.FTS_TABLE} (rowid, {columns}) VALUES ({placeholders})",
+            [
+                (
+                    p.id,
+                    p.title or "",
+                    p.brand or "",
+                    p.description or "",
+                    " ".join(t.name for t in p.tags.all()),
+                    p.category.title if p.category else "",
+                )
+                for p in products.iterator(chunk_size=search.INDEX_BATCH_SIZE)
+            ],
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {search.FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_product_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:45
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    Category = apps.get_model("core", "Category")
+    children = {}
+    for pk, parent_id in Category.objects.values_list("pk", "parent_id"):
+        children.setdefault(parent_id, []).append(pk)
+
+    # walk the tree from the roots down
+    stack = [(pk, "") for pk in children.get(None, [])]
+    while stack:
+        pk, parent_path = stack.pop()
+        path = parent_path + "%010d/" % pk
+        Category.objects.filter(pk=pk).update(path=path, depth=path.count("/") - 1)
+        stack += [(child, path) for child in children.get(pk, [])]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_product_facet_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
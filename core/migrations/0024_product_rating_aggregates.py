@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:58
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_ratings(apps, schema_editor):
+    """One GROUP BY over existing reviews, then one bulk update."""
+    Product = apps.get_model('core', 'Product')
+    ProductReview = apps.get_model('core', 'ProductReview')
+
+    totals = {}
+    rows = (
+        ProductReview.objects.filter(product__isnull=False, rating__in=['1', '2', '3', '4', '5'])
+        .values('product_id', 'rating')
+        .annotate(n=Count('id'))
+    )
+    for row in rows:
+        totals.setdefault(row['product_id'], {})[row['rating']] = row['n']
+
+    products = list(Product.objects.filter(pk__in=totals))
+    for product in products:
+        counts = totals[product.pk]
+        for stars in range(1, 6):
+            setattr(product, f'rating_{stars}', counts.get(str(stars), 0))
+        product.rating_count = sum(counts.values())
+        product.rating_sum = sum(int(stars) * n for stars, n in counts.items())
+        product.rating_avg = product.rating_sum / product.rating_count
+    fields = ['rating_count', 'rating_sum', 'rating_avg'] + [f'rating_{stars}' for stars in range(1, 6)]
+    Product.objects.bulk_update(products, fields, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_cart_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_avg',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-rating_avg', '-rating_count', '-id'], name='product_rating_idx'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:00
+
+import shortuuid.django_fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_product_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='sku',
+            field=shortuuid.django_fields.ShortUUIDField(alphabet='1234567890', editable=False, length=7, max_length=10, prefix='sku', unique=True),
+        ),
+    ]
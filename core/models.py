@@ -1,12 +1,17 @@
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 from shortuuid.django_fields import ShortUUIDField
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils.html import mark_safe
 from unicodedata import decimal
 from users.models import User
 from decimal import Decimal
 import uuid
 
+from .images import thumbnail_url
+
 
 PRODUCT_STATUS = (
     ('active', 'Active'),
@@ -64,6 +69,10 @@ class Category(models.Model):
         blank=True,
         related_name="children"
     ) 
+    # materialized path: one zero-padded id per level, e.g. "0000000001/0000000007/"
+    # a whole subtree is the index range [path, path[:-1] + "0")
+    path = models.CharField(max_length=255, db_index=True, editable=False, default="")
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
     
     
     class Meta:
@@ -71,10 +80,54 @@ class Category(models.Model):
         db_table = "core_category"
         
     def category_image(self):
-        return mark_safe('<img src="%s" width="50" height="50" />' % (self.image.url))
+        # smallest variant, not the full-size upload
+        return mark_safe('<img src="%s" width="50" height="50" loading="lazy" />' % thumbnail_url(self.image))
 
     def __str__(self):
         return self.title
+
+    @staticmethod
+    def path_segment(pk):
+        return "%010d/" % pk
+
+    def subtree_q(self, prefix=""):
+        """
+        Q for this category and all of its descendants.
+        `prefix` lets other models filter through their FK, e.g. prefix="category__".
+        """
+        return models.Q(**{
+            f"{prefix}path__gte": self.path,
+            f"{prefix}path__lt": self.path[:-1] + "0",   # "/" + 1 == "0"
+        })
+
+    def save(self, *args, **kwargs):
+        old_path, old_depth = self.path, self.depth
+
+        parent_path = ""
+        if self.parent_id:
+            parent_path = Category.objects.values_list("path", flat=True).get(pk=self.parent_id)
+            if old_path and parent_path.startswith(old_path):
+                raise ValueError("A category cannot be moved under its own subtree")
+
+        super().save(*args, **kwargs)
+
+        new_path = parent_path + self.path_segment(self.pk)
+        new_depth = new_path.count("/") - 1
+
+        if new_path == old_path:
+            return
+
+        self.path, self.depth = new_path, new_depth
+        Category.objects.filter(pk=self.pk).update(path=new_path, depth=new_depth)
+
+        # moved: rewrite the prefix of every descendant in one UPDATE
+        if old_path:
+            Category.objects.filter(
+                path__gt=old_path, path__lt=old_path[:-1] + "0"
+            ).update(
+                path=Concat(Value(new_path), Substr("path", len(old_path) + 1)),
+                depth=F("depth") + (new_depth - old_depth),
+            )
     
     
 class Tags(models.Model):
@@ -99,7 +152,8 @@ class Vendor(models.Model):
         verbose_name_plural = "Vendors"
         
     def vendor_image(self):
-            return mark_safe('<img src="%s" width="50" height="50" />' % (self.image.url))
+            # smallest variant, not the full-size upload
+            return mark_safe('<img src="%s" width="50" height="50" loading="lazy" />' % thumbnail_url(self.image))
         
     def __str__(self):
         return self.title
@@ -123,12 +177,23 @@ class Product(models.Model):
     tags = models.ManyToManyField(Tags, blank=True, related_name="products")
     product_status = models.CharField(choices=PRODUCT_STATUS, max_length=20, default="in_review")
 
-    # in_stock = models.BooleanField(default=True)
+    # units on hand; NULL = not tracked (never runs out). Reserved at checkout, see core/stock.py
+    stock = models.PositiveIntegerField(null=True, blank=True)
     featured = models.BooleanField(default=False)
     highlights = models.JSONField(default=list, blank=True)
     
-    sku = ShortUUIDField(unique=True, length=4, max_length=10, prefix= "sku", alphabet="1234567890", editable=False)
-    
+    # 7 digits fill max_length; 4 left room for only 10,000 products
+    sku = ShortUUIDField(unique=True, length=7, max_length=10, prefix= "sku", alphabet="1234567890", editable=False)
+
+    # review aggregates, kept up to date by core/ratings.py (never edited by hand)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_avg = models.FloatField(default=0, editable=False)
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
 
     date = models.DateTimeField(auto_now_add=True) 
     updated_at = models.DateTimeField(null=True, blank=True)
@@ -136,15 +201,29 @@ class Product(models.Model):
     class Meta:
         verbose_name_plural = "Products"
         db_table = "core_product"
+        indexes = [
+            # keyset pagination walks the catalog newest first
+            models.Index(fields=["-date", "-id"], name="product_date_id_idx"),
+            # faceted filters
+            models.Index(fields=["brand"], name="product_brand_idx"),
+            models.Index(fields=["price"], name="product_price_idx"),
+            # ?sort=rating
+            models.Index(fields=["-rating_avg", "-rating_count", "-id"], name="product_rating_idx"),
+        ]
         
     def product_image(self):
-            return mark_safe('<img src="%s" width="50" height="50" />' % (self.image.url))
+            # smallest variant, not the full-size upload
+            return mark_safe('<img src="%s" width="50" height="50" loading="lazy" />' % thumbnail_url(self.image))
         
     def __str__(self):
         return self.title
     
     
     
+    @property
+    def rating_histogram(self):
+        return {str(stars): getattr(self, f"rating_{stars}") for stars in range(1, 6)}
+
     def get_dpercentage(self):
         new_price = (self.price / self.old_price) * 100
         return new_price
@@ -181,11 +260,7 @@ class CartOrder(models.Model):
         if not self.invoice_no:
             self.invoice_no = uuid.uuid4().hex[:12].upper()
 
-        # Auto-update order price from items if already created
-        if self.pk:
-            total = sum([item.total for item in self.cartorderitems_set.all()])
-            self.price = total
-
+        # price follows the lines through core/orders.py; saving the order never re-sums them
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -217,6 +292,33 @@ class CartOrderItems(models.Model):
 
     def __str__(self):
         return f"{self.qty} × {self.item} (Order {self.order.invoice_no})"
+
+
+class StockReservation(models.Model):
+    """Units taken off Product.stock for an unpaid order, given back if it is not paid in time."""
+    STATUS = (
+        ("held", "Held"),
+        ("committed", "Committed"),   # order paid
+        ("released", "Released"),     # payment failed or timed out, units returned
+    )
+
+    order = models.ForeignKey("core.CartOrder", on_delete=models.CASCADE, related_name="stock_reservations")
+    product = models.ForeignKey("core.Product", on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(choices=STATUS, max_length=10, default="held")
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = "Stock Reservations"
+        db_table = "core_stockreservation"
+        indexes = [
+            # the expiry sweep only looks at held rows past their deadline
+            models.Index(fields=["status", "expires_at"], name="reservation_expiry_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} × {self.product_id} for order {self.order_id} ({self.status})"
     
     
     
@@ -271,6 +373,7 @@ class Cart(models.Model):
     user = models.ForeignKey(User, null=True, blank=True, on_delete=models.CASCADE)
     session_id = models.CharField(max_length=128, null=True, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)   # touched on every item change (see core/signals.py)
 
     class Meta:
         verbose_name = "Cart"
@@ -340,4 +443,26 @@ class Payment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Payment {self.id} for Order {self.order.invoice_no} ({self.status})"
\ No newline at end of file
+        return f"Payment {self.id} for Order {self.order.invoice_no} ({self.status})"
+
+class IdempotencyKey(models.Model):
+    """The first response given for a client's Idempotency-Key, replayed on retries (see core/idempotency.py)."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    scope = models.CharField(max_length=100)          # the view the key was used on
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)    # the same key with another body is refused
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)   # None while the first request runs
+    response = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "Idempotency Keys"
+        db_table = "core_idempotencykey"
+        unique_together = ('user', 'scope', 'key')
+        indexes = [
+            # expired keys are purged by age
+            models.Index(fields=["created_at"], name="idempotency_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.key} ({self.user_id})"
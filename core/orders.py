@@ -0,0 +1,30 @@
+# core/orders.py
+"""
+Order totals.
+
+CartOrder.price is the sum of its lines' totals. Rather than re-reading every
+line whenever an order is saved, each line change moves the price by the
+difference with a single F() UPDATE (see the CartOrderItems signals in
+core/signals.py), so concurrent line edits never overwrite each other and
+saving the order itself never touches its lines.
+
+Checkout writes its lines with bulk_create, which skips the signals; it sets
+the order's price from the same loop that prices the lines.
+"""
+from django.db.models import F
+
+# a line save that only touches these fields cannot change the order total
+TOTAL_FIELDS = frozenset({"order", "qty", "price", "total"})
+
+
+def adjust_total(order_id, delta):
+    """Add `delta` (may be negative) to the order's price."""
+    from .models import CartOrder
+
+    if order_id is None or not delta:
+        return 0
+    return CartOrder.objects.filter(pk=order_id).update(price=F("price") + delta)
+
+
+def changes_total(update_fields):
+    return update_fields is None or not TOTAL_FIELDS.isdisjoint(update_fields)
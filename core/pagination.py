@@ -0,0 +1,104 @@
+# core/pagination.py
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class ProductCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the product list.
+    - Ordered by newest first with `id` as a tie-breaker so pages are stable
+    - The cursor is opaque (base64) and never turns into an OFFSET scan
+    - Page size can be changed per request with ?page_size=
+    - A view can switch the ordering (e.g. search relevance) by setting `cursor_ordering`
+
+    DRF's CursorPagination keys its cursor on the first ordering field only and
+    falls back to OFFSET for rows that tie on it (every unrated product under
+    sort=rating). Here the cursor holds the whole ordering tuple, which ends in
+    a unique field, and the next page is the rows after that tuple:
+
+        (a, b, id) after (x, y, z)  →  a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z)
+    """
+    page_size = getattr(settings, "PRODUCT_PAGE_SIZE", 24)
+    page_size_query_param = "page_size"
+    max_page_size = getattr(settings, "PRODUCT_MAX_PAGE_SIZE", 100)
+    ordering = ("-date", "-id")
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, "cursor_ordering", None)
+        if ordering:
+            return tuple(ordering)
+        return super().get_ordering(request, queryset, view)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse, position = (self.cursor.reverse, self.cursor.position) if self.cursor else (False, None)
+
+        queryset = queryset.order_by(*(_flip(self.ordering) if reverse else self.ordering))
+        if position is not None:
+            queryset = queryset.filter(self._after(position, reverse))
+
+        try:
+            results = list(queryset[:self.page_size + 1])
+        except (DjangoValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        self.page = results[:self.page_size]
+        following = self._get_position_from_instance(results[-1], self.ordering) if len(results) > len(self.page) else None
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = True, position
+            self.has_previous, self.previous_position = following is not None, following
+        else:
+            self.has_next, self.next_position = following is not None, following
+            self.has_previous, self.previous_position = position is not None, position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def link_after(self, instance):
+        """Cursor URL (on self.base_url) of the page that starts right after `instance`."""
+        position = self._get_position_from_instance(instance, self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def _get_position_from_instance(self, instance, ordering):
+        # str() keeps full precision (microseconds, floats), the filter parses it back
+        values = []
+        for field in ordering:
+            name = field.lstrip("-")
+            values.append(str(instance[name] if isinstance(instance, dict) else getattr(instance, name)))
+        return json.dumps(values)
+
+    def _after(self, position, reverse):
+        """Rows strictly after `position` in the ordering (before it when paging backwards)."""
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        after = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != reverse
+            after |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{name: value})
+        return after
+
+
+def _flip(ordering):
+    return tuple(field[1:] if field.startswith("-") else f"-{field}" for field in ordering)
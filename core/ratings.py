@@ -0,0 +1,35 @@
+# core/ratings.py
+"""
+Review aggregates stored on Product.
+
+Each review adds or removes one star rating; instead of a GROUP BY over
+core_productreview the product row carries the count, the sum, the average
+and one counter per star. Changes are applied with a single UPDATE built from
+F() expressions, so concurrent reviews never overwrite each other's counts.
+"""
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast
+
+STARS = ("1", "2", "3", "4", "5")
+
+
+def apply_rating(product_id, rating, delta):
+    """Add (delta=1) or remove (delta=-1) one review's rating from its product's aggregates."""
+    from .models import Product
+
+    if product_id is None or str(rating) not in STARS:
+        return 0
+    stars = int(rating)
+    new_count = F("rating_count") + delta
+    new_sum = F("rating_sum") + stars * delta
+    return Product.objects.filter(pk=product_id).update(
+        rating_count=new_count,
+        rating_sum=new_sum,
+        # evaluated against the old row, like every SET in the same UPDATE
+        rating_avg=Case(
+            When(rating_count=-delta, then=Value(0.0)),
+            default=Cast(new_sum, FloatField()) / Cast(new_count, FloatField()),
+            output_field=FloatField(),
+        ),
+        **{f"rating_{stars}": F(f"rating_{stars}") + delta},
+    )
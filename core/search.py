@@ -0,0 +1,188 @@
+# core/search.py
+"""
+Full-text product search.
+
+On SQLite an FTS5 table (core_product_fts) mirrors the searchable text of every
+product: title, brand, description, tag names and category title. The FTS rowid
+is the product id, so a match can be joined straight back to core_product.
+The table is kept in sync by the signals in core/signals.py and can be rebuilt
+with `python manage.py rebuild_search_index`.
+
+Other databases fall back to a plain icontains search over the same fields.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "core_product_fts"
+
+# bm25 weights, same order as the FTS columns
+FTS_COLUMNS = ("title", "brand", "description", "tags", "category")
+FTS_WEIGHTS = (10.0, 5.0, 1.0, 3.0, 2.0)
+
+# cap for search_ids(), which materialises ranked ids in Python; the product
+# list does not use it and ranks every match in SQL
+SEARCH_RESULT_LIMIT = getattr(settings, "SEARCH_RESULT_LIMIT", 500)
+
+INDEX_BATCH_SIZE = 500
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_enabled():
+    return connection.vendor == "sqlite"
+
+
+def create_index_sql():
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{', '.join(FTS_COLUMNS)}, tokenize='unicode61 remove_diacritics 2')"
+    )
+
+
+def build_match_query(q):
+    """
+    Turn free text into an FTS5 query.
+    Every word must match (implicit AND) and every word is a prefix,
+    so "fres app" finds "Fresho Apple".
+    """
+    tokens = _TOKEN_RE.findall(q or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _document(product):
+    tags = " ".join(tag.name for tag in product.tags.all())
+    category = product.category.title if product.category_id and product.category else ""
+    return (
+        product.id,
+        product.title or "",
+        product.brand or "",
+        product.description or "",
+        tags,
+        category,
+    )
+
+
+def remove_products(product_ids):
+    product_ids = list(product_ids)
+    if not fts_enabled() or not product_ids:
+        return
+    with connection.cursor() as cursor:
+        for start in range(0, len(product_ids), INDEX_BATCH_SIZE):
+            chunk = product_ids[start:start + INDEX_BATCH_SIZE]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+
+
+def index_products(product_ids):
+    """(Re)index the given products; ids that no longer exist are dropped from the index."""
+    from .models import Product
+
+    product_ids = list(product_ids)
+    if not fts_enabled() or not product_ids:
+        return
+
+    remove_products(product_ids)
+    for start in range(0, len(product_ids), INDEX_BATCH_SIZE):
+        chunk = product_ids[start:start + INDEX_BATCH_SIZE]
+        products = (
+            Product.objects.filter(pk__in=chunk)
+            .select_related("category")
+            .prefetch_related("tags")
+        )
+        _insert_documents(products)
+
+
+def _insert_documents(products):
+    rows = [_document(p) for p in products]
+    if not rows:
+        return
+    columns = ", ".join(FTS_COLUMNS)
+    placeholders = ", ".join(["%s"] * (len(FTS_COLUMNS) + 1))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES ({placeholders})",
+            rows,
+        )
+
+
+def rebuild_index():
+    """Drop every row and index the whole catalog again. Returns the number of products indexed."""
+    from .models import Product
+
+    if not fts_enabled():
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(create_index_sql())
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    count = 0
+    last_id = 0
+    while True:
+        batch = list(
+            Product.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .select_related("category")
+            .prefetch_related("tags")[:INDEX_BATCH_SIZE]
+        )
+        if not batch:
+            break
+        _insert_documents(batch)
+        count += len(batch)
+        last_id = batch[-1].pk
+    return count
+
+
+def search_ids(q, limit=SEARCH_RESULT_LIMIT):
+    """Product ids matching `q`, best match first (at most `limit`; for tools and tests)."""
+    match = build_match_query(q)
+    if not match:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({FTS_TABLE}, {_weights()}) LIMIT %s",
+            [match, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _weights():
+    return ", ".join(str(w) for w in FTS_WEIGHTS)
+
+
+def search_products(qs, q):
+    """
+    Restrict a Product queryset to matches for `q`.
+    With FTS the queryset is annotated with `search_rank` (bm25, lower = better)
+    so callers can order or paginate on it. Both the match and the rank are
+    subqueries on the FTS table inside the product query, so further filters
+    and the cursor apply to every match, not to a pre-cut list of ids.
+    """
+    if not fts_enabled():
+        return qs.filter(
+            Q(title__icontains=q)
+            | Q(brand__icontains=q)
+            | Q(description__icontains=q)
+            | Q(tags__name__icontains=q)
+            | Q(category__title__icontains=q)
+        ).distinct()
+
+    match = build_match_query(q)
+    if not match:
+        return qs.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+    product_id = f'"{qs.model._meta.db_table}"."{qs.model._meta.pk.column}"'
+    rank = RawSQL(
+        f"SELECT bm25({FTS_TABLE}, {_weights()}) FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {product_id}",
+        [match],
+        output_field=FloatField(),
+    )
+    matches = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+    return qs.filter(pk__in=matches).annotate(search_rank=rank)
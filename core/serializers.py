@@ -1,41 +1,85 @@
 from rest_framework import serializers
 from .models import Product,Category ,ProductImages, CartOrder, CartOrderItems, Cart, CartItem, CartOrder, CartOrderItems, Vendor, Address, Payment
+from .images import image_srcsets
+from .cart import summarize_items
+from django.db.models import prefetch_related_objects
+
+# renders Decimal totals the same way as every DecimalField ("123.40")
+MONEY = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+# adds {"webp": srcset, "jpg": srcset} of the resized variants, see core/images.py
+class SrcsetMixin:
+    def _srcsets(self, fieldfile):
+        return image_srcsets(fieldfile, self.context.get('request'))
+
+    def get_image_srcset(self, obj):
+        return self._srcsets(obj.image)
+
 
 # Serializer for extra product images
-class ProductImageSerializer(serializers.ModelSerializer):
+class ProductImageSerializer(SrcsetMixin, serializers.ModelSerializer):
+    images_srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = ProductImages
-        fields = ['id', 'images']
+        fields = ['id', 'images', 'images_srcset']
+
+    def get_images_srcset(self, obj):
+        return self._srcsets(obj.images)
 
 
 # Serializer for main Product model
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SrcsetMixin, serializers.ModelSerializer):
     # include multiple images
     images = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
+    # {"1": n, ..., "5": n} from the stored per-star counters
+    rating_histogram = serializers.ReadOnlyField()
 
     class Meta:
         model = Product
         fields = '__all__'
 
     # method to fetch all related images
+    # uses the related manager so prefetch_related('productimages_set') is honoured
     def get_images(self, obj):
-        qs = ProductImages.objects.filter(product=obj)
+        qs = obj.productimages_set.all()
         return ProductImageSerializer(qs, many=True, context=self.context).data
 
 
+# Slim projection for listings (grid cards, search results)
+class ProductCardSerializer(SrcsetMixin, serializers.ModelSerializer):
+    """
+    Only what a product card shows.
+    Heavy text fields (description, specifications, highlights) are left out
+    and are deferred in the queryset as well, see CARD_DEFERRED_FIELDS.
+    """
+    image_srcset = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Product
+        fields = [
+            'id', 'pid', 'title', 'brand', 'price', 'old_price', 'image', 'image_srcset', 'category',
+            'rating_avg', 'rating_count',
+        ]
+
+
+CARD_DEFERRED_FIELDS = ('description', 'specifications', 'highlights')
 
 
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SrcsetMixin, serializers.ModelSerializer):
     # return absolute image URL when request is present
     image = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
     # parent will be returned as the parent's PK (or null)
     parent = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         model = Category
-        fields = ['id', 'cid', 'title', 'image', 'parent']
+        fields = ['id', 'cid', 'title', 'image', 'image_srcset', 'parent']
 
     def get_image(self, obj):
         if not obj.image:
@@ -48,8 +92,17 @@ class CategorySerializer(serializers.ModelSerializer):
     
  # if ProductSerializer already exists
 
+# What a cart line needs to show its product: no gallery, tags or long text
+class CartProductSerializer(SrcsetMixin, serializers.ModelSerializer):
+    image_srcset = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Product
+        fields = ['id', 'pid', 'title', 'brand', 'price', 'old_price', 'image', 'image_srcset', 'product_status']
+
+
 class CartItemSerializer(serializers.ModelSerializer):
-    product = ProductSerializer(read_only=True)
+    product = CartProductSerializer(read_only=True)
     line_total = serializers.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -63,24 +116,53 @@ class CartItemSerializer(serializers.ModelSerializer):
 
 
 
+# totals of core.cart.summarize_items, sent with compact (?response=delta) cart mutations
+class CartTotalsSerializer(serializers.Serializer):
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    savings = serializers.DecimalField(max_digits=12, decimal_places=2)
+    item_count = serializers.IntegerField(source='lines')
+    quantity = serializers.IntegerField()
+
+
 class CartSerializer(serializers.ModelSerializer):
+    """
+    Totals come from one pass over the same prefetched items the lines are
+    rendered from (core.cart.summarize_items), all in Decimal.
+    Costs two queries (items, products) whatever the cart size.
+    """
     items = CartItemSerializer(many=True, read_only=True)
     total = serializers.SerializerMethodField()
     savings = serializers.SerializerMethodField()
+    item_count = serializers.SerializerMethodField()     # distinct lines
+    quantity = serializers.SerializerMethodField()       # units across all lines
 
     class Meta:
         model = Cart
-        fields = ['id', 'user', 'session_id', 'items', 'total','savings']
+        fields = ['id', 'user', 'session_id', 'items', 'total', 'savings', 'item_count', 'quantity']
+
+    def to_representation(self, obj):
+        # no-op when the caller already prefetched items__product
+        prefetch_related_objects([obj], 'items__product')
+        return super().to_representation(obj)
+
+    def _summary(self, obj):
+        # computed once per cart per serializer, shared by the four fields below
+        summaries = self.__dict__.setdefault('_summaries', {})
+        if obj.pk not in summaries:
+            summaries[obj.pk] = summarize_items(obj.items.all())
+        return summaries[obj.pk]
 
     def get_total(self, obj):
-        return sum([item.quantity * item.price_snapshot for item in obj.items.all()])
-    
+        return MONEY.to_representation(self._summary(obj)['total'])
+
     def get_savings(self, obj):
-        savings = 0
-        for item in obj.items.all():
-            if item.product.old_price:
-                savings += (float(item.product.old_price) - float(item.price_snapshot)) * item.quantity
-        return savings
+        return MONEY.to_representation(self._summary(obj)['savings'])
+
+    def get_item_count(self, obj):
+        return self._summary(obj)['lines']
+
+    def get_quantity(self, obj):
+        return self._summary(obj)['quantity']
 
 
 
@@ -104,7 +186,7 @@ class CartOrderItemSerializer(serializers.ModelSerializer):
             'price',
             'total',
         ]
-        read_only_fields = ( 'total')
+        read_only_fields = ('total',)
 
 
 class CartOrderSerializer(serializers.ModelSerializer):
@@ -113,7 +195,7 @@ class CartOrderSerializer(serializers.ModelSerializer):
     `source='cartorderitems_set'` uses Django's default related name
     since your CartOrderItems FK did not set a related_name.
     """
-    items = CartOrderItemSerializer(many=True, read_only=True)
+    items = CartOrderItemSerializer(source='cartorderitems_set', many=True, read_only=True)
 
     class Meta:
         model = CartOrder
@@ -141,13 +223,47 @@ class CartOrderSerializer(serializers.ModelSerializer):
         
 
 
-class VendorSerializer(serializers.ModelSerializer):
+class VendorSerializer(SrcsetMixin, serializers.ModelSerializer):
+    image_srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = Vendor
         fields = "__all__"
          # vendor.user will be set automatically
 
 
+# One row of POST /api/products/bulk-update/
+class ProductBulkUpdateItemSerializer(serializers.Serializer):
+    pid = serializers.CharField(required=False)
+    sku = serializers.CharField(required=False)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    old_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False, allow_null=True)
+    product_status = serializers.ChoiceField(choices=Product._meta.get_field('product_status').choices, required=False)
+
+    def validate(self, attrs):
+        if not (attrs.get('pid') or attrs.get('sku')):
+            raise serializers.ValidationError("Give the product's pid or sku.")
+        if not any(field in attrs for field in ('price', 'old_price', 'product_status')):
+            raise serializers.ValidationError("Nothing to update: give price, old_price or product_status.")
+        return attrs
+
+
+# one entry of POST /api/cart/batch/, see core.cart.apply_operations
+class CartBatchOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=['add', 'set', 'remove'])
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(required=False, min_value=0)
+
+    def validate(self, attrs):
+        if attrs['op'] == 'add':
+            attrs.setdefault('quantity', 1)
+            if attrs['quantity'] < 1:
+                raise serializers.ValidationError({'quantity': 'Must be at least 1 for add.'})
+        elif attrs['op'] == 'set' and 'quantity' not in attrs:
+            raise serializers.ValidationError({'quantity': 'Required for set.'})
+        return attrs
+
+
 class CartOrderItemUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = CartOrderItems
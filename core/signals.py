@@ -0,0 +1,254 @@
+# core/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete, m2m_changed
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Product, ProductImages, ProductReview, Category, Tags, Vendor, Cart, CartItem, CartOrderItems
+from . import cart, catalog, images, orders, ratings, search, suggest
+from .cart_store import get_cart_store
+
+
+# -------------------------------
+# Search index sync
+# -------------------------------
+@receiver(post_save, sender=Product)
+def index_product_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_products([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_from_index(sender, instance, **kwargs):
+    search.remove_products([instance.pk])
+
+
+@receiver(m2m_changed, sender=Product.tags.through)
+def index_product_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            search.index_products([instance.pk])
+        return
+
+    # reverse side: instance is a Tag, pk_set holds product ids
+    if action == "pre_clear":
+        # tag.products.clear() does not say which products were linked
+        instance._indexed_product_ids = list(instance.products.values_list("pk", flat=True))
+    elif action in ("post_add", "post_remove") and pk_set:
+        search.index_products(pk_set)
+    elif action == "post_clear":
+        search.index_products(getattr(instance, "_indexed_product_ids", []))
+
+
+@receiver(post_save, sender=Category)
+def index_products_on_category_save(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    search.index_products(instance.product_set.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Tags)
+def index_products_on_tag_save(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    search.index_products(instance.products.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Tags)
+def remember_products_before_delete(sender, instance, **kwargs):
+    # products lose the link without a post_save of their own (SET_NULL / through rows)
+    related = instance.product_set if sender is Category else instance.products
+    instance._indexed_product_ids = list(related.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tags)
+def index_products_after_delete(sender, instance, **kwargs):
+    search.index_products(getattr(instance, "_indexed_product_ids", []))
+
+
+# -------------------------------
+# Catalog cache version
+# -------------------------------
+# reviews too: they change the rating aggregates shown on every card
+CATALOG_MODELS = (Product, ProductImages, Category, Tags, Vendor, ProductReview)
+
+
+def bump_catalog_version(sender, raw=False, **kwargs):
+    if raw:
+        return
+    catalog.bump_catalog_version()
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(bump_catalog_version, sender=model, dispatch_uid=f"catalog_version_save_{model.__name__}")
+    post_delete.connect(bump_catalog_version, sender=model, dispatch_uid=f"catalog_version_delete_{model.__name__}")
+
+
+@receiver(m2m_changed, sender=Product.tags.through)
+def bump_catalog_version_on_tags(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        catalog.bump_catalog_version()
+
+
+# -------------------------------
+# Rating aggregates on Product
+# -------------------------------
+@receiver(pre_save, sender=ProductReview)
+def remember_previous_rating(sender, instance, raw=False, **kwargs):
+    instance._previous_rating = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_rating = (
+        ProductReview.objects.filter(pk=instance.pk).values_list("product_id", "rating").first()
+    )
+
+
+@receiver(post_save, sender=ProductReview)
+def update_rating_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_rating", None)
+    current = (instance.product_id, instance.rating)
+    if previous == current:
+        return
+    if previous:
+        ratings.apply_rating(*previous, delta=-1)
+    ratings.apply_rating(*current, delta=1)
+
+
+@receiver(post_delete, sender=ProductReview)
+def update_rating_on_delete(sender, instance, **kwargs):
+    ratings.apply_rating(instance.product_id, instance.rating, delta=-1)
+
+
+# -------------------------------
+# Order totals (core/orders.py)
+# -------------------------------
+@receiver(pre_save, sender=CartOrderItems)
+def remember_previous_line_total(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._previous_line = None
+    if raw or instance.pk is None or not orders.changes_total(update_fields):
+        return
+    instance._previous_line = (
+        CartOrderItems.objects.filter(pk=instance.pk).values_list("order_id", "total").first()
+    )
+
+
+@receiver(post_save, sender=CartOrderItems)
+def update_order_total_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not orders.changes_total(update_fields):
+        return
+    previous = getattr(instance, "_previous_line", None)
+    if previous and previous[0] != instance.order_id:
+        orders.adjust_total(previous[0], -previous[1])
+        previous = None
+    orders.adjust_total(instance.order_id, instance.total - (previous[1] if previous else 0))
+
+
+@receiver(post_delete, sender=CartOrderItems)
+def update_order_total_on_delete(sender, instance, **kwargs):
+    orders.adjust_total(instance.order_id, -instance.total)
+
+
+# -------------------------------
+# Typeahead index (in-process, patched once the write is committed)
+# -------------------------------
+@receiver(post_save, sender=Product)
+def suggest_product_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: suggest.product_changed(instance.pk))
+
+
+@receiver(post_delete, sender=Product)
+def suggest_product_on_delete(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: suggest.product_removed(pk))
+
+
+@receiver(post_save, sender=Category)
+def suggest_category_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: suggest.category_changed(instance.pk, instance.title))
+
+
+@receiver(post_delete, sender=Category)
+def suggest_category_on_delete(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: suggest.category_removed(pk))
+
+
+# -------------------------------
+# Image variants
+# -------------------------------
+def generate_image_variants(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    field = images.IMAGE_FIELDS[sender._meta.label]
+    if update_fields is not None and field not in update_fields:
+        return
+    fieldfile = getattr(instance, field)
+    # resize once the upload is committed, not inside the request's transaction
+    transaction.on_commit(lambda: images.ensure_variants(fieldfile))
+
+
+for model in (Product, ProductImages, Category, Vendor):
+    post_save.connect(generate_image_variants, sender=model, dispatch_uid=f"image_variants_{model.__name__}")
+
+
+# -------------------------------
+# Cart freshness (ETag / Last-Modified of the cart API)
+# -------------------------------
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def touch_cart(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    Cart.objects.filter(pk=instance.cart_id).update(updated_at=timezone.now())
+
+
+# -------------------------------
+# Cached cart summary (core.cart.cached_summary)
+# -------------------------------
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def forget_cart_summary_on_item_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    owner = Cart.objects.filter(pk=instance.cart_id).values_list("user_id", "session_id").first()
+    if owner:
+        # after commit, so a concurrent render cannot cache the old lines again
+        transaction.on_commit(lambda: cart.forget_summary(*owner))
+
+
+@receiver(post_save, sender=Cart)
+@receiver(post_delete, sender=Cart)
+def forget_cart_summary(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    user_id, session_id = instance.user_id, instance.session_id
+    transaction.on_commit(lambda: cart.forget_summary(user_id, session_id))
+
+
+@receiver(post_delete, sender=Cart)
+def forget_stored_cart_lines(sender, instance, **kwargs):
+    # a cache-backed store would otherwise serve the lines of a deleted (e.g. paid) cart
+    deleted = Cart(pk=instance.pk)     # instance.pk is cleared once the delete finishes
+    transaction.on_commit(lambda: get_cart_store().forget(deleted))
+
+
+# -------------------------------
+# Cart merge on login
+# -------------------------------
+@receiver(user_logged_in)
+def merge_cart_on_login(sender, request, user, **kwargs):
+    if request is None or not hasattr(request, "session"):
+        return
+    # login() has already cycled the session key; the cart's key was kept in the session data
+    session_id = request.session.pop(cart.SESSION_CART_KEY, None)
+    cart.merge_session_cart(session_id, user)
@@ -0,0 +1,160 @@
+# core/stock.py
+"""
+Stock reservation for checkout.
+
+Every cart line is taken off Product.stock with a conditional UPDATE
+
+    UPDATE core_product SET stock = stock - n WHERE id = %s AND stock >= n
+
+so two checkouts racing for the last units cannot both win, and only the
+product rows being bought are touched (no table lock, no SELECT ... FOR UPDATE).
+All lines of one order are reserved inside the caller's transaction, in product
+id order; if one line is short the whole transaction rolls back.
+
+Reserved units are recorded as StockReservation rows. Paying commits them
+(`settle_order`); a failed payment, or an order left unpaid past
+STOCK_RESERVATION_TTL, returns them to stock. A payment that arrives after its
+holds were returned has to take the units again: if they are gone by then the
+payment is refused (OutOfStock) rather than selling them twice. Expired holds are released by `release_expired_reservations`
+(management command) and, for the products involved, at the start of every
+checkout. Products are flipped to "out of stock" when they reach 0 and back
+to "active" when units come back.
+
+Products with stock = NULL are not tracked and are never reserved.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import catalog
+from .models import CartOrder, Product, StockReservation
+
+STOCK_RESERVATION_TTL = getattr(settings, "STOCK_RESERVATION_TTL", 60 * 30)
+
+OUT_OF_STOCK = "out of stock"
+BACK_IN_STOCK = "active"
+
+
+class OutOfStock(Exception):
+    def __init__(self, product_id, requested, available):
+        super().__init__(f"Product {product_id}: {requested} requested, {available} available")
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+
+
+def reserve_stock(order, lines):
+    """
+    Reserve [(product_id, quantity), ...] for `order`. Must run inside a transaction.
+    Raises OutOfStock for the first line that cannot be covered.
+    """
+    wanted = {}
+    for product_id, quantity in lines:
+        if product_id is not None and quantity > 0:
+            wanted[product_id] = wanted.get(product_id, 0) + quantity
+    if not wanted:
+        return []
+
+    release_expired_reservations(product_ids=wanted)
+
+    tracked = set(
+        Product.objects.filter(pk__in=wanted, stock__isnull=False).values_list("pk", flat=True)
+    )
+    expires_at = timezone.now() + timedelta(seconds=STOCK_RESERVATION_TTL)
+    reservations = []
+    for product_id in sorted(tracked):     # fixed order: concurrent checkouts never wait on each other in a cycle
+        quantity = wanted[product_id]
+        taken = Product.objects.filter(pk=product_id, stock__gte=quantity).update(stock=F("stock") - quantity)
+        if not taken:
+            available = Product.objects.filter(pk=product_id).values_list("stock", flat=True).first() or 0
+            raise OutOfStock(product_id, quantity, available)
+        reservations.append(
+            StockReservation(order=order, product_id=product_id, quantity=quantity, expires_at=expires_at)
+        )
+
+    if reservations:
+        StockReservation.objects.bulk_create(reservations)
+        sold_out = Product.objects.filter(pk__in=tracked, stock=0).exclude(product_status=OUT_OF_STOCK)
+        if sold_out.update(product_status=OUT_OF_STOCK):
+            catalog.bump_catalog_version()
+    return reservations
+
+
+def commit_reservations(order):
+    """The order is paid: its held units are sold for good."""
+    return StockReservation.objects.filter(order=order, status="held").update(status="committed")
+
+
+def settle_order(order):
+    """
+    The order is paid: commit what it holds and reserve again whatever was
+    released meanwhile (hold expired, earlier payment failed). Raises
+    OutOfStock, with nothing committed, when those units are no longer there.
+    """
+    with transaction.atomic():
+        commit_reservations(order)
+
+        wanted = {}
+        for product_id, qty in order.cartorderitems_set.values_list("product_id", "qty"):
+            if product_id is not None:
+                wanted[product_id] = wanted.get(product_id, 0) + qty
+        covered = StockReservation.objects.filter(order=order, status="committed").values_list("product_id", "quantity")
+        for product_id, quantity in covered:
+            wanted[product_id] = wanted.get(product_id, 0) - quantity
+
+        missing = [(product_id, quantity) for product_id, quantity in wanted.items() if quantity > 0]
+        if missing and reserve_stock(order, missing):
+            commit_reservations(order)
+
+
+def release_reservations(reservations):
+    """
+    Give held units back to stock. Each reservation is claimed with a
+    conditional status update first, so a sweep and a payment-failure
+    callback releasing the same hold cannot both return its units.
+    """
+    released = []
+    with transaction.atomic():
+        for reservation in reservations:
+            claimed = StockReservation.objects.filter(pk=reservation.pk, status="held").update(status="released")
+            if not claimed:
+                continue
+            Product.objects.filter(pk=reservation.product_id, stock__isnull=False).update(
+                stock=F("stock") + reservation.quantity
+            )
+            released.append(reservation.product_id)
+
+        if released:
+            restocked = Product.objects.filter(pk__in=released, product_status=OUT_OF_STOCK, stock__gt=0)
+            restocked.update(product_status=BACK_IN_STOCK)
+            catalog.bump_catalog_version()
+    return len(released)
+
+
+def release_order(order):
+    """Payment failed: return everything the order still holds."""
+    return release_reservations(list(StockReservation.objects.filter(order=order, status="held")))
+
+
+def release_expired_reservations(now=None, product_ids=None, batch_size=500):
+    """
+    Release holds past their deadline (optionally only for some products) and
+    cancel their orders if still unpaid. Returns the number of holds released.
+    """
+    now = now or timezone.now()
+    expired = StockReservation.objects.filter(status="held", expires_at__lte=now)
+    if product_ids is not None:
+        expired = expired.filter(product_id__in=list(product_ids))
+
+    count = 0
+    while True:
+        batch = list(expired.only("id", "order_id", "product_id", "quantity")[:batch_size])
+        if not batch:
+            return count
+        count += release_reservations(batch)
+        CartOrder.objects.filter(
+            pk__in={r.order_id for r in batch}, paid_status=False
+        ).exclude(order_status="cancelled").update(order_status="cancelled")
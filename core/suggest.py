@@ -0,0 +1,314 @@
+# core/suggest.py
+"""
+Typeahead suggestions from an in-process prefix index.
+
+Every product title, brand and category title is split into words and each
+word-start suffix is stored in one sorted list of terms (with a parallel list
+of the entry each term belongs to):
+
+    "Amul Toned Milk" → "amul toned milk", "toned milk", "milk"
+
+A lookup is two bisects for the range of terms starting with the typed prefix,
+so "ton" and "toned mi" both find the product.
+Matches are ranked by popularity:
+    product   units ordered, plus a boost when featured
+    brand     summed popularity of its products, plus their count
+    category  number of products filed directly under it
+
+The index is built lazily on the first lookup, patched in place by the
+Product/Category signals in core/signals.py, and rebuilt from the database
+once it is older than SUGGEST_INDEX_TTL so changes made by other processes
+(and new orders) show up as well. Only the first build blocks lookups; later
+rebuilds run in a background thread while the old index keeps answering,
+and the new one replaces it when done.
+"""
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+
+SUGGEST_INDEX_TTL = getattr(settings, "SUGGEST_INDEX_TTL", 60 * 5)
+SUGGEST_LIMIT = 8
+# one letter matches most of the catalog and tells us little
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_MAX_LIMIT = 20
+FEATURED_BOOST = 5
+
+# results of recent lookups, dropped on every change
+MEMO_SIZE = 1024
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# sorts after every character, so [prefix, prefix + _MAX_CHAR) holds every term starting with prefix
+_MAX_CHAR = "\U0010ffff"
+
+
+def normalize(text):
+    """Lower-case, accents stripped, words joined by single spaces."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _terms(text):
+    words = normalize(text).split(" ")
+    return [" ".join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+def _product_rows(**filters):
+    from .models import Product
+
+    return (
+        Product.objects.filter(**filters)
+        .annotate(ordered=Coalesce(Sum("cartorderitems__qty"), 0))
+        .values_list("id", "title", "brand", "category_id", "featured", "ordered")
+    )
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._terms = []        # sorted terms
+        self._owners = []       # entry key of each term, same positions as _terms
+        self._entries = {}      # entry key → suggestion dict
+        self._scores = {}       # entry key → popularity
+        self._ranks = {}        # entry key → (-popularity, text), what lookups sort on
+        self._products = {}     # product id → (brand entry key or None, category id, score)
+        self._brand_products = {}       # brand entry key → number of products
+        self._category_products = {}    # category id → number of products
+        self._memo = {}
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls):
+        from .models import Category
+
+        index = cls()
+        for pk, title in Category.objects.values_list("id", "title"):
+            index._entries[("category", pk)] = {"type": "category", "id": pk, "text": title}
+            index._scores[("category", pk)] = 0
+        for row in _product_rows():
+            index._add_product(*row, sort=False)
+        pairs = sorted(
+            (term, key) for key, entry in index._entries.items() for term in _terms(entry["text"])
+        )
+        index._terms = [term for term, _ in pairs]
+        index._owners = [key for _, key in pairs]
+        index._ranks = {key: index._rank(key) for key in index._entries}
+        return index
+
+    # -------------------------------
+    # Lookups
+    # -------------------------------
+    def suggest(self, q, limit=SUGGEST_LIMIT):
+        prefix = normalize(q)
+        if len(prefix) < SUGGEST_MIN_LENGTH:
+            return []
+        with self._lock:
+            memo_key = (prefix, limit)
+            if memo_key in self._memo:
+                return self._memo[memo_key]
+
+            start = bisect_left(self._terms, prefix)
+            end = bisect_right(self._terms, prefix + _MAX_CHAR, start)
+            matches = set(self._owners[start:end])
+            best = heapq.nsmallest(limit, matches, key=self._ranks.__getitem__)
+            results = [dict(self._entries[key]) for key in best]
+
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[memo_key] = results
+            return results
+
+    # -------------------------------
+    # Incremental updates
+    # -------------------------------
+    def update_product(self, product_id):
+        rows = list(_product_rows(pk=product_id))
+        with self._lock:
+            self._remove_product(product_id)
+            for row in rows:
+                self._add_product(*row)
+            self._memo.clear()
+
+    def remove_product(self, product_id):
+        with self._lock:
+            self._remove_product(product_id)
+            self._memo.clear()
+
+    def update_category(self, category_id, title):
+        key = ("category", category_id)
+        with self._lock:
+            if key in self._entries:
+                self._unindex(key)
+            self._entries[key] = {"type": "category", "id": category_id, "text": title}
+            self._set_score(key, self._category_products.get(category_id, 0))
+            self._index(key)
+            self._memo.clear()
+
+    def remove_category(self, category_id):
+        key = ("category", category_id)
+        with self._lock:
+            if key in self._entries:
+                self._unindex(key)
+                self._forget(key)
+            # its products were moved to "no category" by SET_NULL
+            self._category_products.pop(category_id, None)
+            for pk, (brand_key, cat_id, score) in self._products.items():
+                if cat_id == category_id:
+                    self._products[pk] = (brand_key, None, score)
+            self._memo.clear()
+
+    # -------------------------------
+    # Internals (caller holds the lock, or the index is not shared yet)
+    # -------------------------------
+    def _rank(self, key):
+        return (-self._scores[key], self._entries[key]["text"].lower())
+
+    def _set_score(self, key, score, sort=True):
+        self._scores[key] = score
+        if sort:
+            self._ranks[key] = self._rank(key)
+
+    def _forget(self, key):
+        del self._entries[key], self._scores[key]
+        self._ranks.pop(key, None)
+
+    def _index(self, key):
+        for term in _terms(self._entries[key]["text"]):
+            i = bisect_right(self._terms, term)
+            self._terms.insert(i, term)
+            self._owners.insert(i, key)
+
+    def _unindex(self, key):
+        for term in _terms(self._entries[key]["text"]):
+            i = bisect_left(self._terms, term)
+            while i < len(self._terms) and self._terms[i] == term:
+                if self._owners[i] == key:
+                    del self._terms[i], self._owners[i]
+                    break
+                i += 1
+
+    def _add_product(self, pk, title, brand, category_id, featured, ordered, sort=True):
+        key = ("product", pk)
+        score = ordered + (FEATURED_BOOST if featured else 0)
+        self._entries[key] = {"type": "product", "id": pk, "text": title}
+        self._set_score(key, score, sort)
+        if sort:
+            self._index(key)
+
+        brand_key = ("brand", normalize(brand)) if normalize(brand) else None
+        if brand_key:
+            if brand_key not in self._entries:
+                self._entries[brand_key] = {"type": "brand", "text": brand}
+                self._scores[brand_key] = 0
+                self._brand_products[brand_key] = 0
+                if sort:
+                    self._index(brand_key)
+            self._set_score(brand_key, self._scores[brand_key] + score + 1, sort)
+            self._brand_products[brand_key] += 1
+
+        if category_id is not None:
+            self._category_products[category_id] = self._category_products.get(category_id, 0) + 1
+            category_key = ("category", category_id)
+            if category_key in self._scores:
+                self._set_score(category_key, self._scores[category_key] + 1, sort)
+
+        self._products[pk] = (brand_key, category_id, score)
+
+    def _remove_product(self, pk):
+        key = ("product", pk)
+        if pk not in self._products:
+            return
+        brand_key, category_id, score = self._products.pop(pk)
+        self._unindex(key)
+        self._forget(key)
+
+        if brand_key:
+            self._brand_products[brand_key] -= 1
+            if self._brand_products[brand_key]:
+                self._set_score(brand_key, self._scores[brand_key] - score - 1)
+            else:
+                self._unindex(brand_key)
+                self._forget(brand_key)
+                del self._brand_products[brand_key]
+
+        if category_id is not None:
+            self._category_products[category_id] -= 1
+            category_key = ("category", category_id)
+            if category_key in self._scores:
+                self._set_score(category_key, self._scores[category_key] - 1)
+
+
+# -------------------------------
+# Process-wide index
+# -------------------------------
+_index = None
+_build_lock = threading.Lock()      # the first build, which lookups have to wait for
+_refresh_lock = threading.Lock()    # at most one background rebuild at a time
+_generation = 0                     # bumped by reset(): a rebuild started before it is dropped
+
+
+def get_index():
+    global _index
+    index = _index
+    if index is None:
+        with _build_lock:
+            if _index is None:
+                _index = PrefixIndex.build()
+            index = _index
+    elif time.monotonic() - index.built_at > SUGGEST_INDEX_TTL and _refresh_lock.acquire(blocking=False):
+        # stale: keep answering from it while one thread builds the next one
+        threading.Thread(target=_refresh, args=(_generation,), name="suggest-index", daemon=True).start()
+    return index
+
+
+def _refresh(generation):
+    global _index
+    from django.db import connection
+
+    try:
+        index = PrefixIndex.build()
+        if generation == _generation:
+            _index = index
+    finally:
+        connection.close()      # this thread's own connection
+        _refresh_lock.release()
+
+
+def suggest(q, limit=SUGGEST_LIMIT):
+    return get_index().suggest(q, limit)
+
+
+def reset():
+    """Forget the index; the next lookup builds it again."""
+    global _index, _generation
+    _generation += 1
+    _index = None
+
+
+# signal hooks: nothing to patch until the first lookup has built the index
+def product_changed(product_id):
+    if _index is not None:
+        _index.update_product(product_id)
+
+
+def product_removed(product_id):
+    if _index is not None:
+        _index.remove_product(product_id)
+
+
+def category_changed(category_id, title):
+    if _index is not None:
+        _index.update_category(category_id, title)
+
+
+def category_removed(category_id):
+    if _index is not None:
+        _index.remove_category(category_id)
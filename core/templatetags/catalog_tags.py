@@ -0,0 +1,27 @@
+from django import template
+
+from core.catalog import unit_options
+from core.images import thumbnail_url
+
+register = template.Library()
+
+
+@register.inclusion_tag("partials/product_card.html", takes_context=True)
+def product_card(context, product):
+    """
+    Render one product card from ProductCardSerializer data.
+    Pack sizes follow the product's category, looked up in `category_titles`.
+    """
+    titles = context.get("category_titles") or {}
+    units = unit_options(product["price"], product["old_price"], titles.get(product["category"]))
+    return {
+        "product": product,
+        "units": units,
+        "first": units[0],
+    }
+
+
+@register.filter
+def thumbnail(fieldfile):
+    """URL of the smallest resized variant of an image field, for thumbnails."""
+    return thumbnail_url(fieldfile)
@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Cart, CartItem, Category, Product
+from users.models import User
+
+
+class BootstrapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        Category.objects.create(title="Dairy")
+        for i in range(30):
+            # explicit sku keeps the test deterministic
+            Product.objects.create(title=f"Product {i}", price=10, featured=i < 3, sku=f"sku{i:04d}")
+
+    def test_bootstrap_payload(self):
+        response = self.client.get("/api/bootstrap/")
+        data = response.data
+        self.assertEqual(data["categories"][0]["title"], "Dairy")
+        self.assertEqual(len(data["featured"]), 3)
+        self.assertEqual(len(data["products"]["results"]), 24)
+        self.assertIn("/api/products/", data["products"]["next"])
+        self.assertEqual(data["cart"]["quantity"], 0)
+
+    def test_next_link_continues_the_product_list(self):
+        first = self.client.get("/api/bootstrap/").data["products"]
+        rest = self.client.get(first["next"]).data["results"]
+        ids = [p["id"] for p in first["results"]] + [p["id"] for p in rest]
+        self.assertEqual(len(set(ids)), 30)
+
+    def test_catalog_part_is_cached(self):
+        self.client.get("/api/bootstrap/")
+        # anonymous visitor without a session: no cart lookup either
+        with self.assertNumQueries(0):
+            self.client.get("/api/bootstrap/")
+
+    def test_home_page_embeds_bootstrap(self):
+        response = self.client.get("/")
+        self.assertContains(response, 'id="bootstrap-data"')
+
+    def test_cursor_in_the_query_string_is_ignored(self):
+        expected = self.client.get("/api/bootstrap/").data["products"]
+        cursor = expected["next"].split("cursor=")[1]      # page 2 of the product list
+
+        for url in ("/api/bootstrap/", "/"):
+            cache.clear()                   # cold cache: the blob is built from this request
+            self.assertEqual(self.client.get(url, {"cursor": cursor}).status_code, 200)
+            self.assertEqual(self.client.get("/api/bootstrap/").data["products"], expected)
+            cache.clear()
+            self.assertEqual(self.client.get(url, {"cursor": "garbage"}).status_code, 200)
+
+    def test_cart_summary_is_cached(self):
+        user = User.objects.create_user(username="shopper", email="s@example.com", password="pass12345")
+        CartItem.objects.create(cart=Cart.objects.create(user=user), product=Product.objects.first(), quantity=2)
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get("/api/bootstrap/").data["cart"]["quantity"], 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/bootstrap/").data["cart"]["quantity"], 2)
@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core import catalog
+from core.models import Product, Vendor
+from users.models import User
+
+
+class BulkUpdateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.owner = User.objects.create_user(username="vendor", email="v@example.com", password="pass12345")
+        self.owner.profile.role = "vendor"
+        self.owner.profile.save()
+        vendor = Vendor.objects.create(title="Shop", user=self.owner)
+        other = Vendor.objects.create(title="Other shop")
+        self.apple = Product.objects.create(title="Apple", price=100, vendor=vendor, product_status="active")
+        self.mango = Product.objects.create(title="Mango", price=50, vendor=vendor, product_status="active")
+        self.foreign = Product.objects.create(title="Kiwi", price=10, vendor=other)
+        self.client.force_authenticate(self.owner)
+
+    def post(self, updates):
+        return self.client.post("/api/products/bulk-update/", {"updates": updates}, format="json")
+
+    def test_applies_changes_and_reports_every_row(self):
+        version = catalog.catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post([
+                {"pid": self.apple.pid, "price": "90.00", "old_price": "100"},
+                {"sku": self.mango.sku, "product_status": "out of stock"},
+                {"pid": self.mango.pid, "price": "50"},          # same price → unchanged
+                {"pid": self.foreign.pid, "price": "1"},          # another vendor's product
+                {"pid": "nope", "price": "-5"},
+                {"sku": self.apple.sku},
+            ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [r["status"] for r in response.data["results"]],
+            ["updated", "updated", "unchanged", "error", "error", "error"],
+        )
+        self.assertEqual((response.data["updated"], response.data["error"]), (2, 3))
+
+        self.apple.refresh_from_db()
+        self.mango.refresh_from_db()
+        self.foreign.refresh_from_db()
+        self.assertEqual((str(self.apple.price), str(self.apple.old_price)), ("90.00", "100.00"))
+        self.assertIsNotNone(self.apple.updated_at)
+        self.assertEqual(self.mango.product_status, "out of stock")
+        self.assertEqual(str(self.foreign.price), "10.00")
+        self.assertNotEqual(catalog.catalog_version(), version)
+
+    def test_one_update_query_for_many_rows(self):
+        updates = [{"pid": p.pid, "price": "7"} for p in (self.apple, self.mango)]
+        # session/auth aside: one SELECT for the products, one UPDATE, no per-row saves
+        with self.assertNumQueries(4):      # select, savepoint, update, release
+            self.post(updates)
+
+    def test_rejects_bad_payloads_and_customers(self):
+        self.assertEqual(self.post([]).status_code, 400)
+        customer = User.objects.create_user(username="c", email="c@example.com", password="pass12345")
+        self.client.force_authenticate(customer)
+        self.assertEqual(self.post([{"pid": self.apple.pid, "price": "1"}]).status_code, 403)
@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Cart, CartItem, Product
+from users.models import User
+
+
+class CartBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="shopper", email="s@example.com", password="pass12345")
+        self.cart = Cart.objects.create(user=self.user)
+        self.milk = Product.objects.create(title="Milk", price=10)
+        self.bread = Product.objects.create(title="Bread", price=20)
+        self.eggs = Product.objects.create(title="Eggs", price=30)
+        CartItem.objects.create(cart=self.cart, product=self.milk, quantity=2)
+        CartItem.objects.create(cart=self.cart, product=self.eggs, quantity=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def batch(self, operations):
+        return self.client.post("/api/cart/batch/", {"operations": operations}, format="json")
+
+    def lines(self):
+        return dict(self.cart.items.values_list("product__title", "quantity"))
+
+    def test_operations_apply_in_order(self):
+        response = self.batch([
+            {"op": "add", "product": self.milk.pk, "quantity": 3},
+            {"op": "add", "product": self.bread.pk},
+            {"op": "add", "product": self.bread.pk, "quantity": 2},
+            {"op": "remove", "product": self.eggs.pk},
+            {"op": "set", "product": self.eggs.pk, "quantity": 4},
+            {"op": "add", "product": self.eggs.pk},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.lines(), {"Milk": 5, "Bread": 3, "Eggs": 5})
+        self.assertEqual(response.json()["total"], "260.00")
+        self.assertEqual(self.cart.items.get(product=self.bread).price_snapshot, self.bread.price)
+
+    def test_set_zero_and_remove_delete_lines(self):
+        self.batch([
+            {"op": "set", "product": self.milk.pk, "quantity": 0},
+            {"op": "remove", "product": self.eggs.pk},
+        ])
+        self.assertEqual(self.lines(), {})
+
+    def test_one_bad_operation_rejects_the_batch(self):
+        response = self.batch([
+            {"op": "add", "product": self.bread.pk},
+            {"op": "add", "product": 999999},
+            {"op": "set", "product": self.milk.pk},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.lines(), {"Milk": 2, "Eggs": 1})
+
+        response = self.batch([{"op": "add", "product": self.bread.pk}, {"op": "add", "product": 999999}])
+        errors = response.json()["operations"]
+        self.assertEqual(errors[0], {})
+        self.assertIn("product", errors[1])
+        self.assertEqual(self.lines(), {"Milk": 2, "Eggs": 1})
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        products = [Product.objects.create(title=f"P{i}", price=1) for i in range(40)]
+        with self.assertNumQueries(7):
+            self.batch([{"op": "add", "product": p.pk} for p in products])
+        self.assertEqual(self.cart.items.count(), 42)
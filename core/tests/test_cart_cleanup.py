@@ -0,0 +1,71 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.cart_cleanup import cleanup_carts
+from core.models import Cart, CartItem, Product
+from users.models import User
+
+
+class CartCleanupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.milk = Product.objects.create(title="Milk", price=10)
+        self.user = User.objects.create_user(username="shopper", email="s@example.com", password="pass12345")
+
+    def cart(self, days_idle=0, with_item=True, **fields):
+        cart = Cart.objects.create(**fields)
+        if with_item:
+            CartItem.objects.create(cart=cart, product=self.milk)
+        Cart.objects.filter(pk=cart.pk).update(updated_at=timezone.now() - timedelta(days=days_idle))
+        return cart
+
+    def live_session(self):
+        session = SessionStore()
+        session.create()
+        return session.session_key
+
+    def test_only_stale_carts_are_deleted(self):
+        kept = [
+            self.cart(session_id=self.live_session()),
+            self.cart(days_idle=365, user=self.user),                 # user cart with items
+        ]
+        gone = [
+            self.cart(session_id="expired-or-unknown"),
+            self.cart(days_idle=60, session_id=self.live_session()),  # idle anonymous
+            self.cart(days_idle=60, with_item=False, user=User.objects.create_user(
+                username="idle", email="i@example.com", password="pass12345")),
+        ]
+
+        result = cleanup_carts(batch_size=2)
+
+        self.assertEqual(set(Cart.objects.values_list("pk", flat=True)), {c.pk for c in kept})
+        self.assertEqual(
+            result.as_dict(),
+            {"carts": 3, "anonymous_carts": 2, "user_carts": 1, "items": 2, "batches": 2},
+        )
+        self.assertFalse(CartItem.objects.filter(cart_id__in=[c.pk for c in gone]).exists())
+
+    def test_batches_can_be_capped_and_the_run_resumed(self):
+        for i in range(5):
+            self.cart(session_id=f"gone-{i}")
+        self.assertEqual(cleanup_carts(batch_size=2, max_batches=1).carts, 2)
+        self.assertEqual(Cart.objects.count(), 3)
+        self.assertEqual(cleanup_carts(batch_size=2).carts, 3)
+        self.assertFalse(Cart.objects.exists())
+
+    def test_command_reports_counters(self):
+        self.cart(session_id="gone")
+        out = StringIO()
+        call_command("cleanup_carts", "--dry-run", stdout=out)
+        self.assertIn("1 stale carts holding 1 items", out.getvalue())
+        self.assertEqual(Cart.objects.count(), 1)
+
+        call_command("cleanup_carts", "--pause", "0", stdout=out)
+        self.assertIn("Deleted 1 carts (1 anonymous, 0 empty user carts) and 1 items in 1 batches", out.getvalue())
+        self.assertFalse(Cart.objects.exists())
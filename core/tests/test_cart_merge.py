@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core import cart as carts
+from core.models import Cart, CartItem, Product
+from users.models import OTP, User
+
+
+class CartMergeOnLoginTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="shopper", email="s@example.com", password="pass12345")
+        self.milk = Product.objects.create(title="Milk", price=10)
+        self.bread = Product.objects.create(title="Bread", price=20)
+        self.client = APIClient()
+
+    def add_anonymously(self, product, quantity):
+        response = self.client.post("/api/cart/", {"product": product.pk, "quantity": quantity}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+    def login(self):
+        OTP.objects.create(email=self.user.email, code="123456")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/users/login/", {"email": self.user.email, "otp": "123456"}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+    def lines(self, cart):
+        return dict(cart.items.values_list("product__title", "quantity"))
+
+    def test_session_cart_is_summed_into_user_cart(self):
+        user_cart = Cart.objects.create(user=self.user)
+        CartItem.objects.create(cart=user_cart, product=self.milk, quantity=1)
+        self.add_anonymously(self.milk, 2)
+        self.add_anonymously(self.bread, 1)
+
+        self.login()
+
+        self.assertEqual(self.lines(user_cart), {"Milk": 3, "Bread": 1})
+        self.assertEqual(Cart.objects.count(), 1)
+
+    def test_session_cart_is_handed_over_when_user_has_none(self):
+        self.add_anonymously(self.bread, 2)
+        session_cart = Cart.objects.get()
+
+        self.login()
+
+        session_cart.refresh_from_db()
+        self.assertEqual((session_cart.user, session_cart.session_id), (self.user, None))
+        self.assertEqual(self.lines(session_cart), {"Bread": 2})
+
+    def test_merge_costs_the_same_for_any_cart_size(self):
+        user_cart = Cart.objects.create(user=self.user)
+        session_cart = Cart.objects.create(session_id="abc")
+        products = [Product.objects.create(title=f"P{i}", price=1) for i in range(25)]
+        CartItem.objects.bulk_create([CartItem(cart=session_cart, product=p, quantity=1) for p in products])
+        CartItem.objects.create(cart=user_cart, product=products[0], quantity=4)
+
+        with self.assertNumQueries(10):
+            carts.merge_session_cart("abc", self.user)
+        self.assertEqual(user_cart.items.count(), 25)
+        self.assertEqual(user_cart.items.get(product=products[0]).quantity, 5)
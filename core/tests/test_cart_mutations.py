@@ -0,0 +1,71 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core import cart as carts
+from core.models import Cart, CartItem, Product
+from users.models import User
+
+
+class CartMutationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="shopper", email="s@example.com", password="pass12345")
+        self.cart = Cart.objects.create(user=self.user)
+        self.milk = Product.objects.create(title="Milk", price=10, old_price=12)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_add_is_one_upsert_per_product(self):
+        first = carts.add_item(self.cart, self.milk, 2)
+        second = carts.add_item(self.cart, self.milk, 3)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual((second.quantity, second.price_snapshot), (5, self.milk.price))
+        self.assertEqual(self.cart.items.count(), 1)
+
+    def test_change_quantity_updates_or_removes_the_line(self):
+        item = carts.add_item(self.cart, self.milk, 2)
+        self.assertEqual(carts.change_quantity(self.cart, item.pk, 1).quantity, 3)
+        self.assertIsNone(carts.change_quantity(self.cart, item.pk, -3))
+        self.assertFalse(CartItem.objects.exists())
+        with self.assertRaises(CartItem.DoesNotExist):
+            carts.change_quantity(self.cart, item.pk, 1)
+
+    def test_lines_of_other_carts_are_not_touched(self):
+        other = Cart.objects.create(session_id="other")
+        item = carts.add_item(other, self.milk, 1)
+        response = self.client.patch(f"/api/cart/{item.pk}/", {"delta": 1}, format="json")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(CartItem.objects.get(pk=item.pk).quantity, 1)
+
+    def test_delta_response_has_the_line_and_totals_only(self):
+        response = self.client.post("/api/cart/?response=delta", {"product": self.milk.pk, "quantity": 2}, format="json")
+        data = response.json()
+        self.assertNotIn("items", data)
+        self.assertEqual(data["item"]["quantity"], 2)
+        self.assertEqual((data["total"], data["savings"], data["item_count"], data["quantity"]), ("20.00", "4.00", 1, 2))
+
+        response = self.client.patch(f"/api/cart/{data['id']}/?response=delta", {"delta": -2}, format="json")
+        self.assertEqual(response.json(), {
+            "id": data["id"], "item": None, "total": "0.00", "savings": "0.00", "item_count": 0, "quantity": 0,
+        })
+
+    def test_full_response_is_still_the_default(self):
+        response = self.client.post("/api/cart/", {"product": self.milk.pk}, format="json")
+        self.assertEqual(len(response.json()["items"]), 1)
+
+    def test_invalid_quantity_is_rejected(self):
+        for quantity in ("two", 0, -1):
+            response = self.client.post("/api/cart/", {"product": self.milk.pk, "quantity": quantity}, format="json")
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_mutations_refresh_the_cart_and_its_summary(self):
+        before = self.cart.updated_at
+        key = carts._summary_key(f"u{self.user.pk}")
+        cache.set(key, carts.summarize_items([]))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/cart/", {"product": self.milk.pk, "quantity": 1}, format="json")
+        self.cart.refresh_from_db()
+        self.assertGreater(self.cart.updated_at, before)
+        self.assertIsNone(cache.get(key))
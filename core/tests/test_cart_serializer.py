@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Cart, CartItem, Product
+from core.serializers import CartSerializer
+from users.models import User
+
+
+class CartSerializerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="shopper", email="s@example.com", password="pass12345")
+        self.cart = Cart.objects.create(user=self.user)
+
+    def add(self, title, price, old_price, quantity):
+        product = Product.objects.create(title=title, price=price, old_price=old_price)
+        return CartItem.objects.create(cart=self.cart, product=product, quantity=quantity, price_snapshot=price)
+
+    def test_totals_are_exact_decimals(self):
+        self.add("Milk", "0.10", "0.20", 3)
+        self.add("Bread", "0.20", None, 1)
+        data = CartSerializer(Cart.objects.get(pk=self.cart.pk)).data
+
+        self.assertEqual(data["total"], "0.50")
+        self.assertEqual(data["savings"], "0.30")
+        self.assertEqual((data["item_count"], data["quantity"]), (2, 4))
+        self.assertEqual(sum(Decimal(line["line_total"]) for line in data["items"]), Decimal(data["total"]))
+
+    def test_query_count_does_not_grow_with_the_cart(self):
+        for i in range(3):
+            self.add(f"Item {i}", 5, 6, 1)
+        cart = Cart.objects.get(pk=self.cart.pk)
+        with self.assertNumQueries(2):
+            CartSerializer(cart).data
+
+        for i in range(3, 30):
+            self.add(f"Item {i}", 5, 6, 1)
+        cart = Cart.objects.get(pk=self.cart.pk)
+        with self.assertNumQueries(2):
+            data = CartSerializer(cart).data
+        self.assertEqual(data["item_count"], 30)
+
+    def test_cart_endpoint_uses_compact_products(self):
+        self.add("Milk", 10, 12, 2)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        line = client.get("/api/cart/").json()["items"][0]
+        self.assertEqual(line["product"]["title"], "Milk")
+        self.assertNotIn("description", line["product"])
+        self.assertNotIn("images", line["product"])
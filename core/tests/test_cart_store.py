@@ -0,0 +1,83 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import cart_store
+from core.cart_cleanup import cleanup_carts
+from core.models import Cart, CartItem, CartOrderItems, Product
+from users.models import User
+
+
+@override_settings(CART_STORE="core.cart_store.CacheCartStore")
+class CacheCartStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="shopper", email="s@example.com", password="pass12345")
+        self.cart = Cart.objects.create(user=self.user)
+        self.milk = Product.objects.create(title="Milk", price=10, old_price=12)
+        self.bread = Product.objects.create(title="Bread", price=20)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def rows(self):
+        return dict(CartItem.objects.filter(cart=self.cart).values_list("product__title", "quantity"))
+
+    def test_cart_traffic_stays_out_of_the_database(self):
+        CartItem.objects.create(cart=self.cart, product=self.milk, quantity=1)
+        self.client.get("/api/cart/")       # loads the rows once
+
+        self.client.post("/api/cart/", {"product": self.milk.pk, "quantity": 2}, format="json")
+        self.client.post("/api/cart/", {"product": self.bread.pk}, format="json")
+        self.client.patch(f"/api/cart/{self.bread.pk}/", {"delta": 2}, format="json")
+        data = self.client.get("/api/cart/").json()
+
+        self.assertEqual({line["product"]["title"]: line["quantity"] for line in data["items"]}, {"Milk": 3, "Bread": 3})
+        self.assertEqual((data["total"], data["savings"]), ("90.00", "6.00"))
+        self.assertEqual(self.rows(), {"Milk": 1})
+
+        self.client.delete(f"/api/cart/{self.milk.pk}/")
+        cart_store.get_cart_store().flush(self.cart)
+        self.assertEqual(self.rows(), {"Bread": 3})
+
+    def test_changes_are_written_behind(self):
+        with mock.patch.object(cart_store, "CART_STORE_WRITE_BEHIND", 0):
+            self.client.post("/api/cart/", {"product": self.milk.pk}, format="json")
+        self.assertEqual(self.rows(), {"Milk": 1})
+
+    def test_checkout_writes_the_cart_through(self):
+        self.client.post("/api/cart/", {"product": self.milk.pk, "quantity": 2}, format="json")
+        response = self.client.post("/api/checkout/")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(list(CartOrderItems.objects.values_list("item", "qty")), [("Milk", 2)])
+
+    def test_unknown_lines_are_404(self):
+        self.assertEqual(self.client.patch("/api/cart/999/", {"delta": 1}, format="json").status_code, 404)
+        self.assertEqual(self.client.delete("/api/cart/999/").status_code, 404)
+
+    def test_deleted_carts_are_forgotten(self):
+        self.client.post("/api/cart/", {"product": self.milk.pk}, format="json")
+        key = f"cart-store:{self.cart.pk}"
+        self.assertIsNotNone(cache.get(key))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cart.delete()
+        self.assertIsNone(cache.get(key))
+
+    def test_cleanup_keeps_carts_whose_lines_are_only_cached(self):
+        Cart.objects.filter(pk=self.cart.pk).update(updated_at=timezone.now() - timedelta(days=60))
+        self.client.post("/api/cart/", {"product": self.milk.pk}, format="json")
+        Cart.objects.filter(pk=self.cart.pk).update(updated_at=timezone.now() - timedelta(days=60))
+
+        self.assertEqual(cleanup_carts().carts, 0)
+        cart_store.get_cart_store().flush(self.cart)
+        self.assertEqual(self.rows(), {"Milk": 1})
+
+    def test_cleanup_forgets_the_carts_it_deletes(self):
+        self.client.get("/api/cart/")       # cached, nothing pending
+        Cart.objects.filter(pk=self.cart.pk).update(updated_at=timezone.now() - timedelta(days=60))
+
+        self.assertEqual(cleanup_carts().carts, 1)
+        self.assertIsNone(cache.get(f"cart-store:{self.cart.pk}"))
@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
+
+from core.context_processors import cart_context
+from core.models import Cart, CartItem, Product
+from users.models import User
+
+
+class CartSummaryContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="shopper", email="s@example.com", password="pass12345")
+        self.cart = Cart.objects.create(user=self.user)
+        self.milk = Product.objects.create(title="Milk", price=10, old_price=12)
+        self.factory = RequestFactory()
+
+    def request(self, user=None):
+        request = self.factory.get("/")
+        request.user = user or self.user
+        request.session = SessionStore()
+        return request
+
+    def render(self, context):
+        return Template("{{ cart_count }}|{{ cart_total }}|{{ cart_savings }}").render(Context(context))
+
+    def test_unused_context_costs_nothing(self):
+        with self.assertNumQueries(0):
+            cart_context(self.request())
+
+    def test_anonymous_visitor_gets_no_session(self):
+        request = self.request(user=AnonymousUser())
+        with self.assertNumQueries(0):
+            self.assertEqual(self.render(cart_context(request)), "0|0.00|0.00")
+        self.assertIsNone(request.session.session_key)
+
+    def test_summary_is_cached_and_dropped_on_mutation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            item = CartItem.objects.create(cart=self.cart, product=self.milk, quantity=2, price_snapshot=10)
+        self.assertEqual(self.render(cart_context(self.request())), "1|20.00|4.00")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.render(cart_context(self.request())), "1|20.00|4.00")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            item.quantity = 3
+            item.save()
+        self.assertEqual(self.render(cart_context(self.request())), "1|30.00|6.00")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cart.delete()
+        self.assertEqual(self.render(cart_context(self.request())), "0|0.00|0.00")
@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Product, Tags
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.product = Product.objects.create(title="Milk", price=30)
+
+    def test_repeat_reads_are_served_from_cache(self):
+        self.client.get("/api/products/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/products/")
+        self.assertEqual(response.data["results"][0]["title"], "Milk")
+
+    def test_query_params_are_part_of_the_key(self):
+        self.client.get("/api/products/", {"brand": "x", "featured": "true"})
+        with self.assertNumQueries(0):
+            self.client.get("/api/products/", {"featured": "true", "brand": "x"})
+        response = self.client.get("/api/products/", {"brand": "nope"})
+        self.assertEqual(response.data["results"], [])
+
+    def test_product_save_invalidates(self):
+        self.client.get(f"/api/products/{self.product.pk}/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.title = "Toned Milk"
+            self.product.save()
+        response = self.client.get(f"/api/products/{self.product.pk}/")
+        self.assertEqual(response.data["title"], "Toned Milk")
+
+    def test_tag_change_invalidates(self):
+        self.client.get("/api/products/", {"tags": "organic"})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.tags.add(Tags.objects.create(name="organic"))
+        response = self.client.get("/api/products/", {"tags": "organic"})
+        self.assertEqual(len(response.data["results"]), 1)
@@ -0,0 +1,50 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Category, Product
+
+
+class CategoryTreeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.food = Category.objects.create(title="Fruits & Vegetables")
+        self.fruits = Category.objects.create(title="Fruits", parent=self.food)
+        self.exotic = Category.objects.create(title="Exotic", parent=self.fruits)
+        self.dairy = Category.objects.create(title="Dairy")
+
+    def test_paths_follow_parents(self):
+        self.assertTrue(self.exotic.path.startswith(self.fruits.path))
+        self.assertEqual(self.exotic.depth, 2)
+
+    def test_moving_a_category_moves_its_subtree(self):
+        self.fruits.parent = self.dairy
+        self.fruits.save()
+        self.exotic.refresh_from_db()
+        self.assertTrue(self.exotic.path.startswith(self.dairy.path))
+        self.assertEqual(self.exotic.depth, 2)
+
+    def test_cannot_move_under_own_subtree(self):
+        self.food.parent = self.exotic
+        with self.assertRaises(ValueError):
+            self.food.save()
+
+    def test_category_filter_includes_descendants(self):
+        apple = Product.objects.create(title="Apple", category=self.exotic)
+        Product.objects.create(title="Milk", category=self.dairy)
+        response = self.client.get("/api/products/", {"category": self.food.cid})
+        self.assertEqual([p["id"] for p in response.data["results"]], [apple.id])
+
+    def test_tree_endpoint(self):
+        response = self.client.get("/api/categories/tree/")
+        titles = [n["title"] for n in response.data]
+        self.assertEqual(titles, ["Fruits & Vegetables", "Dairy"])
+        self.assertEqual(response.data[0]["children"][0]["children"][0]["title"], "Exotic")
+        # served from cache until a category changes
+        with self.assertNumQueries(0):
+            self.client.get("/api/categories/tree/")
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(title="Bakery")
+        response = self.client.get("/api/categories/tree/")
+        self.assertEqual(len(response.data), 3)
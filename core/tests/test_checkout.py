@@ -1,5 +1,15 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Cart, CartItem, CartOrder, CartOrderItems, Product
+from users.models import User
+
 
 class CheckoutPageTests(TestCase):
     def setUp(self):
@@ -9,3 +19,69 @@ class CheckoutPageTests(TestCase):
         response = self.client.get(reverse('checkout'))
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'checkout.html')
+
+
+class CheckoutOrderTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="buyer", email="b@example.com", password="pass12345")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def fill_cart(self, count):
+        cart, _ = Cart.objects.get_or_create(user=self.user)
+        cart.items.all().delete()
+        for i in range(count):
+            product = Product.objects.create(title=f"Item {i}", price="2.50")      # stock not tracked
+            CartItem.objects.create(cart=cart, product=product, quantity=i + 1)
+
+    def checkout_queries(self, count):
+        self.fill_cart(count)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/api/checkout/")
+        self.assertEqual(response.status_code, 201)
+        return response.data, len(queries)
+
+    def test_order_lines_are_written_in_one_go(self):
+        data, few = self.checkout_queries(3)
+        self.assertEqual(data["price"], "15.00")
+        self.assertEqual([(line["item"], line["qty"], line["total"]) for line in data["items"]], [
+            ("Item 0", 1, "2.50"), ("Item 1", 2, "5.00"), ("Item 2", 3, "7.50"),
+        ])
+        self.assertTrue(all(line["id"] for line in data["items"]))
+
+        _, many = self.checkout_queries(30)
+        self.assertEqual(many, few)
+        self.assertEqual(CartOrderItems.objects.count(), 33)
+
+
+class OrderListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="buyer", email="b@example.com", password="pass12345")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_orders(self, count, lines):
+        for i in range(count):
+            order = CartOrder.objects.create(user=self.user, invoice_no=f"INV{CartOrder.objects.count()}", price=0)
+            for j in range(lines):
+                product = Product.objects.create(title=f"Item {i}-{j}", price="2.50")
+                CartOrderItems.objects.create(order=order, product=product, item=product.title, qty=1, price=Decimal("2.50"))
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/orders/")
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+
+    def test_order_lines_are_prefetched(self):
+        self.add_orders(1, 1)
+        data, few = self.list_queries()
+        self.assertEqual(len(data[0]["items"]), 1)
+        self.assertEqual(data[0]["items"][0]["product"]["title"], "Item 0-0")
+
+        self.add_orders(4, 5)
+        data, many = self.list_queries()
+        self.assertEqual(sum(len(order["items"]) for order in data), 21)
+        self.assertEqual(many, few)
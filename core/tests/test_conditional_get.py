@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Category, Product
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.product = Product.objects.create(title="Milk", price=30)
+
+    def test_catalog_etag_answers_304_without_queries(self):
+        response = self.client.get("/api/categories/")
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/categories/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_catalog_change_changes_etag(self):
+        etag = self.client.get("/api/products/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(title="Dairy")
+        response = self.client.get("/api/products/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_cart_etag_follows_cart_changes(self):
+        response = self.client.get("/api/cart/")
+        etag = response["ETag"]
+        self.assertEqual(self.client.get("/api/cart/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.post("/api/cart/", {"product": self.product.pk, "quantity": 1}, format="json")
+        response = self.client.get("/api/cart/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["items"]), 1)
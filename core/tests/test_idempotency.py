@@ -0,0 +1,145 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.idempotency import IDEMPOTENCY_KEY_TTL, IDEMPOTENCY_LEASE, purge_expired
+from core.models import Cart, CartItem, CartOrder, IdempotencyKey, Payment, Product
+from users.models import User
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="buyer", email="b@example.com", password="pass12345")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        cart, _ = Cart.objects.get_or_create(user=self.user)
+        product = Product.objects.create(title="Tea", price="4.00")      # stock not tracked
+        CartItem.objects.create(cart=cart, product=product, quantity=3)
+
+    def checkout(self, key, **data):
+        return self.client.post("/api/checkout/", data, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retried_checkout_replays_the_first_order(self):
+        first = self.checkout("attempt-1")
+        self.assertEqual(first.status_code, 201)
+
+        with CaptureQueriesContext(connection) as queries:
+            retry = self.checkout("attempt-1")
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.json()["id"], first.data["id"])
+        self.assertEqual(CartOrder.objects.count(), 1)
+        # the key lookup, besides authentication/session work
+        self.assertEqual(sum("core_idempotencykey" in q["sql"] for q in queries.captured_queries), 1)
+
+    def test_new_key_runs_again(self):
+        self.checkout("attempt-1")
+        self.checkout("attempt-2")
+        self.assertEqual(CartOrder.objects.count(), 2)
+
+    def test_same_key_with_another_body_is_refused(self):
+        self.checkout("attempt-1")
+        response = self.checkout("attempt-1", note="different")
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(CartOrder.objects.count(), 1)
+
+    def test_key_still_running_is_a_conflict(self):
+        self.checkout("busy")
+        IdempotencyKey.objects.update(status_code=None, response=None)     # as if the first were still running
+        self.assertEqual(self.checkout("busy").status_code, 409)
+        self.assertEqual(CartOrder.objects.count(), 1)
+
+    def test_abandoned_key_is_taken_over_after_the_lease(self):
+        self.checkout("dead")
+        # the worker died before storing its response
+        IdempotencyKey.objects.update(status_code=None, response=None,
+                                      created_at=timezone.now() - timedelta(seconds=IDEMPOTENCY_LEASE + 1))
+        response = self.checkout("dead")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(CartOrder.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.get(key="dead").status_code, 201)
+        self.assertEqual(self.checkout("dead").json()["id"], response.data["id"])
+
+    def test_failed_request_frees_the_key(self):
+        CartItem.objects.all().delete()
+        self.assertEqual(self.checkout("attempt-1").status_code, 400)
+        # client errors are answers too: replayed, not run again
+        self.assertEqual(self.checkout("attempt-1").status_code, 400)
+
+        with mock.patch("core.api.reserve_stock", side_effect=RuntimeError("db down")):
+            CartItem.objects.create(cart=Cart.objects.get(user=self.user), product=Product.objects.get(), quantity=1)
+            self.assertEqual(self.checkout("attempt-2").status_code, 500)
+        self.assertFalse(IdempotencyKey.objects.filter(key="attempt-2").exists())
+        self.assertEqual(self.checkout("attempt-2").status_code, 201)
+
+    def test_expired_keys(self):
+        self.checkout("attempt-1")
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(seconds=IDEMPOTENCY_KEY_TTL + 1))
+        self.assertEqual(self.checkout("attempt-1").status_code, 201)
+        self.assertEqual(CartOrder.objects.count(), 2)
+
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(seconds=IDEMPOTENCY_KEY_TTL + 1))
+        self.assertEqual(purge_expired(), 1)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_without_key_nothing_is_stored(self):
+        self.client.post("/api/checkout/")
+        self.client.post("/api/checkout/")
+        self.assertEqual(CartOrder.objects.count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class RazorpayOrderTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="payer", email="p@example.com", password="pass12345")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.order = CartOrder.objects.create(user=self.user, invoice_no="INV1", price="12.50")
+        patcher = mock.patch("core.api.razorpay.Client")
+        self.gateway = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.gateway.order.create.side_effect = lambda data: {"id": f"order_{self.gateway.order.create.call_count}",
+                                                              "amount": data["amount"], "currency": data["currency"]}
+
+    def create(self, key=None):
+        headers = {"HTTP_IDEMPOTENCY_KEY": key} if key else {}
+        return self.client.post("/api/payments/create-razorpay-order/", {"order_id": self.order.id},
+                                format="json", **headers)
+
+    def test_gateway_is_called_once_per_key(self):
+        first = self.create("pay-1")
+        retry = self.create("pay-1")
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.json(), first.data)
+        self.assertEqual(self.gateway.order.create.call_count, 1)
+        self.assertEqual(self.gateway.order.create.call_args[0][0]["amount"], 1250)
+
+    def test_pending_payment_is_reused(self):
+        first = self.create()
+        again = self.create()
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.data["razorpay_order_id"], first.data["razorpay_order_id"])
+        self.assertEqual(again.data["payment_id"], first.data["payment_id"])
+        self.assertEqual(self.gateway.order.create.call_count, 1)
+
+    def test_failed_payment_gets_a_new_gateway_order(self):
+        self.create()
+        Payment.objects.update(status="failed")
+        response = self.create()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["razorpay_order_id"], "order_2")
+        self.assertEqual(Payment.objects.get().status, "pending")
+
+    def test_paid_order_is_refused(self):
+        self.create()
+        Payment.objects.update(status="success")
+        self.assertEqual(self.create().status_code, 400)
+        self.assertEqual(self.gateway.order.create.call_count, 1)
@@ -0,0 +1,84 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from core import images
+from core.importers import ProductImporter
+from core.models import Category, Product
+from core.serializers import CategorySerializer, ProductCardSerializer
+
+
+def png_upload(name="apple.png", size=(1200, 800)):
+    buffer = BytesIO()
+    Image.new("RGBA", size, (200, 30, 30, 255)).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media, ignore_errors=True)
+
+    def test_upload_generates_every_width_and_format(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.create(title="Apple", image=png_upload())
+
+        storage = product.image.storage
+        for width in images.IMAGE_VARIANT_WIDTHS:
+            for ext in images.VARIANT_FORMATS:
+                name = images.variant_name(product.image.name, width, ext)
+                self.assertTrue(storage.exists(name), name)
+                with storage.open(name) as fh:
+                    self.assertEqual(Image.open(fh).width, width)
+
+    def test_small_images_are_not_upscaled(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            category = Category.objects.create(title="Fruits", image=png_upload("tiny.png", (100, 100)))
+        name = images.variant_name(category.image.name, images.IMAGE_VARIANT_WIDTHS[-1], "jpg")
+        with category.image.storage.open(name) as fh:
+            self.assertEqual(Image.open(fh).size, (100, 100))
+
+    def test_serializers_expose_srcsets(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.create(title="Apple", image=png_upload())
+            category = Category.objects.create(title="Fruits", image=png_upload("fruits.png"))
+
+        srcset = ProductCardSerializer(product).data["image_srcset"]
+        self.assertEqual(set(srcset), {"webp", "jpg"})
+        for width in images.IMAGE_VARIANT_WIDTHS:
+            self.assertIn(f"_{width}w.webp {width}w", srcset["webp"])
+        self.assertIn("_320w.jpg 320w", CategorySerializer(category).data["image_srcset"]["jpg"])
+
+    def test_no_srcset_before_variants_exist(self):
+        product = Product.objects.create(title="Apple", image=png_upload())   # on_commit never runs here
+        self.assertIsNone(ProductCardSerializer(product).data["image_srcset"])
+
+    def test_imported_products_get_variants(self):
+        name = default_storage.save("imports/pear.png", png_upload("pear.png"))
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductImporter().run(StringIO(f"title,price,image\nPear,3,{name}\nPear 2,4,{name}\n"), "csv")
+
+        product = Product.objects.get(title="Pear")
+        self.assertTrue(images.has_variants(product.image))
+        self.assertIn("_160w.webp", ProductCardSerializer(product).data["image_srcset"]["webp"])
+
+    def test_backfill_command_and_admin_thumbnail(self):
+        product = Product.objects.create(title="Apple", image=png_upload())   # on_commit never runs here
+        self.assertNotIn("_160w", product.product_image())
+
+        call_command("generate_image_variants", stdout=StringIO())
+        self.assertTrue(images.has_variants(product.image))
+        self.assertIn("_160w.jpg", product.product_image())
@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core import search
+from core.importers import ProductImporter
+from core.models import Category, Product, Tags, Vendor
+from users.models import User
+
+CSV = (
+    "title,price,old_price,brand,category,tags,highlights,product_status\n"
+    "Amul Butter,56,60,Amul,Dairy,dairy|Organic,Fresh|Salted,active\n"
+    "No Price,,,,,,,\n"
+    "Mystery,10,,,Nowhere,,,\n"
+    '"Bread, brown",40,,fresho!,dairy,bakery,,\n'
+)
+
+
+class ProductImporterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.dairy = Category.objects.create(title="Dairy")
+        Tags.objects.create(name="organic")
+
+    def test_csv_rows_are_validated_and_bulk_written(self):
+        result = ProductImporter(batch_size=2).run(StringIO(CSV), "csv")
+
+        self.assertEqual((result.created, result.failed), (2, 2))
+        self.assertEqual([e["line"] for e in result.errors], [3, 4])
+        self.assertIn("price", result.errors[0]["errors"])
+        self.assertIn("category", result.errors[1]["errors"])
+
+        butter = Product.objects.get(title="Amul Butter")
+        self.assertEqual(butter.category, self.dairy)
+        self.assertEqual(butter.highlights, ["Fresh", "Salted"])
+        self.assertEqual(sorted(butter.tags.values_list("name", flat=True)), ["dairy", "organic"])
+        self.assertEqual(Tags.objects.count(), 3)   # "Organic" reused the existing tag
+        self.assertEqual(Product.objects.get(title="Bread, brown").category, self.dairy)
+
+        if search.fts_enabled():
+            self.assertEqual(search.search_ids("butter"), [butter.pk])
+
+    def test_jsonl_and_dry_run(self):
+        lines = [
+            json.dumps({"title": "Mango", "price": "120.5", "tags": ["fruit"], "featured": True}),
+            "not json",
+            json.dumps({"title": "Kiwi", "price": -1}),
+        ]
+        result = ProductImporter(dry_run=True).run(StringIO("\n".join(lines)), "jsonl")
+        self.assertEqual((result.created, result.failed), (1, 2))
+        self.assertFalse(Product.objects.exists())
+
+        result = ProductImporter().run(StringIO("\n".join(lines)), "jsonl")
+        mango = Product.objects.get()
+        self.assertTrue(mango.featured)
+        self.assertEqual(str(mango.price), "120.50")
+
+    def test_duplicate_skus_are_rejected(self):
+        Product.objects.create(title="Existing", sku="sku1")
+        data = "title,price,sku\nA,1,sku1\nB,1,sku2\nC,1,sku2\n"
+        result = ProductImporter().run(StringIO(data), "csv")
+        self.assertEqual(result.created, 1)
+        self.assertEqual([e["line"] for e in result.errors], [2, 4])
+
+    def test_command(self):
+        path = self.write_tmp_file(CSV)
+        out = StringIO()
+        call_command("import_products", path, stdout=out)
+        self.assertIn("Imported 2 products", out.getvalue())
+
+    def write_tmp_file(self, content):
+        fh = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False)
+        fh.write(content)
+        fh.close()
+        self.addCleanup(os.remove, fh.name)
+        return fh.name
+
+
+class ProductImportEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        Category.objects.create(title="Dairy")
+        self.vendor_user = User.objects.create_user(username="vendor", email="v@example.com", password="pass12345")
+        self.vendor_user.profile.role = "vendor"
+        self.vendor_user.profile.save()
+        self.vendor = Vendor.objects.create(title="Shop", user=self.vendor_user)
+
+    def test_vendor_upload(self):
+        self.client.force_authenticate(self.vendor_user)
+        upload = SimpleUploadedFile("products.csv", CSV.encode(), content_type="text/csv")
+        response = self.client.post("/api/products/import/", {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["created"], response.data["failed"]), (2, 2))
+        self.assertEqual(Product.objects.filter(vendor=self.vendor).count(), 2)
+
+    def test_customers_cannot_import(self):
+        customer = User.objects.create_user(username="c", email="c@example.com", password="pass12345")
+        self.client.force_authenticate(customer)
+        upload = SimpleUploadedFile("products.csv", CSV.encode())
+        response = self.client.post("/api/products/import/", {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 403)
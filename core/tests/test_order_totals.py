@@ -0,0 +1,75 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import CartOrder, CartOrderItems, Product
+from users.models import User
+
+
+class OrderTotalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="buyer", email="b@example.com", password="pass12345")
+        self.product = Product.objects.create(title="Rice", price=50)
+        self.order = CartOrder.objects.create(user=self.user, price=0)
+
+    def line(self, qty, price, order=None):
+        return CartOrderItems.objects.create(
+            order=order or self.order, product=self.product, item="Rice", qty=qty, price=Decimal(price)
+        )
+
+    def price(self, order=None):
+        return CartOrder.objects.values_list("price", flat=True).get(pk=(order or self.order).pk)
+
+    def test_line_changes_move_the_total(self):
+        first = self.line(2, "50.00")
+        self.line(1, "20.00")
+        self.assertEqual(self.price(), Decimal("120.00"))
+
+        first.qty = 3
+        first.save()
+        self.assertEqual(self.price(), Decimal("170.00"))
+
+        first.delete()
+        self.assertEqual(self.price(), Decimal("20.00"))
+
+    def test_moving_a_line_moves_its_total(self):
+        line = self.line(1, "10.00")
+        other = CartOrder.objects.create(user=self.user, price=0)
+        line.order = other
+        line.save()
+        self.assertEqual((self.price(), self.price(other)), (Decimal("0.00"), Decimal("10.00")))
+
+    def test_status_updates_are_a_single_update(self):
+        line = self.line(2, "50.00")
+        order = CartOrder.objects.get(pk=self.order.pk)
+        with self.assertNumQueries(1):
+            order.paid_status = True
+            order.save(update_fields=["paid_status"])
+        with self.assertNumQueries(1):
+            line.item_status = "shipped"
+            line.save(update_fields=["item_status"])
+        self.assertEqual(self.price(), Decimal("100.00"))
+
+    def test_saving_the_order_does_not_read_its_lines(self):
+        self.line(2, "50.00")
+        order = CartOrder.objects.get(pk=self.order.pk)
+        with self.assertNumQueries(1):
+            order.order_status = "shipped"
+            order.save()
+
+    def test_item_status_endpoint(self):
+        line = self.line(1, "50.00")
+        admin = User.objects.create_user(username="admin", email="a@example.com", password="pass12345", is_staff=True)
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.patch(
+            f"/api/orders/{self.order.pk}/update_item_status/",
+            {"item_id": line.pk, "item_status": "shipped"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        line.refresh_from_db()
+        self.assertEqual(line.item_status, "shipped")
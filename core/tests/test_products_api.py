@@ -0,0 +1,108 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import Category, Product, Tags
+
+
+class ProductPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(title="Fruits")
+        for i in range(5):
+            Product.objects.create(title=f"Product {i}", category=self.category, price=10 + i)
+
+    def test_list_is_cursor_paginated(self):
+        response = self.client.get("/api/products/", {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_cursor_walks_every_product_once(self):
+        seen = []
+        url = "/api/products/?page_size=2"
+        while url:
+            response = self.client.get(url)
+            seen += [p["id"] for p in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(sorted(seen), sorted(Product.objects.values_list("id", flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_tied_sort_keys_page_without_offset(self):
+        Product.objects.filter(title="Product 4").update(rating_avg=4.5, rating_count=2)   # the rest tie at 0
+        expected = list(Product.objects.order_by("-rating_avg", "-rating_count", "-id").values_list("id", flat=True))
+
+        pages, url = [], "/api/products/?sort=rating&page_size=2"
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = self.client.get(url)
+                pages.append(response.data)
+                url = response.data["next"]
+        self.assertEqual([p["id"] for page in pages for p in page["results"]], expected)
+        self.assertFalse(any("OFFSET" in q["sql"] for q in queries.captured_queries))
+
+        back = self.client.get(pages[-1]["previous"]).data
+        self.assertEqual([p["id"] for p in back["results"]], expected[2:4])
+
+    def test_bad_cursor_is_404(self):
+        response = self.client.get("/api/products/", {"cursor": "cD1ub3QtanNvbg=="})   # p=not-json
+        self.assertEqual(response.status_code, 404)
+
+
+class ProductCardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        for i in range(3):
+            Product.objects.create(title=f"Product {i}", description="long text", price=10)
+
+    def test_list_returns_card_projection(self):
+        response = self.client.get("/api/products/")
+        card = response.data["results"][0]
+        self.assertNotIn("description", card)
+        self.assertIn("image", card)
+
+    def test_full_view_uses_prefetched_images(self):
+        # products + prefetched images + prefetched tags, independent of the number of products
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/products/", {"view": "full"})
+        self.assertIn("images", response.data["results"][0])
+
+
+class ProductFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        organic = Tags.objects.create(name="organic")
+        self.a = Product.objects.create(title="A", brand="fresho!", price=40, old_price=80, featured=True)
+        self.b = Product.objects.create(title="B", brand="fresho!", price=120)
+        self.c = Product.objects.create(title="C", brand="Amul", price=60, old_price=66)
+        self.a.tags.add(organic)
+        self.c.tags.add(organic)
+
+    def ids(self, **params):
+        response = self.client.get("/api/products/", params)
+        return sorted(p["id"] for p in response.data["results"])
+
+    def test_filters(self):
+        self.assertEqual(self.ids(brand="fresho!"), [self.a.id, self.b.id])
+        self.assertEqual(self.ids(min_price=50, max_price=100), [self.c.id])
+        self.assertEqual(self.ids(tags="organic"), [self.a.id, self.c.id])
+        self.assertEqual(self.ids(featured="true"), [self.a.id])
+        self.assertEqual(self.ids(min_discount=20), [self.a.id])
+
+    def test_facet_counts_use_one_query_per_facet(self):
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/products/facets/", {"max_price": 100})
+        data = response.data
+        self.assertEqual(data["total"], 2)
+        self.assertEqual(data["brands"], [{"brand": "Amul", "count": 1}, {"brand": "fresho!", "count": 1}])
+        self.assertEqual(data["tags"][0]["count"], 2)
+        self.assertEqual([b["count"] for b in data["price"]], [1, 1, 0, 0, 0])
+
+    def test_bad_price_is_rejected(self):
+        response = self.client.get("/api/products/", {"min_price": "cheap"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Product, ProductReview
+from users.models import User
+
+
+class RatingAggregateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="reviewer", email="r@example.com", password="pass12345")
+        self.apple = Product.objects.create(title="Apple")
+        self.mango = Product.objects.create(title="Mango")
+
+    def review(self, product, rating):
+        return ProductReview.objects.create(user=self.user, product=product, review="ok", rating=rating)
+
+    def test_create_update_delete_keep_aggregates_in_step(self):
+        first = self.review(self.apple, "5")
+        self.review(self.apple, "2")
+        self.apple.refresh_from_db()
+        self.assertEqual((self.apple.rating_count, self.apple.rating_sum), (2, 7))
+        self.assertAlmostEqual(self.apple.rating_avg, 3.5)
+        self.assertEqual(self.apple.rating_histogram, {"1": 0, "2": 1, "3": 0, "4": 0, "5": 1})
+
+        first.rating = "4"
+        first.save()
+        self.apple.refresh_from_db()
+        self.assertEqual(self.apple.rating_histogram["5"], 0)
+        self.assertAlmostEqual(self.apple.rating_avg, 3.0)
+
+        first.product = self.mango
+        first.save()
+        self.apple.refresh_from_db()
+        self.mango.refresh_from_db()
+        self.assertEqual((self.apple.rating_count, self.mango.rating_count), (1, 1))
+
+        ProductReview.objects.filter(product=self.apple).get().delete()
+        self.apple.refresh_from_db()
+        self.assertEqual((self.apple.rating_count, self.apple.rating_sum, self.apple.rating_avg), (0, 0, 0))
+
+    def test_serializers_and_sort_by_rating(self):
+        self.review(self.mango, "5")
+        self.review(self.apple, "3")
+        card = self.client.get("/api/products/", {"sort": "rating"}).data["results"][0]
+        self.assertEqual((card["title"], card["rating_avg"], card["rating_count"]), ("Mango", 5.0, 1))
+
+        detail = self.client.get(f"/api/products/{self.mango.id}/").data
+        self.assertEqual(detail["rating_histogram"]["5"], 1)
+
+        self.assertEqual(self.client.get("/api/products/", {"sort": "stars"}).status_code, 400)
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core import search
+from core.models import Category, Product, Tags
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.fruits = Category.objects.create(title="Fruits")
+        self.apple = Product.objects.create(title="Shimla Apple", brand="fresho!", category=self.fruits)
+        self.juice = Product.objects.create(title="Mixed Juice", brand="Real", description="made from apple and orange")
+        self.milk = Product.objects.create(title="Toned Milk", brand="Amul")
+
+    def search(self, q):
+        response = self.client.get("/api/products/", {"q": q})
+        return [p["id"] for p in response.data["results"]]
+
+    def test_title_match_ranks_above_description_match(self):
+        self.assertEqual(self.search("apple"), [self.apple.id, self.juice.id])
+
+    def test_prefix_match(self):
+        self.assertEqual(self.search("ton mil"), [self.milk.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk.title = "Toned Buttermilk"
+            self.milk.save()
+        self.assertEqual(self.search("buttermilk"), [self.milk.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk.delete()
+        self.assertEqual(self.search("buttermilk"), [])
+
+    def test_tags_and_category_are_searchable(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk.tags.add(Tags.objects.create(name="organic"))
+        self.assertEqual(self.search("organic"), [self.milk.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fruits.title = "Seasonal"
+            self.fruits.save()
+        self.assertEqual(self.search("seasonal"), [self.apple.id])
+
+    def test_rebuild_command(self):
+        search.remove_products(Product.objects.values_list("pk", flat=True))
+        self.assertEqual(self.search("apple"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("rebuild_search_index", stdout=open("/dev/null", "w"))
+        self.assertEqual(self.search("apple"), [self.apple.id, self.juice.id])
+
+    def test_filters_apply_to_every_match(self):
+        bakery = Category.objects.create(title="Bakery")
+        with self.captureOnCommitCallbacks(execute=True):
+            pie = Product.objects.create(title="Pie", description="apple pie", category=bakery)
+        capped = search.search_ids
+        # a ranked-id cap of 1 holds only the title match, "Shimla Apple"
+        with mock.patch.object(search, "search_ids", lambda q, limit=1: capped(q, limit)):
+            response = self.client.get("/api/products/", {"q": "apple", "category": bakery.pk})
+        self.assertEqual([p["id"] for p in response.data["results"]], [pie.id])
+
+    def test_cursor_walks_results_in_rank_order(self):
+        seen, url = [], "/api/products/?q=apple&page_size=1"
+        while url:
+            response = self.client.get(url)
+            seen += [p["id"] for p in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(seen, [self.apple.id, self.juice.id])
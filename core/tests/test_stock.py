@@ -0,0 +1,154 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import stock
+from core.models import Cart, CartItem, CartOrder, Payment, Product, StockReservation
+from users.models import User
+
+
+class StockReservationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="buyer", email="b@example.com", password="pass12345")
+        self.apple = Product.objects.create(title="Apple", price=10, stock=5, product_status="active")
+        self.mango = Product.objects.create(title="Mango", price=20, stock=1, product_status="active")
+        self.salt = Product.objects.create(title="Salt", price=5)       # untracked
+
+    def order(self):
+        return CartOrder.objects.create(user=self.user, price=0)
+
+    def test_reserve_decrements_and_flips_sold_out_products(self):
+        order = self.order()
+        with transaction.atomic():
+            stock.reserve_stock(order, [(self.apple.pk, 2), (self.mango.pk, 1), (self.salt.pk, 100)])
+
+        self.apple.refresh_from_db()
+        self.mango.refresh_from_db()
+        self.assertEqual(self.apple.stock, 3)
+        self.assertEqual((self.mango.stock, self.mango.product_status), (0, "out of stock"))
+        self.assertEqual(order.stock_reservations.count(), 2)
+
+    def test_short_line_rolls_back_every_line(self):
+        order = self.order()
+        with self.assertRaises(stock.OutOfStock) as ctx:
+            with transaction.atomic():
+                stock.reserve_stock(order, [(self.apple.pk, 2), (self.mango.pk, 2)])
+        self.assertEqual((ctx.exception.product_id, ctx.exception.available), (self.mango.pk, 1))
+        self.apple.refresh_from_db()
+        self.assertEqual(self.apple.stock, 5)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_release_is_idempotent_and_restocks(self):
+        order = self.order()
+        with transaction.atomic():
+            stock.reserve_stock(order, [(self.mango.pk, 1)])
+        self.assertEqual(stock.release_order(order), 1)
+        self.assertEqual(stock.release_order(order), 0)
+        self.mango.refresh_from_db()
+        self.assertEqual((self.mango.stock, self.mango.product_status), (1, "active"))
+
+    def test_expired_holds_are_released_and_orders_cancelled(self):
+        order = self.order()
+        with transaction.atomic():
+            stock.reserve_stock(order, [(self.apple.pk, 4)])
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        out = StringIO()
+        call_command("release_expired_reservations", stdout=out)
+        self.assertIn("Released 1", out.getvalue())
+        self.apple.refresh_from_db()
+        order.refresh_from_db()
+        self.assertEqual(self.apple.stock, 5)
+        self.assertEqual(order.order_status, "cancelled")
+
+    def test_committed_holds_are_never_released(self):
+        order = self.order()
+        with transaction.atomic():
+            stock.reserve_stock(order, [(self.apple.pk, 1)])
+        stock.commit_reservations(order)
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(stock.release_expired_reservations(), 0)
+
+
+class CheckoutStockTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="buyer", email="b@example.com", password="pass12345")
+        self.client.force_authenticate(self.user)
+        self.product = Product.objects.create(title="Mango", price=20, stock=2, product_status="active")
+        cart = Cart.objects.create(user=self.user)
+        self.item = CartItem.objects.create(cart=cart, product=self.product, quantity=2)
+
+    def test_checkout_reserves_stock(self):
+        response = self.client.post("/api/checkout/")
+        self.assertEqual(response.status_code, 201)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 0)
+
+    def test_checkout_refuses_to_oversell(self):
+        Product.objects.filter(pk=self.product.pk).update(stock=1)
+        response = self.client.post("/api/checkout/")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["available"], 1)
+        self.assertFalse(CartOrder.objects.exists())
+
+
+class LatePaymentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="buyer", email="b@example.com", password="pass12345")
+        self.client.force_authenticate(self.user)
+        self.product = Product.objects.create(title="Mango", price=20, stock=2, product_status="active")
+        CartItem.objects.create(cart=Cart.objects.create(user=self.user), product=self.product, quantity=2)
+        self.order = CartOrder.objects.get(pk=self.client.post("/api/checkout/").data["id"])
+        self.payment = Payment.objects.create(order=self.order, user=self.user, method="razorpay",
+                                              amount=self.order.price, razorpay_order_id="order_1")
+        patcher = mock.patch("core.api.razorpay.Client")
+        self.gateway = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        # the customer takes longer than the hold to pay
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        stock.release_expired_reservations()
+
+    def verify(self):
+        return self.client.post("/api/payments/verify-razorpay-payment/", {
+            "payment_id": self.payment.pk, "razorpay_payment_id": "pay_1",
+            "razorpay_order_id": "order_1", "razorpay_signature": "sig",
+        }, format="json")
+
+    def test_late_payment_takes_the_units_again(self):
+        self.assertEqual(self.verify().status_code, 200)
+        self.product.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual(self.product.stock, 0)
+        self.assertEqual((self.order.paid_status, self.order.order_status), (True, "processing"))
+        self.assertEqual(sum(self.order.stock_reservations.filter(status="committed").values_list("quantity", flat=True)), 2)
+
+    def test_late_payment_for_resold_units_is_refunded(self):
+        Product.objects.filter(pk=self.product.pk).update(stock=1)     # someone else bought one
+        response = self.verify()
+        self.assertEqual(response.status_code, 409)
+        self.gateway.payment.refund.assert_called_once_with("pay_1", {"amount": 4000})
+        self.product.refresh_from_db()
+        self.order.refresh_from_db()
+        self.payment.refresh_from_db()
+        self.assertEqual(self.product.stock, 1)
+        self.assertEqual((self.order.paid_status, self.order.order_status), (False, "cancelled"))
+        self.assertEqual(self.payment.status, "failed")
+        self.assertFalse(self.order.stock_reservations.filter(status="committed").exists())
+
+    def test_cancelled_order_gets_no_new_gateway_order(self):
+        response = self.client.post("/api/payments/create-razorpay-order/", {"order_id": self.order.pk}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.gateway.order.create.assert_not_called()
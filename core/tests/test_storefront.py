@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.catalog import unit_options
+from core.models import Category, Product
+
+
+class StorefrontRenderTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.veg = Category.objects.create(title="Fresh Vegetables")
+        self.onion = Product.objects.create(title="Onion", price=40, old_price=50, category=self.veg)
+        self.potato = Product.objects.create(title="Potato", price=30, category=self.veg)
+
+    def test_unit_options_scale_prices(self):
+        units = unit_options(40, 50, "Fresh Vegetables")
+        self.assertEqual([u["label"] for u in units], ["250 g", "500 g", "1 kg"])
+        self.assertEqual(str(units[0]["price"]), "10.00")
+        self.assertEqual(units[0]["discount"], 20)
+        self.assertEqual([u["label"] for u in unit_options(10, None, "Toys")], ["1 pc"])
+
+    def test_home_page_renders_product_cards(self):
+        response = self.client.get("/")
+        self.assertContains(response, f'data-id="{self.onion.id}"')
+        self.assertContains(response, "20% OFF")
+        self.assertContains(response, "Fresh Vegetables")
+
+    def test_home_grid_is_fragment_cached_until_catalog_changes(self):
+        self.client.get("/")
+        Product.objects.filter(pk=self.onion.pk).update(title="Red Onion")   # no signal, no bump
+        self.assertNotContains(self.client.get("/"), "Red Onion")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.onion.title = "Red Onion"
+            self.onion.save()
+        self.assertContains(self.client.get("/"), "Red Onion")
+
+    def test_product_detail_renders_units_and_similar_products(self):
+        response = self.client.get(f"/product/{self.onion.id}/")
+        self.assertContains(response, "500 g")
+        self.assertContains(response, "Similar products")
+        self.assertContains(response, f'data-id="{self.potato.id}"')
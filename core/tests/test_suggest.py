@@ -0,0 +1,94 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core import suggest
+from core.models import Category, Product
+
+
+class SuggestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        suggest.reset()
+        self.client = APIClient()
+        self.dairy = Category.objects.create(title="Dairy & Eggs")
+        self.milk = Product.objects.create(title="Amul Toned Milk", brand="Amul", category=self.dairy)
+        self.butter = Product.objects.create(title="Amul Butter", brand="Amul", category=self.dairy, featured=True)
+        self.mango = Product.objects.create(title="Alphonso Mango", brand="fresho!")
+
+    def tearDown(self):
+        suggest.reset()
+
+    def texts(self, q, **params):
+        response = self.client.get("/api/products/suggest/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [(s["type"], s["text"]) for s in response.data["results"]]
+
+    def test_matches_any_word_start_ranked_by_popularity(self):
+        results = self.texts("amul")
+        # brand (two products) first, then the featured product
+        self.assertEqual(results[:2], [("brand", "Amul"), ("product", "Amul Butter")])
+        self.assertIn(("product", "Amul Toned Milk"), self.texts("toned m"))
+        self.assertEqual(self.texts("egg"), [("category", "Dairy & Eggs")])
+        self.assertEqual(self.texts("zzz"), [])
+        self.assertEqual(self.texts("a"), [])   # below SUGGEST_MIN_LENGTH
+
+    def test_limit(self):
+        self.assertEqual(len(self.texts("am", limit=1)), 1)
+        self.assertEqual(self.client.get("/api/products/suggest/", {"q": "am", "limit": "x"}).status_code, 400)
+
+    def test_index_follows_product_and_category_changes(self):
+        self.texts("amul")   # build
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk.title = "Amul Gold Milk"
+            self.milk.save()
+            self.butter.delete()
+            Category.objects.create(title="Bakery")
+        self.assertEqual(self.texts("toned"), [])
+        self.assertIn(("product", "Amul Gold Milk"), self.texts("gold"))
+        self.assertNotIn(("product", "Amul Butter"), self.texts("butter"))
+        self.assertEqual(self.texts("bak"), [("category", "Bakery")])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.milk.delete()
+        self.assertNotIn(("brand", "Amul"), self.texts("amul"))
+
+    def test_lookup_is_fast(self):
+        index = suggest.get_index()
+        start = time.perf_counter()
+        for i in range(1000):
+            index.suggest(f"am{i % 10}")
+        self.assertLess((time.perf_counter() - start) / 1000, 0.001)
+
+    def test_stale_index_keeps_answering_while_rebuilt_in_background(self):
+        stale = suggest.get_index()
+        stale.built_at -= suggest.SUGGEST_INDEX_TTL + 1
+        Product.objects.create(title="Amul Cheese Slices", brand="Amul")     # only the rebuild picks it up
+
+        with mock.patch.object(suggest.threading, "Thread") as thread, \
+                mock.patch.object(suggest.PrefixIndex, "build", wraps=suggest.PrefixIndex.build) as build:
+            self.assertIs(suggest.get_index(), stale)
+            self.assertIs(suggest.get_index(), stale)     # one rebuild at a time
+            build.assert_not_called()
+        self.assertEqual(thread.call_count, 1)
+
+        # what the background thread runs (its own connection is closed afterwards)
+        with mock.patch.object(connection, "close"):
+            thread.call_args.kwargs["target"](*thread.call_args.kwargs["args"])
+        self.assertIsNot(suggest.get_index(), stale)
+        self.assertIn("Amul Cheese Slices", [s["text"] for s in suggest.suggest("chee")])
+
+    def test_reset_drops_a_rebuild_already_running(self):
+        stale = suggest.get_index()
+        stale.built_at -= suggest.SUGGEST_INDEX_TTL + 1
+        with mock.patch.object(suggest.threading, "Thread") as thread:
+            suggest.get_index()
+        suggest.reset()
+        fresh = suggest.get_index()
+        with mock.patch.object(connection, "close"):
+            thread.call_args.kwargs["target"](*thread.call_args.kwargs["args"])
+        self.assertIs(suggest.get_index(), fresh)
@@ -3,7 +3,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
 
-from .api import ProductViewSet, CategoryViewSet, CartViewSet, CheckoutView, OrderViewSet, VendorViewSet, UserViewSet, AddressViewSet
+from .api import ProductViewSet, CategoryViewSet, CartViewSet, CheckoutView, OrderViewSet, VendorViewSet, UserViewSet, AddressViewSet, BootstrapView
 from core.api import CreateRazorpayOrderView, VerifyRazorpayPaymentView
 
 
@@ -32,6 +32,7 @@ urlpatterns = [
     # API endpoints
     path('api/', include(router.urls)),
     path('api/checkout/', CheckoutView.as_view(), name='api-checkout'),
+    path('api/bootstrap/', BootstrapView.as_view(), name='api-bootstrap'),
     
 
     path('api/payments/create-razorpay-order/', CreateRazorpayOrderView.as_view(), name='create-razorpay-order'),
@@ -9,37 +9,42 @@ from rest_framework.views import APIView
 import razorpay
 from django.conf import settings
 from .models import CartOrder, Payment
+from .api import build_bootstrap
+from .cart import get_or_create_cart, summarize_items
+from .cart_store import attach_lines, get_cart_store
+from .catalog import (
+    CATALOG_CACHE_TIMEOUT, catalog_version, category_titles, get_home_rails, get_similar_products, unit_options,
+)
 
 
 
 
 
 def home(request):
-    return render(request,"index.html")
+    # same payload as /api/bootstrap/; the product grid is rendered here,
+    # the rest is embedded as JSON so index.js needs no extra requests
+    bootstrap = build_bootstrap(request)
+    return render(request, "index.html", {
+        "bootstrap": bootstrap,
+        "embedded_bootstrap": {"categories": bootstrap["categories"], "cart": bootstrap["cart"]},
+        "category_titles": category_titles(),
+        "rails": get_home_rails,                 # callable: only runs when the fragment cache misses
+        "catalog_version": catalog_version(),
+        "catalog_cache_timeout": CATALOG_CACHE_TIMEOUT,
+    })
    
 def cart_view(request):
     # Allow all users (authenticated or anonymous) to view cart
 
-    cart = None
-    savings = 0
-    total = 0
-
-    if request.user.is_authenticated:
-        cart, _ = Cart.objects.get_or_create(user=request.user)
-    else:
-        sid = request.session.session_key or request.session.create() or request.session.session_key
-        cart, _ = Cart.objects.get_or_create(session_id=sid)
-
-    if cart:
-        for item in cart.items.all():
-            total += item.line_total
-            if item.product.old_price:
-                savings += (float(item.product.old_price) - float(item.product.price)) * item.quantity
+    cart = get_or_create_cart(request)
+    lines = get_cart_store().lines(cart)
+    attach_lines(cart, lines)
+    summary = summarize_items(lines)
 
     return render(request, "cart.html", {
         "cart": cart,
-        "cart_total": round(total, 2),
-        "cart_savings": round(savings, 2),
+        "cart_total": summary["total"],
+        "cart_savings": summary["savings"],
     })
 
 
@@ -49,7 +54,7 @@ def cart_view(request):
 
 
 def product_detail(request, pk):
-    product = get_object_or_404(Product, pk=pk)
+    product = get_object_or_404(Product.objects.select_related('category'), pk=pk)
 
     discount = None
     if product.old_price and float(product.old_price) > float(product.price):
@@ -58,6 +63,11 @@ def product_detail(request, pk):
     return render(request, "product_detail.html", {
         "product": product,
         "discount": discount,
+        "units": unit_options(product.price, product.old_price, product.category.title if product.category else None),
+        "category_titles": category_titles(),
+        "similar": lambda: get_similar_products(product),   # only runs when the fragment cache misses
+        "catalog_version": catalog_version(),
+        "catalog_cache_timeout": CATALOG_CACHE_TIMEOUT,
     })
 
 
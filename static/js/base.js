@@ -2,21 +2,66 @@ document.addEventListener('DOMContentLoaded', () => {
   
   const categoryList = document.getElementById('category-list');
 
-  // Fetch categories
-  fetch('/api/categories/')
-    .then(res => res.json())
-    .then(data => {
-      const categories = data.results ? data.results : data;
-      categoryList.innerHTML = categories.map(cat => `
-        <li><a class="dropdown-item" href="/category/${cat.id}/">${cat.title}</a></li>
-      `).join('');
+  // Category tree: embedded on the home page, otherwise one cached request
+  const embedded = document.getElementById('bootstrap-data');
+  const treePromise = embedded
+    ? Promise.resolve(JSON.parse(embedded.textContent).categories || [])
+    : fetch('/api/categories/tree/').then(res => res.json());
+
+  treePromise
+    .then(tree => {
+      const rows = [];
+      const walk = (nodes) => nodes.forEach(cat => {
+        rows.push(`
+        <li><a class="dropdown-item" href="/category/${cat.id}/" style="padding-left:${1 + cat.depth}rem">${cat.title}</a></li>
+      `);
+        walk(cat.children || []);
+      });
+      walk(tree);
+      categoryList.innerHTML = rows.join('');
     })
     .catch(err => {
       console.error("Failed to load categories", err);
       categoryList.innerHTML = '<li><span class="dropdown-item text-muted">No categories</span></li>';
     });
 
-  // Call cart count update once on load
+  // Search suggestions while typing (debounced, see /api/products/suggest/)
+  const searchInput = document.getElementById('search-input');
+  const suggestionList = document.getElementById('search-suggestions');
+  let suggestTimer = null;
+  if (searchInput && suggestionList) {
+    searchInput.addEventListener('input', () => {
+      clearTimeout(suggestTimer);
+      const q = searchInput.value.trim();
+      if (q.length < 2) {
+        suggestionList.innerHTML = '';
+        return;
+      }
+      suggestTimer = setTimeout(() => {
+        fetch(`/api/products/suggest/?q=${encodeURIComponent(q)}`)
+          .then(res => res.json())
+          .then(data => {
+            suggestionList.innerHTML = '';
+            (data.results || []).forEach(s => {
+              const option = document.createElement('option');
+              option.value = s.text;
+              suggestionList.appendChild(option);
+            });
+          })
+          .catch(err => console.error("Failed to load suggestions", err));
+      }, 150);
+    });
+  }
+
+  // Cart count: use the embedded summary when there is one, otherwise ask the API
+  const cartCountEl = document.getElementById("cart-count");
+  if (embedded && cartCountEl) {
+    const cart = JSON.parse(embedded.textContent).cart;
+    if (cart) {
+      cartCountEl.textContent = cart.quantity > 0 ? cart.quantity : "";
+      return;
+    }
+  }
   updateCartCount();
 });
 
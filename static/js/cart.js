@@ -89,7 +89,8 @@ document.addEventListener("DOMContentLoaded", () => {
   // Update Quantity
   // ----------------------
   async function updateQuantity(itemId, delta) {
-    let res = await fetch(`/api/cart/${itemId}/`, {
+    // compact response: only the changed line and the new totals
+    let res = await fetch(`/api/cart/${itemId}/?response=delta`, {
       method: "PATCH",
       headers: {
         "Content-Type": "application/json",
@@ -97,7 +98,17 @@ document.addEventListener("DOMContentLoaded", () => {
       },
       body: JSON.stringify({ delta }),
     });
-    loadCart();
+    if (!res.ok) return loadCart();
+
+    const data = await res.json();
+    const row = body.querySelector(`tr[data-item-id="${itemId}"]`);
+    if (!data.item || !row || !data.item_count) return loadCart();
+
+    row.querySelector(".qty-input").value = data.item.quantity;
+    row.querySelector(".item-subtotal").textContent = `₹${data.item.line_total}`;
+    subtotalEl.textContent = data.total;
+    savingsEl.textContent = data.savings;
+    if (typeof updateCartCount === "function") updateCartCount();
   }
 
   // ----------------------
@@ -21,10 +21,11 @@ document.addEventListener("DOMContentLoaded", async () => {
 
     if (!res.ok) throw new Error(data.detail || "Failed to load cart");
 
-    const subtotal = data.total || 0;
+    // amounts come as decimal strings ("123.40")
+    const subtotal = Number(data.total) || 0;
     const deliveryFee = 20; // example, static
-    const savings = data.savings || 0;
-    const finalTotal = subtotal + deliveryFee - savings;
+    const savings = Number(data.savings) || 0;
+    const finalTotal = (subtotal + deliveryFee - savings).toFixed(2);
 
     subtotalEl.textContent = subtotal;
     deliveryEl.textContent = deliveryFee;
@@ -36,6 +37,9 @@ document.addEventListener("DOMContentLoaded", async () => {
   }
 
   // --- Step 2: Handle Payment ---
+  // one key per visit: a retried click gets the same order back instead of a second one
+  const checkoutKey = crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random()}`;
+
   payBtn.addEventListener("click", async () => {
     payBtn.disabled = true;
     payBtn.textContent = "Processing...";
@@ -47,6 +51,7 @@ document.addEventListener("DOMContentLoaded", async () => {
         headers: {
           "Content-Type": "application/json",
           Authorization: `Bearer ${token}`,
+          "Idempotency-Key": checkoutKey,
         },
       });
       let createdOrder = await orderRes.json();
@@ -58,6 +63,7 @@ document.addEventListener("DOMContentLoaded", async () => {
         headers: {
           "Content-Type": "application/json",
           Authorization: `Bearer ${token}`,
+          "Idempotency-Key": checkoutKey,
         },
         body: JSON.stringify({ order_id: createdOrder.id, method: "razorpay" }),
       });
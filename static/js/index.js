@@ -1,47 +1,70 @@
 console.log("✅ index.js loaded!");
-fetch("/api/products/").then(r => r.json()).then(d => console.log(d));
 
 
 document.addEventListener("DOMContentLoaded", async () => {
-  const PRODUCTS_URL = "/api/products/";
-  const CATEGORIES_URL = "/api/categories/";
+  const PRODUCTS_URL = "/api/products/?page_size=24";
+  const BOOTSTRAP_URL = "/api/bootstrap/";
   const productsRow = document.getElementById("products-row");
   const viewport = document.querySelector(".products-viewport");
   const prevBtn = document.getElementById("prevBtn");
   const nextBtn = document.getElementById("nextBtn");
 
-  // --- 1. Fetch categories ---
-  const categoryRes = await fetch(CATEGORIES_URL);
-  const categories = await categoryRes.json();
-  const categoryMap = {};
-  categories.forEach(c => {
-    categoryMap[c.id] = (c.name ? c.name.toLowerCase() : "others");
-  });
-
-  // --- 2. Fetch products ---
-  const productRes = await fetch(PRODUCTS_URL);
-  let products = await productRes.json();
-
-  console.log("Products received:", products.length);
-
-  productsRow.innerHTML = "";
+  // category → unit options (same rules as CATEGORY_UNITS in core/catalog.py)
+  const categoryRules = [
+    ["vegetables", ["250 g", "500 g", "1 kg"]],
+    ["fruits", ["250 g", "500 g", "1 kg"]],
+    ["cereals", ["500 g", "1 kg", "5 kg"]],
+    ["bakery", ["1 packet"]],
+    ["dairy", ["1 packet"]],
+    ["snacks", ["1 packet"]],
+  ];
+  const defaultUnits = ["1 pc"];
 
-  // --- 3. Loop products and build cards ---
-  products.forEach(product => {
-    const cname = categoryMap[product.category] || "others";
+  // --- 1. Home page data: embedded by the server, or one request as a fallback ---
+  const bootstrap = await loadBootstrap();
 
-    // category → unit options
-    const categoryRules = {
-      vegetables: ["250 g", "500 g", "1 kg"],
-      fruits: ["250 g", "500 g", "1 kg"],
-      cereals: ["500 g", "1 kg", "5 kg"],
-      bakery: ["1 packet"],
-      dairy: ["1 packet"],
-      snacks: ["1 packet"],
-      others: ["1 pc"]
-    };
+  const categoryMap = {};
+  (function walk(nodes) {
+    nodes.forEach(c => {
+      categoryMap[c.id] = (c.title ? c.title.toLowerCase() : "");
+      walk(c.children || []);
+    });
+  })(bootstrap.categories || []);
+
+  // --- 2. Products page by page (cursor pagination) ---
+  let nextUrl = PRODUCTS_URL;
+  let loading = false;
+
+  // sentinel at the end of the row → loads the next page when it scrolls into view
+  const sentinel = document.createElement("div");
+  sentinel.className = "products-sentinel";
+
+  async function loadNextPage() {
+    if (!nextUrl || loading) return;
+    loading = true;
+    try {
+      const productRes = await fetch(nextUrl);
+      const page = await productRes.json();
+      const products = page.results ? page.results : page;
+      nextUrl = page.next || null;
+
+      console.log("Products received:", products.length);
+      products.forEach(renderCard);
+      productsRow.appendChild(sentinel);   // keep sentinel last
+
+      if (!nextUrl) sentinel.remove();
+    } catch (err) {
+      console.error("Failed to load products", err);
+    } finally {
+      loading = false;
+    }
+  }
 
-    const units = categoryRules[cname] || categoryRules["others"];
+  // --- 3. Build one product card (pages loaded after the server-rendered one) ---
+  function renderCard(product) {
+    const cname = categoryMap[product.category] || "";
+    const rule = categoryRules.find(([key]) => cname.includes(key));
+    const units = rule ? rule[1] : defaultUnits;
 
     const basePrice = parseFloat(product.price);
     const baseOld = parseFloat(product.old_price);
@@ -51,24 +74,36 @@ document.addEventListener("DOMContentLoaded", async () => {
     const firstPrice = (basePrice * mult).toFixed(2);
     const firstOld = baseOld ? (baseOld * mult).toFixed(2) : null;
 
-    const discount = firstOld && firstOld > firstPrice
+    const discount = firstOld && parseFloat(firstOld) > parseFloat(firstPrice)
       ? Math.round(((firstOld - firstPrice) / firstOld) * 100)
       : 0;
 
     // --- 3a. Create card container ---
     const card = document.createElement("div");
     card.className = "product-card";
+    card.dataset.id = product.id;
+    card.dataset.title = product.title;
+    card.dataset.image = product.image || "";
+    card.dataset.price = product.price;
 
-    // --- 3b. Card HTML ---
+    // --- 3b. Card HTML (keep in sync with templates/partials/product_card.html) ---
     card.innerHTML = `
       <div class="img-wrap clickable">
         ${discount ? `<div class="discount-badge">${discount}% OFF</div>` : ""}
-        <img src="${getImageUrl(product)}" alt="${product.title}">
+        <picture>
+          ${product.image_srcset ? `<source type="image/webp" srcset="${product.image_srcset.webp}" sizes="220px">` : ""}
+          <img src="${getImageUrl(product)}"
+               ${product.image_srcset ? `srcset="${product.image_srcset.jpg}" sizes="220px"` : ""}
+               alt="${product.title}" loading="lazy">
+        </picture>
         <div class="delivery-badge">5 MINS</div>
       </div>
 
       <p class="text-muted small mb-1">${product.brand || "fresho!"}</p>
       <h6 class="clickable">${product.title}</h6>
+      ${product.rating_count
+        ? `<div class="rating-badge small mb-1">★ ${product.rating_avg.toFixed(1)} <span class="text-muted">(${product.rating_count})</span></div>`
+        : ""}
 
       ${units.length > 1
         ? `<select class="form-select form-select-sm variant-select mb-2">
@@ -102,8 +137,19 @@ document.addEventListener("DOMContentLoaded", async () => {
 
     // --- 3c. Append to row ---
     productsRow.appendChild(card);
+    wireCard(card);
+  }
+
+  // --- 4. Event handlers for a card, server-rendered or built above ---
+  function wireCard(card) {
+    const product = {
+      id: parseInt(card.dataset.id, 10),
+      title: card.dataset.title,
+      image: card.dataset.image,
+      price: card.dataset.price
+    };
 
-    // --- 3d. Dropdown change event ---
+    // --- 4a. Dropdown change event ---
     const select = card.querySelector(".variant-select");
     if (select) {
       const priceRow = card.querySelector(".price-row");
@@ -119,58 +165,59 @@ document.addEventListener("DOMContentLoaded", async () => {
       });
     }
 
+    // --- 4b. Add to cart ---
     const addBtn = card.querySelector(".add-to-cart-btn");
-addBtn.addEventListener("click", async () => {
-  const csrftoken = getCookie("csrftoken");
-  const productId = addBtn.dataset.id;
-
-  let res = await fetch("/api/cart/", {
-    method: "POST",
-    headers: {
-      "Content-Type": "application/json",
-      "X-CSRFToken": csrftoken,
-      "Authorization": `Bearer ${localStorage.getItem("token") || ""}`
-    },
-    body: JSON.stringify({ product: productId, quantity: 1 })
-  });
+    addBtn.addEventListener("click", async () => {
+      const csrftoken = getCookie("csrftoken");
+      const productId = addBtn.dataset.id;
+
+      let res = await fetch("/api/cart/?response=delta", {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          "X-CSRFToken": csrftoken,
+          "Authorization": `Bearer ${localStorage.getItem("token") || ""}`
+        },
+        body: JSON.stringify({ product: productId, quantity: 1 })
+      });
 
-  if (res.ok) {
-    addBtn.textContent = "Added ✓";
-    addBtn.disabled = true;
+      if (res.ok) {
+        addBtn.textContent = "Added ✓";
+        addBtn.disabled = true;
 
-    if (typeof updateCartCount === "function") {
-      updateCartCount();
-    }
-  } else {
-    console.error("Add failed", await res.json());
-  }
-});
+        if (typeof updateCartCount === "function") {
+          updateCartCount();
+        }
+      } else {
+        console.error("Add failed", await res.json());
+      }
+    });
 
-// --- 3f. Wishlist button ---
-  const wishBtn = card.querySelector(".wishlist-btn");
-  if (wishBtn){
-  wishBtn.addEventListener("click", () => {
-  let savedItems = JSON.parse(localStorage.getItem("savedItems") || "[]");
-  const productData = {
-    id: product.id,
-    title: product.title,
-    image: getImageUrl(product),
-    price: product.price
-  };
-
-  if (!savedItems.find(p => p.id === product.id)) {
-    savedItems.push(productData);
-    localStorage.setItem("savedItems", JSON.stringify(savedItems));
-    wishBtn.innerHTML = "<i class='bi bi-bookmark-fill'></i>";
-  } else {
-      savedItems = savedItems.filter(p => p.id !== product.id);
-      localStorage.setItem("savedItems", JSON.stringify(savedItems));
-      wishBtn.innerHTML = `<i class="bi bi-bookmark"></i>`; // Reset
-  }
-});
-  }  
+    // --- 4c. Wishlist button ---
+    const wishBtn = card.querySelector(".wishlist-btn");
+    if (wishBtn) {
+      wishBtn.addEventListener("click", () => {
+        let savedItems = JSON.parse(localStorage.getItem("savedItems") || "[]");
+        const productData = {
+          id: product.id,
+          title: product.title,
+          image: getImageUrl(product),
+          price: product.price
+        };
+
+        if (!savedItems.find(p => p.id === product.id)) {
+          savedItems.push(productData);
+          localStorage.setItem("savedItems", JSON.stringify(savedItems));
+          wishBtn.innerHTML = "<i class='bi bi-bookmark-fill'></i>";
+        } else {
+          savedItems = savedItems.filter(p => p.id !== product.id);
+          localStorage.setItem("savedItems", JSON.stringify(savedItems));
+          wishBtn.innerHTML = `<i class="bi bi-bookmark"></i>`; // Reset
+        }
+      });
+    }
 
-    // --- 3e. Make image & title clickable ---
+    // --- 4d. Make image & title clickable ---
     const img = card.querySelector("img");
     const title = card.querySelector("h6");
 
@@ -178,14 +225,48 @@ addBtn.addEventListener("click", async () => {
       if (el) {
         el.style.cursor = "pointer";
         el.addEventListener("click", () => {
-          console.log("➡ Redirecting to:", `/product/${product.id}/`);
           window.location.href = `/product/${product.id}/`;
         });
       }
     });
-  });
+  }
+
+  // --- 5. Server-rendered cards (main row + category rails) only need their handlers ---
+  document.querySelectorAll(".product-card").forEach(wireCard);
+
+  if (productsRow.querySelector(".product-card")) {
+    nextUrl = productsRow.dataset.next || null;
+  } else if (bootstrap.products) {
+    // no server-rendered grid: first page came with the bootstrap payload
+    bootstrap.products.results.forEach(renderCard);
+    nextUrl = bootstrap.products.next || null;
+  } else {
+    await loadNextPage();
+  }
+
+  if (nextUrl) {
+    productsRow.appendChild(sentinel);
+    if ("IntersectionObserver" in window) {
+      const observer = new IntersectionObserver(entries => {
+        if (entries.some(e => e.isIntersecting)) loadNextPage();
+      }, { root: viewport, rootMargin: "0px 400px 0px 0px" });
+      observer.observe(sentinel);
+    }
+  }
 
   // --- Helpers ---
+  async function loadBootstrap() {
+    const embedded = document.getElementById("bootstrap-data");
+    if (embedded) return JSON.parse(embedded.textContent);
+    try {
+      const res = await fetch(BOOTSTRAP_URL);
+      return await res.json();
+    } catch (err) {
+      console.error("Failed to load bootstrap data", err);
+      return {};
+    }
+  }
+
   function getImageUrl(product) {
     if (product.image) return product.image;
     return "https://via.placeholder.com/220x220?text=No+Image";
@@ -199,7 +280,7 @@ addBtn.addEventListener("click", async () => {
     return 1; // for "pc", "packet"
   }
 
-  // --- 4. Arrows for carousel ---
+  // --- 6. Arrows for carousel ---
   function stepAmount() {
     const card = productsRow.querySelector(".product-card");
     if (!card) return viewport.clientWidth;
@@ -214,6 +295,10 @@ addBtn.addEventListener("click", async () => {
   });
   nextBtn.addEventListener("click", () => {
     viewport.scrollBy({ left: stepAmount(), behavior: "smooth" });
+    // fallback for browsers without IntersectionObserver
+    if (viewport.scrollLeft + viewport.clientWidth * 2 >= viewport.scrollWidth) {
+      loadNextPage();
+    }
   });
 });
 
@@ -1,78 +1,69 @@
-console.log("✅ index.js loaded!");
+console.log("✅ product_detail.js loaded!");
 
-document.addEventListener("DOMContentLoaded", async () => {
-  const PRODUCTS_URL = "/api/products/";
-  const CATEGORIES_URL = "/api/categories/";
+document.addEventListener("DOMContentLoaded", () => {
   const productsRow = document.getElementById("products-row");
   const viewport = document.querySelector(".products-viewport");
   const prevBtn = document.getElementById("prevBtn");
   const nextBtn = document.getElementById("nextBtn");
 
-  // --- 1. Fetch categories ---
-  const categoryRes = await fetch(CATEGORIES_URL);
-  const categories = await categoryRes.json();
-  const categoryMap = {};
-  categories.forEach(c => {
-    categoryMap[c.id] = (c.name ? c.name.toLowerCase() : "others");
-  });
-
-  // --- 2. Fetch products ---
-  const productRes = await fetch(PRODUCTS_URL);
-  let products = await productRes.json();
-  console.log("Products received:", products.length);
-
-  productsRow.innerHTML = "";
-
-  // --- 3. Loop products and build cards ---
-  products.forEach(product => {
-    const cname = categoryMap[product.category] || "others";
-
-    // --- Create card ---
-    const card = document.createElement("div");
-    card.className = "product-card";
-
-    card.innerHTML = `
-      <div class="img-wrap">
-        <img src="${getImageUrl(product)}" alt="${product.title}">
-      </div>
-
-      <p class="text-muted small mb-1">${product.brand || "fresho!"}</p>
-      <h6>${product.title}</h6>
-
-      <div class="price-row">
-        <span class="price-current">₹${product.price}</span>
-        ${product.old_price ? `<span class="price-old">₹${product.old_price}</span>` : ""}
-      </div>
-
-      <div class="offer-strip">Har Din Sasta!</div>
-
-      <div class="bottom-row">
-        <button class="btn btn-sm btn-light">♡</button>
-        <button class="add-btn add-to-cart-btn" data-id="${product.id}">Add</button>
-      </div>
-    `;
-
-    productsRow.appendChild(card);
-
-    // --- Redirect to product detail when clicking image or title ---
-    const img = card.querySelector("img");
-    const title = card.querySelector("h6");
+  // no similar products on this page
+  if (!productsRow || !viewport) return;
+
+  // --- 1. Similar products are server-rendered, only wire up the cards ---
+  productsRow.querySelectorAll(".product-card").forEach(card => {
+    const productId = card.dataset.id;
+
+    // --- 1a. Dropdown change event ---
+    const select = card.querySelector(".variant-select");
+    if (select) {
+      const priceRow = card.querySelector(".price-row");
+      select.addEventListener("change", e => {
+        const opt = e.target.selectedOptions[0];
+        const newPrice = parseFloat(opt.dataset.price).toFixed(2);
+        const newOld = opt.dataset.old ? parseFloat(opt.dataset.old).toFixed(2) : null;
+
+        priceRow.innerHTML = `
+          <span class="price-current">₹${newPrice}</span>
+          ${newOld ? `<span class="price-old">₹${newOld}</span>` : ""}
+        `;
+      });
+    }
+
+    // --- 1b. Add to cart ---
+    const addBtn = card.querySelector(".add-to-cart-btn");
+    if (addBtn) {
+      addBtn.addEventListener("click", async () => {
+        const res = await fetch("/api/cart/?response=delta", {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+            "X-CSRFToken": getCookie("csrftoken"),
+            "Authorization": `Bearer ${localStorage.getItem("token") || ""}`
+          },
+          body: JSON.stringify({ product: productId, quantity: 1 })
+        });
+
+        if (res.ok) {
+          addBtn.textContent = "Added ✓";
+          addBtn.disabled = true;
+          if (typeof updateCartCount === "function") updateCartCount();
+        } else {
+          console.error("Add failed", await res.json());
+        }
+      });
+    }
 
-    [img, title].forEach(el => {
+    // --- 1c. Redirect to product detail when clicking image or title ---
+    [card.querySelector("img"), card.querySelector("h6")].forEach(el => {
+      if (!el) return;
       el.style.cursor = "pointer";
       el.addEventListener("click", () => {
-        window.location.href = `/product/${product.id}/`;
+        window.location.href = `/product/${productId}/`;
       });
     });
   });
 
-  // --- Helpers ---
-  function getImageUrl(product) {
-    if (product.image) return product.image;
-    return "https://via.placeholder.com/220x220?text=No+Image";
-  }
-
-  // --- 4. Carousel arrows ---
+  // --- 2. Carousel arrows ---
   function stepAmount() {
     const card = productsRow.querySelector(".product-card");
     if (!card) return viewport.clientWidth;
@@ -88,3 +79,19 @@ document.addEventListener("DOMContentLoaded", async () => {
     viewport.scrollBy({ left: stepAmount(), behavior: "smooth" });
   });
 });
+
+
+function getCookie(name) {
+  let cookieValue = null;
+  if (document.cookie && document.cookie !== "") {
+    const cookies = document.cookie.split(";");
+    for (let i = 0; i < cookies.length; i++) {
+      const cookie = cookies[i].trim();
+      if (cookie.substring(0, name.length + 1) === (name + "=")) {
+        cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+        break;
+      }
+    }
+  }
+  return cookieValue;
+}
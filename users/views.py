@@ -348,7 +348,7 @@ def update_order_status(request, pk):
     if request.method == "POST":
         new_status = request.POST.get("item_status")
         order_item.item_status = new_status
-        order_item.save()
+        order_item.save(update_fields=["item_status"])
         return redirect("vendor-orders")
 
     return render(request, "update_order_status.html", {"order_item": order_item})